@@ -0,0 +1,7 @@
+"""Запуск окон конвертера двойным щелчком (Windows, без консоли)"""
+import sys
+
+from ExcelToJson.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main([]))
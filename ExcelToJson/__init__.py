@@ -0,0 +1,16 @@
+"""Конвертер Excel → JSON.
+
+Ядро (конвертация, типы, чтение и запись) не зависит от tkinter; окна - в модуле gui,
+командная строка - в cli. pandas и numpy загружаются при первом использовании.
+"""
+from .conversion import (
+    CONVERTER_VERSION, TYPE_REGISTRY, convert_dataframe, convert_value_by_type, load_type_modules,
+    register_type, resolve_converter
+)
+from .metrics import add_metrics_hook, enable_metrics, measure_stage, remove_metrics_hook
+from .clipboard import copy_to_clipboard, copy_to_clipboard_async
+from .readers import READER_ENGINES, ReaderEngine, choose_reader, read_excel_result, register_reader
+from .writer import ConversionCancelled, write_json_pairs
+from .diff import diff_pairs, find_previous_output, index_output
+from .convert import build_json_save_path, convert_excel_file, convert_workbook_sheets
+from .reverse import iter_json_pairs, json_to_excel_file
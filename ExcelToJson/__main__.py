@@ -0,0 +1,7 @@
+"""Запуск: python -m ExcelToJson (без аргументов - окна, с командой - консольный режим)"""
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
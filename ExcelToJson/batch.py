@@ -0,0 +1,155 @@
+"""Пакетная конвертация файлов в пуле процессов"""
+import os
+import sys
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .conversion import load_type_modules
+from .metrics import METRICS_HOOKS, enable_metrics
+from .convert import convert_excel_file, convert_workbook_columns, convert_workbook_sheets
+
+# === ПАКЕТНЫЙ РЕЖИМ (КОМАНДНАЯ СТРОКА) ===
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+def is_excel_file(path):
+    """Проверяет, что путь указывает на книгу Excel (временные файлы ~$ пропускаются)"""
+    name = os.path.basename(path)
+    return name.lower().endswith(EXCEL_EXTENSIONS) and not name.startswith('~$')
+
+def collect_excel_files(patterns, recursive=False):
+    """Раскрывает пути, маски и папки в упорядоченный список книг Excel без повторов"""
+    found = []
+    seen = set()
+
+    def add(path):
+        path = os.path.abspath(path)
+        if path not in seen and is_excel_file(path):
+            seen.add(path)
+            found.append(path)
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            if recursive:
+                for root, _, files in os.walk(pattern):
+                    for name in sorted(files):
+                        add(os.path.join(root, name))
+            else:
+                for name in sorted(os.listdir(pattern)):
+                    add(os.path.join(pattern, name))
+        elif os.path.isfile(pattern):
+            add(pattern)
+        else:
+            for path in sorted(glob.glob(pattern, recursive=recursive)):
+                if os.path.isfile(path):
+                    add(path)
+    return found
+
+def convert_batch_item(excel_path, options):
+    """Конвертирует один файл в рабочем процессе пакетного режима (без буфера обмена).
+
+    options - именованные параметры для convert_excel_file (reader, use_cache, ...).
+    """
+    started = time.perf_counter()
+    try:
+        if options.get('sheets') is not None:
+            return convert_batch_sheets(excel_path, options, started)
+        if options.get('columns'):
+            return convert_batch_columns(excel_path, options, started)
+        converted = convert_excel_file(excel_path, copy_result=False, **options)
+        return {'path': excel_path, 'save_path': converted['save_path'], 'rows': converted['rows'],
+                'cache_used': options.get('use_cache', True), 'cached': converted['cached'],
+                'saved_seconds': converted['saved_seconds'], 'patch_path': converted['patch_path'],
+                'changes': converted['changes'],
+                'seconds': time.perf_counter() - started, 'error': None}
+    except Exception as e:
+        return {'path': excel_path, 'save_path': None, 'rows': 0, 'cached': False, 'saved_seconds': 0,
+                'seconds': time.perf_counter() - started, 'error': str(e)}
+
+def describe_changes(item):
+    """Строка сводки инкрементального режима: путь патча и число операций по видам"""
+    changes = item['changes']
+    target = item['patch_path'] or "без изменений"
+    return f"Δ {target}: +{changes['add']} ~{changes['replace']} -{changes['remove']}"
+
+def convert_batch_sheets(excel_path, options, started):
+    """Пакетная конвертация нескольких листов книги (без кэша и буфера обмена)"""
+    sheets = options['sheets']
+    converted = convert_workbook_sheets(excel_path, sheets=None if sheets == 'all' else sheets,
+                                        output=options.get('sheet_output', 'split'),
+                                        reader=options.get('reader', 'auto'),
+                                        json_format=options.get('json_format', 'pretty'),
+                                        compression=options.get('compression'),
+                                        json_backend=options.get('json_backend', 'auto'))
+    errors = [f"{name}: {info['error']}" for name, info in converted['sheets'].items() if info['error']]
+    return {'path': excel_path, 'save_path': ', '.join(converted['save_paths']) or None,
+            'rows': converted['rows'], 'cached': False, 'saved_seconds': 0,
+            'seconds': time.perf_counter() - started,
+            'error': '; '.join(errors) if errors else None}
+
+def convert_batch_columns(excel_path, options, started):
+    """Пакетная конвертация нескольких столбцов значений книги (без кэша и буфера обмена)"""
+    converted = convert_workbook_columns(excel_path, options['columns'],
+                                         key_column=options.get('key_column', 'A'),
+                                         type_column=options.get('type_column', 'C'),
+                                         reader=options.get('reader', 'auto'),
+                                         json_format=options.get('json_format', 'pretty'),
+                                         compression=options.get('compression'),
+                                         json_backend=options.get('json_backend', 'auto'))
+    errors = [f"{name}: {info['error']}" for name, info in converted['columns'].items() if info['error']]
+    return {'path': excel_path, 'save_path': ', '.join(converted['save_paths']) or None,
+            'rows': converted['rows'], 'cached': False, 'saved_seconds': 0,
+            'seconds': time.perf_counter() - started,
+            'error': '; '.join(errors) if errors else None}
+
+def init_batch_worker(type_modules=(), metrics=None, metrics_memory=False):
+    """Готовит рабочий процесс: регистрирует типы и включает вывод метрик.
+
+    Подписчики, унаследованные от родителя при fork, заменяются своими.
+    """
+    load_type_modules(type_modules)
+    if metrics:
+        del METRICS_HOOKS[:]
+        enable_metrics(metrics, metrics_memory)
+
+def run_batch(files, workers=None, out=sys.stdout, type_modules=(), metrics=None,
+              metrics_memory=False, **options):
+    """Распределяет файлы по пулу процессов и печатает сводку по каждому файлу и итог.
+
+    metrics - файл для метрик этапов в формате JSON-lines ('-' - stderr).
+    """
+    started = time.perf_counter()
+    results = []
+    if not files:
+        print("Файлы Excel не найдены", file=out)
+        return results
+
+    # Пользовательские типы и метрики включаются в каждом рабочем процессе
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker,
+                             initargs=(type_modules, metrics, metrics_memory)) as pool:
+        futures = [pool.submit(convert_batch_item, path, options) for path in files]
+        for future in as_completed(futures):
+            item = future.result()
+            results.append(item)
+            if item['error']:
+                print(f"❌ {item['path']}: {item['error']}", file=out)
+            else:
+                source = ", из кэша" if item['cached'] else ""
+                print(f"✅ {item['path']} → {item['save_path']} "
+                      f"({item['rows']} ключей, {item['seconds']:.2f} с{source})", file=out)
+                if item.get('changes'):
+                    print(f"   {describe_changes(item)}", file=out)
+
+    elapsed = time.perf_counter() - started
+    converted = [item for item in results if not item['error']]
+    total_rows = sum(item['rows'] for item in converted)
+    print(f"Итого: {len(converted)}/{len(results)} файлов, {total_rows} ключей за {elapsed:.2f} с "
+          f"({len(converted) / elapsed:.2f} файл/с, {total_rows / elapsed:.0f} ключей/с)", file=out)
+    # Кэш есть только у конвертации одного листа (несколько листов и столбцов идут мимо него)
+    looked_up = [item for item in converted if item.get('cache_used')]
+    if looked_up:
+        hits = [item for item in looked_up if item['cached']]
+        saved = sum(max(item['saved_seconds'] - item['seconds'], 0) for item in hits)
+        print(f"Кэш: {len(hits)} попаданий, {len(looked_up) - len(hits)} промахов, "
+              f"сэкономлено ≈ {saved:.2f} с", file=out)
+    return results
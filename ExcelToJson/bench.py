@@ -0,0 +1,357 @@
+"""Замеры скорости конвертации на тестовых книгах"""
+import json
+import os
+from datetime import datetime, timedelta
+import subprocess
+import platform
+import sys
+import time
+import hashlib
+
+from .lazy import pd
+from .conversion import (
+    BOOL_VALUES, CONVERTER_VERSION, convert_dataframe, resolve_converter, to_bool, to_date, to_float,
+    to_null, to_number
+)
+from .clipboard import clipboard_backend, copy_to_clipboard
+from .readers import (
+    READER_ENGINES, choose_reader, iter_converted_rows, iter_sheet_rows, reader_engine
+)
+from .writer import write_json_pairs
+from .cache import write_atomic
+
+# === ЗАМЕРЫ ПРОИЗВОДИТЕЛЬНОСТИ ===
+# Форматы тестовых книг и размеры по умолчанию
+BENCH_FORMATS = ('.xlsx', '.xlsm', '.xls')
+BENCH_SIZES = (1000, 10000, 100000)
+# Доля типов в тестовой книге по умолчанию (тип: вес)
+BENCH_TYPE_MIX = {'number': 3, 'float': 1, 'bool': 1, 'date': 1, 'null': 1, 'string': 3,
+                  'число': 1, 'логический': 1, 'текст': 1}
+# Порог регрессии: замедление больше чем на 20% и больше чем на 5 мс
+BENCH_THRESHOLD = 0.2
+BENCH_MIN_SECONDS = 0.005
+BENCH_STAGES = ('read', 'convert', 'serialize', 'write', 'clipboard')
+# В .xls помещается не больше 65536 строк
+XLS_MAX_ROWS = 65536
+
+def parse_type_mix(text):
+    """Разбирает строку вида "number=3,bool=1,строка=1" в словарь тип → вес"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip():
+            mix[name.strip()] = float(weight) if weight.strip() else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"Пустая смесь типов: {text!r}")
+    return mix
+
+def synthetic_value(data_type, rng):
+    """Случайное значение столбца B, подходящее для типа data_type.
+
+    Значение записывается ячейкой своего типа (число, логическое, дата), как в
+    настоящих книгах; часть логических значений - текстом ("да", "false", ...).
+    """
+    kind = resolve_converter(data_type)
+    if kind is to_number:
+        return rng.randint(-10**6, 10**6) if rng.random() < 0.7 else round(rng.uniform(-1e6, 1e6), 3)
+    if kind is to_float:
+        return round(rng.uniform(-1e6, 1e6), 6)
+    if kind is to_bool:
+        return rng.random() < 0.5 if rng.random() < 0.8 else rng.choice(list(BOOL_VALUES))
+    if kind is to_date:
+        return datetime(2000, 1, 1) + timedelta(days=rng.randint(0, 10000), seconds=rng.randint(0, 86399))
+    if kind is to_null:
+        return None
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyzабвгдеёжзийклмнопрстуфхцчшщэюя ')
+                   for _ in range(rng.randint(3, 24)))
+
+def iter_synthetic_rows(rows, type_mix=None, empty_keys=0.01, seed=0):
+    """Генерирует строки (A, B, C) тестовой книги: заголовок и rows строк данных.
+
+    empty_keys - доля строк с пустым ключом (они пропускаются при конвертации).
+    """
+    import random
+
+    rng = random.Random(seed)
+    type_mix = type_mix or BENCH_TYPE_MIX
+    names, weights = list(type_mix), list(type_mix.values())
+    yield ['Ключ', 'Значение', 'Тип']
+    for number in range(rows):
+        data_type = rng.choices(names, weights)[0]
+        key = None if rng.random() < empty_keys else f"key_{number}"
+        yield [key, synthetic_value(data_type, rng), data_type]
+
+def generate_workbook(path, rows, type_mix=None, empty_keys=0.01, seed=0):
+    """Создает тестовую книгу .xlsx/.xlsm (openpyxl) или .xls (нужен пакет xlwt)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xls':
+        if rows + 1 > XLS_MAX_ROWS:
+            raise ValueError(f"В .xls помещается не больше {XLS_MAX_ROWS - 1} строк данных")
+        try:
+            import xlwt
+        except ImportError:
+            raise RuntimeError("Для создания .xls установите пакет xlwt (pip install xlwt)")
+        workbook = xlwt.Workbook(encoding='utf-8')
+        sheet = workbook.add_sheet('Sheet1')
+        # Без формата xlwt записал бы дату простым числом
+        date_style = xlwt.easyxf(num_format_str='YYYY-MM-DD hh:mm:ss')
+        for row_number, row in enumerate(iter_synthetic_rows(rows, type_mix, empty_keys, seed)):
+            for column, value in enumerate(row):
+                if isinstance(value, datetime):
+                    sheet.write(row_number, column, value, date_style)
+                elif value is not None:
+                    sheet.write(row_number, column, value)
+        workbook.save(path)
+        return path
+
+    import openpyxl
+
+    # write_only пишет строки потоком, не держа лист в памяти
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for row in iter_synthetic_rows(rows, type_mix, empty_keys, seed):
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+def fixture_path(folder, rows, extension, type_mix, empty_keys, seed):
+    """Имя тестовой книги, однозначно задаваемое ее параметрами"""
+    signature = json.dumps([rows, type_mix, empty_keys, seed], ensure_ascii=False, sort_keys=True)
+    digest = hashlib.sha256(signature.encode('utf-8')).hexdigest()[:10]
+    return os.path.join(folder, f"bench_{rows}_{digest}{extension}")
+
+def run_bench_stages(excel_path, reader, save_path, clipboard, clock=time.perf_counter):
+    """Один прогон конвейера по этапам; возвращает длительности, ключи и размер JSON.
+
+    clock вызывается в начале и в конце каждого этапа.
+    """
+    import io
+
+    engine = reader_engine(excel_path, reader)
+    timings = {}
+    started = clock()
+    rows = list(iter_sheet_rows(excel_path)) if engine.streaming else engine.read_frame(excel_path)
+    timings['read'] = clock() - started
+
+    started = clock()
+    result = dict(iter_converted_rows(rows)) if engine.streaming else convert_dataframe(rows)
+    timings['convert'] = clock() - started
+    del rows
+
+    started = clock()
+    buffer = io.StringIO()
+    write_json_pairs(buffer, result.items())
+    json_str = buffer.getvalue()
+    timings['serialize'] = clock() - started
+
+    started = clock()
+    with open(save_path, 'w', encoding='utf-8') as f:
+        f.write(json_str)
+    timings['write'] = clock() - started
+
+    if clipboard:
+        started = clock()
+        copy_to_clipboard(json_str)
+        timings['clipboard'] = clock() - started
+    return timings, len(result), len(json_str.encode('utf-8'))
+
+def benchmark_file(excel_path, reader='pandas', repeat=3, clipboard=False, memory=True):
+    """Замеряет этапы конвертации файла: лучшее время из repeat прогонов и пик памяти.
+
+    Пик памяти по этапам (tracemalloc) снимается отдельным прогоном, чтобы
+    трассировка не искажала время. Буфер обмена замеряется, только если
+    clipboard=True и он доступен.
+    """
+    import tempfile
+    import tracemalloc
+
+    clipboard = clipboard and clipboard_backend() is not None
+    fd, save_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        best = {}
+        for _ in range(max(repeat, 1)):
+            timings, keys, json_bytes = run_bench_stages(excel_path, reader, save_path, clipboard)
+            for stage, seconds in timings.items():
+                best[stage] = min(best.get(stage, seconds), seconds)
+
+        peak = {}
+        if memory:
+            marks = []
+
+            def mark():
+                # Пик с прошлой отметки; на конце этапа это пик самого этапа
+                marks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+                return time.perf_counter()
+
+            tracemalloc.start()
+            try:
+                run_bench_stages(excel_path, reader, save_path, clipboard, clock=mark)
+            finally:
+                tracemalloc.stop()
+            # Отметки идут парами (начало, конец) в порядке BENCH_STAGES
+            peak = dict(zip(BENCH_STAGES, marks[1::2]))
+    finally:
+        os.remove(save_path)
+
+    stages = {stage: {'seconds': round(seconds, 6), 'peak_bytes': peak.get(stage)}
+              for stage, seconds in best.items()}
+    total = sum(seconds for seconds in best.values())
+    return {
+        'file': os.path.basename(excel_path),
+        'format': os.path.splitext(excel_path)[1].lower(),
+        'reader': reader,
+        'engine': choose_reader(excel_path, reader),
+        'keys': keys,
+        'input_bytes': os.path.getsize(excel_path),
+        'json_bytes': json_bytes,
+        'stages': stages,
+        'total_seconds': round(total, 6),
+        'keys_per_second': round(keys / total) if total else None,
+    }
+
+def run_benchmarks(sizes=BENCH_SIZES, formats=('.xlsx',), readers=('pandas',), type_mix=None,
+                   empty_keys=0.01, seed=0, repeat=3, fixtures_dir=None, clipboard=False,
+                   memory=True, out=sys.stdout):
+    """Создает (или берет готовые) тестовые книги и замеряет их конвертацию.
+
+    Возвращает словарь с параметрами окружения и списком результатов.
+    """
+    import tempfile
+
+    type_mix = type_mix or BENCH_TYPE_MIX
+    fixtures_dir = fixtures_dir or os.path.join(tempfile.gettempdir(), 'ExcelToJson-bench')
+    os.makedirs(fixtures_dir, exist_ok=True)
+    results = []
+    for rows in sizes:
+        for extension in formats:
+            path = fixture_path(fixtures_dir, rows, extension, type_mix, empty_keys, seed)
+            try:
+                if not os.path.exists(path):
+                    print(f"Создание {path}...", file=out)
+                    generate_workbook(path, rows, type_mix, empty_keys, seed)
+            except Exception as e:
+                print(f"❌ {extension}, {rows} строк: {e}", file=out)
+                continue
+            for reader in readers:
+                engine = READER_ENGINES.get(reader)
+                if engine and not (engine.available() and engine.supports(path)):
+                    continue  # например, stream не читает .xls
+                item = benchmark_file(path, reader, repeat, clipboard, memory)
+                item['rows'] = rows
+                results.append(item)
+                stages = ', '.join(f"{stage} {info['seconds'] * 1000:.1f} мс"
+                                   for stage, info in item['stages'].items())
+                print(f"✅ {extension} {rows} строк, {reader}: {item['total_seconds']:.3f} с "
+                      f"({stages})", file=out)
+    return {
+        'version': CONVERTER_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'type_mix': type_mix,
+        'empty_keys': empty_keys,
+        'seed': seed,
+        'results': results,
+    }
+
+def benchmark_readers(excel_path, repeat=3, out=sys.stdout):
+    """Замеряет на файле каждый доступный движок чтения и показывает выбор режима auto.
+
+    Возвращает словарь: file, auto (имя выбранного движка) и results
+    (результаты benchmark_file по движкам, быстрые первыми).
+    """
+    auto = choose_reader(excel_path)
+    results = []
+    for engine in READER_ENGINES.values():
+        if not engine.supports(excel_path):
+            continue
+        if not engine.available():
+            print(f"   {engine.name}: недоступен (pip install {engine.module.replace('_', '-')})", file=out)
+            continue
+        try:
+            results.append(benchmark_file(excel_path, engine.name, repeat, memory=False))
+        except Exception as e:
+            print(f"❌ {engine.name}: {e}", file=out)
+    results.sort(key=lambda item: item['total_seconds'])
+    for item in results:
+        mark = "★" if item['engine'] == auto else " "
+        read = item['stages']['read']['seconds']
+        print(f"{mark}  {item['engine']}: {item['total_seconds']:.3f} с (чтение {read:.3f} с), "
+              f"{item['keys_per_second']} ключей/с", file=out)
+    return {'file': excel_path, 'auto': auto, 'results': results}
+
+def compare_benchmarks(baseline, current, threshold=BENCH_THRESHOLD, min_seconds=BENCH_MIN_SECONDS,
+                       out=sys.stdout):
+    """Сравнивает результаты замеров с эталоном и возвращает список регрессий.
+
+    Регрессия - этап стал медленнее больше чем на threshold (доля) и больше
+    чем на min_seconds, либо его пик памяти вырос больше чем на threshold.
+    """
+    def index(data):
+        return {(item['format'], item['rows'], item['reader']): item for item in data['results']}
+
+    reference = index(baseline)
+    regressions = []
+    for key, item in index(current).items():
+        base = reference.get(key)
+        if base is None:
+            print(f"  {key[0]} {key[1]} строк, {key[2]}: нет в эталоне", file=out)
+            continue
+        for stage, info in item['stages'].items():
+            before = base['stages'].get(stage)
+            if not before:
+                continue
+            ratio = info['seconds'] / before['seconds'] if before['seconds'] else 1.0
+            slower = (info['seconds'] > before['seconds'] * (1 + threshold)
+                      and info['seconds'] - before['seconds'] > min_seconds)
+            heavier = (info.get('peak_bytes') and before.get('peak_bytes')
+                       and info['peak_bytes'] > before['peak_bytes'] * (1 + threshold))
+            mark = "❌" if slower or heavier else "  "
+            print(f"{mark} {key[0]} {key[1]} строк, {key[2]}, {stage}: "
+                  f"{before['seconds'] * 1000:.1f} → {info['seconds'] * 1000:.1f} мс ({ratio:.2f}x)", file=out)
+            if slower or heavier:
+                regressions.append({'format': key[0], 'rows': key[1], 'reader': key[2], 'stage': stage,
+                                    'baseline': before, 'current': info,
+                                    'reason': 'time' if slower else 'memory'})
+    print(f"Регрессий: {len(regressions)}", file=out)
+    return regressions
+
+# Холодный старт: что запускается в отдельном интерпретаторе
+STARTUP_TARGETS = {
+    'core': ['-c', 'import ExcelToJson'],
+    'editor': ['-c', 'import ExcelToJson.gui'],
+    'cli': ['-m', 'ExcelToJson', '--help'],
+}
+
+def measure_startup(repeat=5, out=sys.stdout):
+    """Замеряет холодный старт ядра, окон (без показа) и командной строки.
+
+    Каждый вариант запускается repeat раз в новом интерпретаторе; берется лучшее время.
+    Возвращает словарь имя → секунды (python - запуск пустого интерпретатора).
+    """
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_dir,
+                                                                      os.environ.get('PYTHONPATH')])))
+    results = {}
+    for name, args in [('python', ['-c', 'pass'])] + list(STARTUP_TARGETS.items()):
+        best = None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            subprocess.run([sys.executable] + args, env=env, stdout=subprocess.DEVNULL, check=True)
+            seconds = time.perf_counter() - started
+            best = seconds if best is None else min(best, seconds)
+        results[name] = round(best, 4)
+        print(f"{name}: {best * 1000:.0f} мс", file=out)
+    return results
+
+def save_bench_results(path, data):
+    """Сохраняет результаты замеров в JSON"""
+    write_atomic(path, json.dumps(data, ensure_ascii=False, indent=2))
+
+def load_bench_results(path):
+    """Читает результаты замеров из JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
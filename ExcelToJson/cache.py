@@ -0,0 +1,116 @@
+"""Кэш результатов конвертации по содержимому книги"""
+import json
+import os
+import platform
+import time
+import hashlib
+import shutil
+
+from .conversion import CONVERTER_VERSION
+
+# === КЭШ РЕЗУЛЬТАТОВ КОНВЕРТАЦИИ ===
+def default_cache_dir():
+    """Возвращает папку кэша: EXCELTOJSON_CACHE_DIR или системная папка кэша пользователя"""
+    if os.environ.get('EXCELTOJSON_CACHE_DIR'):
+        return os.environ['EXCELTOJSON_CACHE_DIR']
+    if platform.system() == 'Windows':
+        base = os.environ.get('LOCALAPPDATA')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME')
+    return os.path.join(base or os.path.join(os.path.expanduser('~'), '.cache'), 'ExcelToJson')
+
+# Ограничения кэша: общий размер и возраст записей (по времени последнего обращения)
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+CACHE_MAX_AGE_DAYS = 30
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Считает SHA-256 содержимого файла, читая его блоками"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(excel_path, options):
+    """Ключ кэша: хэш содержимого книги + версия конвертера + параметры конвертации"""
+    payload = json.dumps({'content': file_sha256(excel_path), 'version': CONVERTER_VERSION,
+                          'options': options}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def cache_load(cache_dir, key):
+    """Возвращает (путь к JSON в кэше, meta) или None, если записи нет"""
+    data_path = os.path.join(cache_dir, f"{key}.json")
+    meta_path = os.path.join(cache_dir, f"{key}.meta")
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.isfile(data_path):
+        return None
+    # Отмечаем обращение - вытеснение удаляет давно не использованные записи
+    now = time.time()
+    for path in (data_path, meta_path):
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+    return data_path, meta
+
+def copy_atomic(source_path, path):
+    """Копирует файл через временный, чтобы параллельные процессы не видели обрывков"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.copyfile(source_path, temp_path)
+    os.replace(temp_path, path)
+
+def write_atomic(path, text):
+    """Записывает текст через временный файл, чтобы параллельные процессы не видели обрывков"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+def cache_store(cache_dir, key, json_path, meta):
+    """Копирует готовый JSON в кэш и применяет политику вытеснения"""
+    os.makedirs(cache_dir, exist_ok=True)
+    copy_atomic(json_path, os.path.join(cache_dir, f"{key}.json"))
+    write_atomic(os.path.join(cache_dir, f"{key}.meta"), json.dumps(meta, ensure_ascii=False))
+    cache_evict(cache_dir)
+
+def cache_evict(cache_dir, max_bytes=None, max_age_days=None):
+    """Удаляет записи старше max_age_days, затем самые старые - пока кэш больше max_bytes"""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    max_age_days = CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    entries = {}
+    for entry in os.scandir(cache_dir):
+        key, ext = os.path.splitext(entry.name)
+        if ext not in ('.json', '.meta'):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        size, used = entries.get(key, (0, 0))
+        entries[key] = (size + stat.st_size, max(used, stat.st_mtime))
+
+    def remove(key):
+        for ext in ('.json', '.meta'):
+            try:
+                os.remove(os.path.join(cache_dir, key + ext))
+            except OSError:
+                pass
+
+    expire_before = time.time() - max_age_days * 24 * 3600
+    total = 0
+    alive = []
+    for key, (size, used) in entries.items():
+        if used < expire_before:
+            remove(key)
+        else:
+            total += size
+            alive.append((used, size, key))
+    for used, size, key in sorted(alive):
+        if total <= max_bytes:
+            break
+        remove(key)
+        total -= size
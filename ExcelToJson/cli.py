@@ -0,0 +1,277 @@
+"""Командная строка: convert, watch, serve, to-excel, bench, engines, compare"""
+import os
+import sys
+import argparse
+
+from .conversion import CONVERTER_VERSION
+from .metrics import enable_metrics, enable_metrics_from_env
+from .readers import READER_ENGINES, choose_reader, reader_modes
+from .convert import SHEET_OUTPUTS, check_value_columns, parse_column, parse_column_map
+from .writer import COMPRESSIONS, JSON_BACKENDS, JSON_FORMATS, check_output_options
+from .batch import collect_excel_files, run_batch
+from .bench import (
+    BENCH_SIZES, BENCH_THRESHOLD, benchmark_readers, compare_benchmarks, load_bench_results,
+    measure_startup, parse_type_mix, run_benchmarks, save_bench_results
+)
+from .reverse import EXCEL_WRITERS, excel_writer, run_json_to_excel
+from .server import SERVICE_HOST, SERVICE_MAX_UPLOAD_BYTES, SERVICE_PORT, serve
+from .watch import WATCH_INTERVAL_SECONDS, WATCH_SETTLE_SECONDS, watch_folders
+
+def add_conversion_arguments(command):
+    """Добавляет к команде общие параметры конвертации (convert, watch, serve)"""
+    command.add_argument("--reader", choices=reader_modes(), default="auto",
+                         help="движок чтения: pandas, stream (построчно), calamine "
+                              "или auto - самый быстрый доступный по формату и размеру")
+    command.add_argument("--all-sheets", action="store_true",
+                         help="конвертировать все листы книги (по умолчанию - только первый)")
+    command.add_argument("--sheet", action="append", default=None, metavar="NAME",
+                         help="конвертировать указанный лист (можно несколько)")
+    command.add_argument("--sheet-output", choices=SHEET_OUTPUTS, default="split",
+                         help="split - JSON на каждый лист, combined - один JSON с ключами-листами")
+    command.add_argument("--columns", default=None, metavar="ИМЯ=СТОЛБЕЦ,...",
+                         help="несколько вариантов значений за одно чтение, например dev=B,test=D,prod=E: "
+                              "каждый столбец - в свой <книга>_<имя>_<дата>.json")
+    command.add_argument("--key-column", default="A", help="столбец ключей для --columns (по умолчанию A)")
+    command.add_argument("--type-column", default="C", help="столбец типов для --columns (по умолчанию C)")
+    command.add_argument("--format", choices=JSON_FORMATS, default="pretty", dest="json_format",
+                         help="pretty - с отступами, compact - без пробелов, ndjson - пара на строку")
+    command.add_argument("--compress", choices=COMPRESSIONS, default=None,
+                         help="сжимать результат потоком (gzip или zstd - нужен пакет zstandard)")
+    command.add_argument("--json-backend", choices=JSON_BACKENDS, default="auto",
+                         help="кодировщик JSON: orjson (быстрее, тот же результат), json или auto")
+    command.add_argument("--incremental", action="store_true",
+                         help="записать рядом JSON Patch (RFC 6902) к предыдущему <книга>_<дата>.json")
+    command.add_argument("--skip-unchanged", action="store_true",
+                         help="в режиме --incremental не оставлять новый JSON, если ничего не изменилось")
+    command.add_argument("--types-module", action="append", default=[], metavar="MODULE",
+                         help="модуль, регистрирующий свои типы через register_type (можно несколько)")
+    command.add_argument("--metrics", default=None, metavar="FILE",
+                         help="писать метрики этапов в JSON-lines (FILE или '-' для stderr)")
+    command.add_argument("--metrics-memory", action="store_true",
+                         help="добавить в метрики пик памяти (tracemalloc, медленнее)")
+    command.add_argument("--no-cache", action="store_true",
+                         help="не использовать кэш результатов")
+    command.add_argument("--cache-dir", default=None,
+                         help="папка кэша (по умолчанию - EXCELTOJSON_CACHE_DIR или кэш пользователя)")
+
+def conversion_options(args):
+    """Параметры run_batch/watch_folders/serve из общих аргументов командной строки"""
+    return dict(reader=args.reader, use_cache=not args.no_cache, cache_dir=args.cache_dir,
+                json_format=args.json_format, compression=args.compress, json_backend=args.json_backend,
+                incremental=args.incremental or bool(getattr(args, 'baseline', None)),
+                skip_unchanged=args.skip_unchanged, **baseline_option(args),
+                type_modules=args.types_module,
+                metrics=args.metrics or os.environ.get('EXCELTOJSON_METRICS'),
+                metrics_memory=args.metrics_memory or os.environ.get('EXCELTOJSON_METRICS_MEMORY') == '1',
+                **sheet_options(args), **column_options(args))
+
+def column_options(args):
+    """Параметры конвертации нескольких столбцов значений (--columns)"""
+    if not args.columns:
+        return {}
+    options = {'columns': parse_column_map(args.columns), 'key_column': parse_column(args.key_column),
+               'type_column': parse_column(args.type_column)}
+    check_value_columns(options['columns'], options['key_column'], options['type_column'])
+    return options
+
+def baseline_option(args):
+    """Явный предыдущий результат для инкрементального режима (только команда convert)"""
+    return {'baseline': args.baseline} if getattr(args, 'baseline', None) else {}
+
+def sheet_options(args):
+    """Параметры конвертации листов из аргументов командной строки"""
+    if args.all_sheets:
+        return {'sheets': 'all', 'sheet_output': args.sheet_output}
+    if args.sheet:
+        return {'sheets': args.sheet, 'sheet_output': args.sheet_output}
+    return {}
+
+def main(argv=None):
+    """Точка входа: без аргументов открывает GUI, с командой (convert, watch, bench, ...) - консольный режим"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        # Окна подгружаются только здесь - командам tkinter не нужен
+        from .gui import create_ask_window
+
+        enable_metrics_from_env()
+        create_ask_window()
+        return 0
+
+    parser = argparse.ArgumentParser(prog="python -m ExcelToJson",
+                                     description="Конвертация Excel → JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_cmd = commands.add_parser("convert", help="пакетная конвертация файлов, масок и папок")
+    convert_cmd.add_argument("paths", nargs="+", help="файлы, маски (*.xlsx) или папки")
+    convert_cmd.add_argument("-j", "--workers", type=int, default=None,
+                             help="число рабочих процессов (по умолчанию - число ядер)")
+    convert_cmd.add_argument("-r", "--recursive", action="store_true",
+                             help="обходить вложенные папки")
+    convert_cmd.add_argument("--baseline", default=None, metavar="FILE",
+                             help="сравнить с указанным JSON вместо последнего результата (одна книга)")
+    add_conversion_arguments(convert_cmd)
+
+    watch_cmd = commands.add_parser("watch", help="следить за папками и конвертировать новые книги")
+    watch_cmd.add_argument("folders", nargs="+", help="папки для наблюдения")
+    watch_cmd.add_argument("-j", "--workers", type=int, default=None,
+                           help="число рабочих процессов (по умолчанию - число ядер)")
+    watch_cmd.add_argument("-r", "--recursive", action="store_true", help="следить и за вложенными папками")
+    watch_cmd.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS,
+                           help="сколько секунд файл не должен меняться перед конвертацией "
+                                "(по умолчанию %(default)s)")
+    watch_cmd.add_argument("--interval", type=float, default=WATCH_INTERVAL_SECONDS,
+                           help="период опроса папок без inotify, с (по умолчанию %(default)s)")
+    watch_cmd.add_argument("--queue", type=int, default=None,
+                           help="сколько файлов одновременно отдавать в пул (по умолчанию - 2 × процессов)")
+    watch_cmd.add_argument("--existing", action="store_true",
+                           help="сконвертировать и книги, уже лежащие в папках")
+    watch_cmd.add_argument("--polling", action="store_true", help="опрашивать папки вместо inotify")
+    add_conversion_arguments(watch_cmd)
+
+    serve_cmd = commands.add_parser("serve", help="локальная служба конвертации по HTTP")
+    serve_cmd.add_argument("--host", default=SERVICE_HOST, help="адрес (по умолчанию %(default)s)")
+    serve_cmd.add_argument("--port", type=int, default=SERVICE_PORT, help="порт (по умолчанию %(default)s)")
+    serve_cmd.add_argument("--unix", default=None, metavar="SOCKET",
+                           help="слушать Unix-сокет вместо TCP")
+    serve_cmd.add_argument("-j", "--workers", type=int, default=None,
+                           help="число рабочих процессов (по умолчанию - число ядер)")
+    serve_cmd.add_argument("--queue", type=int, default=None,
+                           help="сколько запросов принимать одновременно, остальным - 503 "
+                                "(по умолчанию - 4 × процессов)")
+    serve_cmd.add_argument("--max-upload", type=int, default=SERVICE_MAX_UPLOAD_BYTES // (1024 * 1024),
+                           metavar="MB", help="наибольший размер загружаемой книги, МБ (по умолчанию %(default)s)")
+    serve_cmd.add_argument("--allow-paths", action="store_true",
+                           help="разрешить конвертацию файлов по пути на диске (?path=); "
+                                "по умолчанию - только загрузка книг")
+    add_conversion_arguments(serve_cmd)
+
+    excel_cmd = commands.add_parser("to-excel", help="обратная конвертация JSON → Excel (ключ, значение, тип)")
+    excel_cmd.add_argument("paths", nargs="+", help="файлы JSON или NDJSON (можно сжатые .gz, .zst)")
+    excel_cmd.add_argument("-o", "--output", default=None,
+                           help="путь книги (одного файла; по умолчанию - <имя>_<дата>.xlsx рядом с JSON)")
+    excel_cmd.add_argument("--writer", choices=EXCEL_WRITERS, default="auto",
+                           help="запись книги: xlsxwriter (быстрее, нужен пакет), openpyxl или auto")
+    excel_cmd.add_argument("--metrics", default=None, metavar="FILE",
+                           help="писать метрики этапов в JSON-lines (FILE или '-' для stderr)")
+
+    bench_cmd = commands.add_parser("bench", help="замеры скорости конвертации на тестовых книгах")
+    bench_cmd.add_argument("--sizes", default=",".join(map(str, BENCH_SIZES)),
+                           help="число строк через запятую (по умолчанию %(default)s)")
+    bench_cmd.add_argument("--formats", default=".xlsx",
+                           help="форматы через запятую: .xlsx, .xlsm, .xls (по умолчанию %(default)s)")
+    bench_cmd.add_argument("--readers", default="pandas",
+                           help="способы чтения через запятую: pandas, stream (по умолчанию %(default)s)")
+    bench_cmd.add_argument("--types", default=None, metavar="MIX",
+                           help="смесь типов, например number=3,bool=1,текст=1")
+    bench_cmd.add_argument("--empty-keys", type=float, default=0.01,
+                           help="доля строк с пустым ключом (по умолчанию %(default)s)")
+    bench_cmd.add_argument("--seed", type=int, default=0, help="зерно генератора данных")
+    bench_cmd.add_argument("--repeat", type=int, default=3, help="число прогонов (берется лучшее время)")
+    bench_cmd.add_argument("--fixtures", default=None, help="папка для тестовых книг")
+    bench_cmd.add_argument("--clipboard", action="store_true", help="замерять и копирование в буфер обмена")
+    bench_cmd.add_argument("--no-memory", action="store_true", help="не замерять пик памяти")
+    bench_cmd.add_argument("-o", "--output", default=None, help="сохранить результаты в JSON")
+    bench_cmd.add_argument("--baseline", default=None, help="сравнить с сохраненными результатами")
+    bench_cmd.add_argument("--threshold", type=float, default=BENCH_THRESHOLD,
+                           help="допустимое замедление, доля (по умолчанию %(default)s)")
+
+    startup_cmd = commands.add_parser("startup", help="замерить холодный старт ядра, окон и командной строки")
+    startup_cmd.add_argument("--repeat", type=int, default=5, help="число запусков (берется лучшее время)")
+
+    engines_cmd = commands.add_parser("engines", help="движки чтения и их скорость на указанных книгах")
+    engines_cmd.add_argument("paths", nargs="*", help="книги для замера (без них - только список движков)")
+    engines_cmd.add_argument("--repeat", type=int, default=3, help="число прогонов (берется лучшее время)")
+    engines_cmd.add_argument("-o", "--output", default=None, help="сохранить результаты в JSON")
+
+    compare_cmd = commands.add_parser("compare", help="сравнить результаты замеров с эталоном")
+    compare_cmd.add_argument("baseline", help="JSON с эталонными результатами")
+    compare_cmd.add_argument("current", help="JSON с новыми результатами")
+    compare_cmd.add_argument("--threshold", type=float, default=BENCH_THRESHOLD,
+                             help="допустимое замедление, доля (по умолчанию %(default)s)")
+
+    args = parser.parse_args(argv)
+    if args.command in ("convert", "watch", "serve"):
+        # Формат и сжатие проверяются сразу, а не на каждом файле в пуле
+        try:
+            check_output_options(args.json_format, args.compress, args.json_backend)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.json_format == "ndjson" and args.sheet_output == "combined" and sheet_options(args):
+            parser.error("--sheet-output combined нельзя сочетать с --format ndjson")
+        if (args.incremental or getattr(args, 'baseline', None)) and sheet_options(args):
+            parser.error("--incremental и --baseline работают только с первым листом книги")
+        if args.command == "serve" and sheet_options(args):
+            parser.error("служба конвертирует только первый лист книги")
+        if args.columns:
+            try:
+                column_options(args)
+            except ValueError as e:
+                parser.error(str(e))
+            if sheet_options(args) or args.incremental or getattr(args, 'baseline', None):
+                parser.error("--columns нельзя сочетать с --sheet, --all-sheets, --incremental и --baseline")
+            if args.command == "serve":
+                parser.error("служба конвертирует только столбцы A, B, C")
+    if args.command == "bench":
+        data = run_benchmarks(sizes=[int(size) for size in args.sizes.split(',')],
+                              formats=[f".{name.strip().lstrip('.')}" for name in args.formats.split(',')],
+                              readers=[name.strip() for name in args.readers.split(',')],
+                              type_mix=parse_type_mix(args.types) if args.types else None,
+                              empty_keys=args.empty_keys, seed=args.seed, repeat=args.repeat,
+                              fixtures_dir=args.fixtures, clipboard=args.clipboard,
+                              memory=not args.no_memory)
+        if args.output:
+            save_bench_results(args.output, data)
+        if args.baseline:
+            return 1 if compare_benchmarks(load_bench_results(args.baseline), data, args.threshold) else 0
+        return 0
+    if args.command == "startup":
+        measure_startup(args.repeat)
+        return 0
+    if args.command == "engines":
+        for engine in READER_ENGINES.values():
+            state = "доступен" if engine.available() else f"нет пакета {engine.module}"
+            kind = "построчно" if engine.streaming else "таблицей"
+            print(f"{engine.name}: {', '.join(engine.extensions)}, {kind}, {state}")
+        data = []
+        for path in collect_excel_files(args.paths):
+            print(f"\n{path} (auto → {choose_reader(path)}):")
+            data.append(benchmark_readers(path, args.repeat))
+        if args.output:
+            save_bench_results(args.output, {'version': CONVERTER_VERSION, 'files': data})
+        return 0
+    if args.command == "compare":
+        regressions = compare_benchmarks(load_bench_results(args.baseline),
+                                         load_bench_results(args.current), args.threshold)
+        return 1 if regressions else 0
+    if args.command == "convert":
+        files = collect_excel_files(args.paths, args.recursive)
+        if args.baseline and len(files) > 1:
+            parser.error("--baseline можно указать только для одной книги")
+        results = run_batch(files, args.workers, **conversion_options(args))
+        return 1 if not results or any(item['error'] for item in results) else 0
+    if args.command == "to-excel":
+        if args.output and len(args.paths) > 1:
+            parser.error("--output можно указать только для одного файла")
+        try:
+            excel_writer(args.writer)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.metrics:
+            enable_metrics(args.metrics)
+        else:
+            enable_metrics_from_env()
+        return 1 if run_json_to_excel(args.paths, args.output, args.writer) else 0
+    if args.command == "serve":
+        try:
+            serve(host=args.host, port=args.port, unix_socket=args.unix, workers=args.workers,
+                  queue_size=args.queue, max_upload=args.max_upload * 1024 * 1024,
+                  allow_paths=args.allow_paths, **conversion_options(args))
+        except ValueError as e:
+            parser.error(str(e))
+        return 0
+    if args.command == "watch":
+        watch_folders(args.folders, args.recursive, args.workers, settle=args.settle,
+                      interval=args.interval, queue_size=args.queue, existing=args.existing,
+                      polling=args.polling, **conversion_options(args))
+        return 0
+    return 0
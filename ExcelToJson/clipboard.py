@@ -0,0 +1,96 @@
+"""Копирование результата в буфер обмена"""
+import os
+from functools import lru_cache, partial
+import subprocess
+import platform
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import measure_stage
+
+# === БУФЕР ОБМЕНА ===
+# Больше этого размера (МБ) результат не копируется в буфер обмена;
+# переопределяется переменной окружения EXCELTOJSON_CLIPBOARD_MAX_MB
+CLIPBOARD_MAX_MB = 10
+
+# Фоновый поток копирования (создается при первом использовании)
+clipboard_executor = None
+
+def clipboard_max_mb():
+    """Предел размера для копирования в МБ: из окружения при каждом вызове, при ошибке - по умолчанию"""
+    value = os.environ.get('EXCELTOJSON_CLIPBOARD_MAX_MB', '').strip()
+    if not value:
+        return CLIPBOARD_MAX_MB
+    try:
+        limit = float(value)
+    except ValueError:
+        limit = -1
+    if not limit >= 0:
+        print(f"Неверное значение EXCELTOJSON_CLIPBOARD_MAX_MB={value!r} - используется {CLIPBOARD_MAX_MB} МБ")
+        return CLIPBOARD_MAX_MB
+    return limit
+
+def run_clipboard_command(command, encoding, text):
+    """Передает текст системной команде через stdin (без ограничений длины командной строки)"""
+    subprocess.run(command, input=text.encode(encoding), check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+
+@lru_cache(maxsize=None)
+def clipboard_backend():
+    """Выбирает способ копирования один раз за запуск.
+
+    Возвращает (имя, функция копирования) или None, если способа нет.
+    """
+    try:
+        # Пробуем использовать pyperclip если установлен
+        import pyperclip
+        return 'pyperclip', pyperclip.copy
+    except ImportError:
+        pass
+
+    system = platform.system()
+    if system == 'Windows':
+        # clip понимает Unicode, если текст в UTF-16 с BOM
+        candidates = [(['clip'], 'utf-16')]
+    elif system == 'Darwin':
+        candidates = [(['pbcopy'], 'utf-8')]
+    else:
+        candidates = [(['xclip', '-selection', 'clipboard'], 'utf-8'),
+                      (['xsel', '--clipboard', '--input'], 'utf-8')]
+        if os.environ.get('WAYLAND_DISPLAY'):
+            candidates.insert(0, (['wl-copy'], 'utf-8'))
+    for command, encoding in candidates:
+        if shutil.which(command[0]):
+            return command[0], partial(run_clipboard_command, command, encoding)
+    return None
+
+def copy_to_clipboard(text):
+    """Копирует текст в буфер обмена (кроссплатформенный метод)"""
+    backend = clipboard_backend()
+    if backend is None:
+        raise Exception("Не удалось скопировать в буфер обмена. Установите pyperclip: pip install pyperclip")
+    try:
+        with measure_stage('clipboard', backend=backend[0], bytes_out=len(text)):
+            backend[1](text)
+    except Exception as e:
+        raise Exception(f"Не удалось скопировать в буфер обмена ({backend[0]}): {e}")
+
+def report_clipboard_error(future):
+    """Сообщает об ошибке фонового копирования"""
+    error = future.exception()
+    if error:
+        print(f"Не удалось скопировать в буфер обмена: {error}")
+
+def copy_to_clipboard_async(text):
+    """Копирует текст в фоне и сразу возвращает Future.
+
+    Копирования выполняются по очереди в одном потоке; при выходе из программы
+    незавершенное копирование дожидается окончания.
+    """
+    global clipboard_executor
+    if clipboard_executor is None:
+        clipboard_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clipboard")
+    future = clipboard_executor.submit(copy_to_clipboard, text)
+    future.add_done_callback(report_clipboard_error)
+    return future
@@ -0,0 +1,281 @@
+"""Типы данных столбца C и конвертация значений (по одному и столбцами)"""
+import json
+from datetime import datetime, date, time, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+import importlib
+
+from .lazy import pd, np
+
+# Версия конвертера (входит в ключ кэша - при изменении правил конвертации увеличить)
+CONVERTER_VERSION = "1.1"
+
+# Синонимы типов данных в столбце C
+NUMBER_TYPES = ('number', 'int', 'integer', 'число', 'числовой')
+BOOL_TYPES = ('bool', 'boolean', 'логический')
+NULL_TYPES = ('null', 'none', 'пусто')
+STRING_TYPES = ('string', 'текст')
+FLOAT_TYPES = ('float', 'дробный')
+DATE_TYPES = ('date', 'дата')
+JSON_TYPES = ('json',)
+LIST_TYPES = ('list', 'список')
+DECIMAL_TYPES = ('decimal', 'десятичный')
+
+# Строковые представления логических значений
+BOOL_VALUES = {
+    'true': True, '1': True, 'да': True, 'yes': True, 'истина': True,
+    'false': False, '0': False, 'нет': False, 'no': False, 'ложь': False,
+}
+
+# Реестр типов: нормализованное имя типа → конвертер значения
+TYPE_REGISTRY = {}
+
+# Конвертеры целого столбца (Series без пропусков) для пакетной обработки
+COLUMN_CONVERTERS = {}
+
+def is_plain_float(value):
+    """Проверяет, что str(value) записывает число без экспоненты (т.е. с точкой)"""
+    magnitude = abs(value)
+    return magnitude == 0 or 1e-4 <= magnitude < 1e15
+
+def to_number(value):
+    """Преобразует значение в число; если не получилось - возвращает строку"""
+    # Быстрый путь: готовые числа не требуют разбора строкового представления
+    if type(value) is int:
+        return value
+    if type(value) is float and is_plain_float(value):
+        return value
+    try:
+        # Пытаемся преобразовать в число
+        if '.' in str(value):
+            return float(value)
+        else:
+            return int(value)
+    except (ValueError, TypeError):
+        # Если не получилось, возвращаем как строку
+        return str(value)
+
+def to_bool(value):
+    """Преобразует значение в логическое по словарю BOOL_VALUES"""
+    converted = BOOL_VALUES.get(str(value).strip().lower())
+    return bool(value) if converted is None else converted
+
+def to_null(value):
+    """Тип null - значение всегда пустое"""
+    return None
+
+def to_string(value):
+    """Строковый тип (экранирование выполняет JSON-сериализатор)"""
+    return str(value)
+
+def to_float(value):
+    """Преобразует значение в дробное число; если не получилось - возвращает строку"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return str(value)
+
+def to_date(value):
+    """Преобразует дату (ячейку-дату или строку ISO) в строку ГГГГ-ММ-ДД"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text).date().isoformat()
+    except ValueError:
+        return text
+
+def cell_json_value(value):
+    """Значение ячейки не из текста для типов json и list.
+
+    Дата и время записываются строкой ISO, как у строкового типа: JSON их не записывает.
+    """
+    if isinstance(value, (datetime, date, time, timedelta)):
+        return to_string(value)
+    return value
+
+def to_json(value):
+    """Разбирает строку как JSON (объект, массив, ...); если не получилось - возвращает строку"""
+    if not isinstance(value, str):
+        return cell_json_value(value)
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+def to_list(value):
+    """Преобразует значение в список: JSON-массив или элементы через запятую/точку с запятой"""
+    if not isinstance(value, str):
+        return [cell_json_value(value)]
+    text = value.strip()
+    if text.startswith('['):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return [item.strip() for item in text.replace(';', ',').split(',') if item.strip()]
+
+def to_decimal(value):
+    """Преобразует значение в Decimal без потери точности; если не получилось - в строку"""
+    try:
+        return Decimal(str(value).strip())
+    except InvalidOperation:
+        return str(value)
+
+def register_type(names, converter, column_converter=None):
+    """Регистрирует тип столбца C.
+
+    names - имя типа или кортеж синонимов (регистр и пробелы не важны),
+    converter - функция value → значение JSON (пустые значения до нее не доходят),
+    column_converter - необязательная функция Series → список значений для
+    пакетной конвертации; без нее converter вызывается для каждой ячейки.
+    """
+    if isinstance(names, str):
+        names = (names,)
+    for name in names:
+        TYPE_REGISTRY[name.strip().lower()] = converter
+    if column_converter:
+        COLUMN_CONVERTERS[converter] = column_converter
+    compile_type.cache_clear()
+
+@lru_cache(maxsize=None, typed=True)
+def compile_type(data_type):
+    """Находит конвертер для значения из столбца C (один раз на каждое значение)"""
+    return TYPE_REGISTRY.get(str(data_type).strip().lower(), to_string)
+
+def resolve_converter(data_type):
+    """Возвращает конвертер для значения из столбца C (пустое значение - string)"""
+    if data_type is None or pd.isna(data_type):
+        return to_string
+    return compile_type(data_type)
+
+def type_registry_signature():
+    """Описание реестра типов для ключа кэша: при смене конвертеров меняется и результат"""
+    return sorted(f"{name}={converter.__module__}.{converter.__qualname__}"
+                  for name, converter in TYPE_REGISTRY.items())
+
+def convert_value_by_type(value, data_type):
+    """Конвертирует значение согласно типу данных"""
+    if pd.isna(value) or value == '':
+        return None
+    return resolve_converter(data_type)(value)
+
+# === ПАКЕТНАЯ (ВЕКТОРНАЯ) КОНВЕРТАЦИЯ СТОЛБЦОВ ===
+def convert_number_column(values):
+    """Конвертирует столбец значений типа number (без пропусков)"""
+    kind = values.dtype.kind
+    if kind in 'iu':
+        return values.tolist()
+    if kind == 'b':
+        return values.astype('int64').tolist()
+    if kind == 'f':
+        array = values.to_numpy()
+        magnitude = np.abs(array)
+        plain = (magnitude == 0) | ((magnitude >= 1e-4) & (magnitude < 1e15))
+        if plain.all():
+            return array.tolist()
+        return [v if ok else to_number(v) for v, ok in zip(array.tolist(), plain.tolist())]
+    return [to_number(v) for v in values.tolist()]
+
+def convert_bool_column(values):
+    """Конвертирует столбец значений типа bool (без пропусков)"""
+    if values.dtype.kind in 'iufb':
+        # Для чисел строковое сравнение сводится к проверке на ноль
+        return (values.to_numpy() != 0).tolist()
+    return [to_bool(v) for v in values.tolist()]
+
+def convert_null_column(values):
+    """Конвертирует столбец значений типа null"""
+    return [None] * len(values)
+
+def convert_string_column(values):
+    """Конвертирует столбец значений строкового типа (без пропусков)"""
+    return [str(v) for v in values.tolist()]
+
+# Встроенные типы
+register_type(NUMBER_TYPES, to_number, convert_number_column)
+register_type(BOOL_TYPES, to_bool, convert_bool_column)
+register_type(NULL_TYPES, to_null, convert_null_column)
+register_type(STRING_TYPES, to_string, convert_string_column)
+register_type(FLOAT_TYPES, to_float)
+register_type(DATE_TYPES, to_date)
+register_type(JSON_TYPES, to_json)
+register_type(LIST_TYPES, to_list)
+register_type(DECIMAL_TYPES, to_decimal)
+
+def load_type_modules(modules):
+    """Импортирует модули, регистрирующие свои типы через register_type"""
+    for module in modules or ():
+        importlib.import_module(module)
+
+def type_converters(types):
+    """Находит конвертер для каждого уникального значения столбца C.
+
+    Возвращает коды строк и список конвертеров: последний элемент соответствует
+    коду -1 (пустой тип) - это строка.
+    """
+    codes, uniques = pd.factorize(types)
+    return codes, [resolve_converter(t) for t in uniques] + [to_string]
+
+def convert_dataframe(df):
+    """Конвертирует таблицу (A - ключ, B - значение, C - тип) в словарь.
+
+    Первая строка пропускается (заголовки). Строки группируются по конвертеру
+    типа, и каждая группа конвертируется одним проходом; результат совпадает
+    с построчным вызовом convert_value_by_type.
+    """
+    return convert_dataframe_columns(df, [1], 2 if df.shape[1] > 2 else None)[0]
+
+def convert_dataframe_columns(df, value_columns, type_column=2):
+    """Конвертирует несколько столбцов значений с общими ключами (первый столбец) и типами.
+
+    value_columns - позиции столбцов значений, type_column - позиция столбца типа
+    (None - все значения строковые). Ключи и типы разбираются один раз на все
+    столбцы. Возвращает список словарей - по одному на столбец значений.
+    """
+    # Таблица без строк данных (пустой лист или только заголовки)
+    if len(df) < 2:
+        return [{} for _ in value_columns]
+
+    body = df.iloc[1:]
+    keys = body.iloc[:, 0]
+
+    # Пропускаем пустые ключи
+    present = keys.notna().to_numpy()
+    stripped = [str(k).strip() for k in keys[present].tolist()]
+    rows = np.flatnonzero(present)[np.array([k != '' for k in stripped], dtype=bool)]
+    key_list = [k for k in stripped if k != '']
+
+    if type_column is not None:
+        codes, converters = type_converters(body.iloc[rows, type_column])
+    else:
+        codes, converters = np.full(len(rows), -1), [to_string]
+
+    # Собираем коды типов с одинаковым конвертером в одну группу
+    groups = {}
+    for code, converter in enumerate(converters[:-1]):
+        groups.setdefault(converter, []).append(code)
+    groups.setdefault(converters[-1], []).append(-1)
+    group_masks = [(converter, np.isin(codes, group_codes)) for converter, group_codes in groups.items()]
+
+    results = []
+    for position in value_columns:
+        values = body.iloc[rows, position]
+        # Пустые значения дают None - это значение массива по умолчанию
+        converted = np.empty(len(rows), dtype=object)
+        filled = ~(values.isna() | (values == '')).to_numpy()
+        for converter, type_mask in group_masks:
+            mask = type_mask & filled
+            if mask.any():
+                column_converter = COLUMN_CONVERTERS.get(converter)
+                group_values = values[mask]
+                if column_converter:
+                    items = column_converter(group_values)
+                else:
+                    items = [converter(v) for v in group_values.tolist()]
+                # fromiter не разворачивает значения-списки в отдельное измерение массива
+                converted[mask] = np.fromiter(items, dtype=object, count=len(items))
+        results.append(dict(zip(key_list, converted.tolist())))
+    return results
@@ -0,0 +1,426 @@
+"""Конвертация книги Excel в файл JSON (один лист, несколько листов или столбцов значений)"""
+import os
+from datetime import datetime
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .lazy import pd
+from .conversion import convert_dataframe, convert_dataframe_columns, type_registry_signature
+from .metrics import emit_stage, measure_stage
+from .clipboard import clipboard_backend, clipboard_max_mb, copy_to_clipboard_async
+from .readers import (
+    choose_reader, iter_converted_columns, iter_converted_rows, iter_worksheet_rows,
+    open_workbook_streaming, reader_engine
+)
+from .writer import (
+    _encode_plain, check_cancelled, check_output_options, open_output, output_extension,
+    write_json_file, write_json_pairs,
+)
+from .cache import cache_key, cache_load, cache_store, copy_atomic, default_cache_dir
+from .diff import find_previous_output, index_output, patch_summary, write_output_patch
+
+def build_json_save_path(excel_path, suffix=None, extension='.json'):
+    """Возвращает путь для сохранения JSON рядом с исходным файлом.
+
+    suffix (например, имя листа) добавляется к имени файла перед датой,
+    extension - расширение (см. output_extension).
+    """
+    folder = os.path.dirname(excel_path)
+    base_name = os.path.splitext(os.path.basename(excel_path))[0]
+    if suffix:
+        base_name = f"{base_name}_{safe_file_name(suffix)}"
+    timestamp = datetime.now().strftime("%Y.%m.%d_%H-%M")
+    return os.path.join(folder, f"{base_name}_{timestamp}{extension}")
+
+def build_json_save_paths(excel_path, suffixes, extension='.json'):
+    """Пути результатов для нескольких суффиксов (листов, вариантов): словарь суффикс → путь.
+
+    Суффиксы, совпадающие после замены недопустимых символов или без учета регистра
+    (A/B и A_B), получают номер: <книга>_A_B_2_<дата>.json.
+    """
+    paths = {}
+    used = set()
+    for suffix in suffixes:
+        base = name = safe_file_name(suffix)
+        number = 1
+        while name.lower() in used:
+            number += 1
+            name = f"{base}_{number}"
+        used.add(name.lower())
+        paths[suffix] = build_json_save_path(excel_path, name, extension)
+    return paths
+
+def safe_file_name(name):
+    """Заменяет символы, недопустимые в именах файлов"""
+    return ''.join('_' if ch in '<>:"/\\|?*' or ord(ch) < 32 else ch for ch in str(name)).strip() or '_'
+
+def convert_excel_file(excel_path, copy_result=True, on_stage=None, reader='auto',
+                       use_cache=True, cache_dir=None, on_progress=None, cancel=None,
+                       json_format='pretty', compression=None, json_backend='auto',
+                       incremental=False, baseline=None, skip_unchanged=False):
+    """Конвертирует Excel файл в JSON без участия GUI.
+
+    Возвращает словарь с ключами save_path, rows, cached (результат взят из кэша),
+    copied (начато фоновое копирование в буфер обмена, clipboard - его Future)
+    и json_str - строка JSON, которая собирается только для копирования
+    в буфер обмена (иначе None).
+    Ошибки не перехватываются - их обрабатывает вызывающий код
+    (окно конвертации или пакетный режим).
+    on_stage - необязательная функция, получающая текст текущего этапа.
+    reader - движок чтения: auto или имя из READER_ENGINES (pandas, stream, calamine).
+    use_cache - искать результат в кэше по содержимому книги (cache_dir - папка кэша).
+    on_progress(done, total) - прогресс по строкам, cancel - threading.Event для отмены
+    (при отмене выбрасывается ConversionCancelled).
+    json_format - pretty, compact или ndjson (см. JSON_FORMATS), compression - None,
+    gzip или zstd, json_backend - кодировщик (auto, orjson, json; результат одинаков).
+    incremental - рядом с результатом записать JSON Patch (RFC 6902) к предыдущему
+    результату <книга>_<дата>.json или к файлу baseline (ключи patch_path, changes,
+    unchanged, baseline); skip_unchanged - без изменений не оставлять новый файл
+    (save_path указывает на предыдущий).
+    """
+    started = time.perf_counter()
+    cache_dir = cache_dir or default_cache_dir()
+    check_output_options(json_format, compression, json_backend)
+    options = {'reader': choose_reader(excel_path, reader), 'types': type_registry_signature(),
+               'format': json_format, 'compression': compression}
+    with measure_stage('cache_lookup', file=excel_path, bytes_in=os.path.getsize(excel_path)) as stage:
+        key = cache_key(excel_path, options) if use_cache else None
+        cached = cache_load(cache_dir, key) if key else None
+        stage.update(enabled=bool(key), hit=bool(cached))
+
+    # Определяем путь для сохранения (рядом с исходным файлом)
+    save_path = build_json_save_path(excel_path, extension=output_extension(json_format, compression))
+
+    # Предыдущий результат индексируется до записи: за ту же минуту он перезаписывается
+    index = None
+    if incremental or baseline:
+        baseline = baseline or find_previous_output(excel_path)
+        if baseline:
+            index = index_output(baseline)
+
+    if cached:
+        cached_path, meta = cached
+        rows = meta['rows']
+        with measure_stage('cache_copy', file=excel_path, rows=rows, bytes_out=os.path.getsize(cached_path)):
+            copy_atomic(cached_path, save_path)
+    else:
+        # Строки конвертируются и пишутся в файл порциями, без сборки всей строки JSON
+        rows = write_json_file(save_path, excel_path, reader, on_progress, cancel,
+                               json_format, compression, json_backend, on_stage)
+
+        if key:
+            try:
+                with measure_stage('cache_store', file=excel_path, bytes_out=os.path.getsize(save_path)):
+                    cache_store(cache_dir, key, save_path, {
+                        'source': os.path.abspath(excel_path), 'rows': rows,
+                        'seconds': time.perf_counter() - started,
+                    })
+            except OSError as e:
+                print(f"Не удалось сохранить результат в кэш: {e}")
+
+    patch_path = patch = None
+    if index is not None:
+        if on_stage:
+            on_stage("Сравнение с предыдущим результатом...")
+        patch_path, patch = write_output_patch(index, save_path, baseline)
+        if not patch and skip_unchanged and os.path.abspath(save_path) != os.path.abspath(baseline):
+            os.remove(save_path)
+            save_path = baseline
+
+    json_str = None
+    clipboard = None
+    check_cancelled(cancel)
+    if copy_result:
+        max_mb = clipboard_max_mb()
+        if compression:
+            print("Сжатый результат в буфер обмена не копируется")
+        elif os.path.getsize(save_path) > max_mb * 1024 * 1024:
+            print(f"JSON больше {max_mb:g} МБ - в буфер обмена не копируется")
+        elif clipboard_backend() is None:
+            print("Не удалось скопировать в буфер обмена. Установите pyperclip: pip install pyperclip")
+        else:
+            with measure_stage('clipboard_read', file=save_path, bytes_in=os.path.getsize(save_path)), \
+                    open(save_path, 'r', encoding='utf-8') as f:
+                json_str = f.read()
+
+            # Копируем JSON в буфер обмена в фоне - конвертация не ждет окончания
+            clipboard = copy_to_clipboard_async(json_str)
+
+    emit_stage('convert_excel_file', started, file=excel_path, rows=rows, cached=bool(cached),
+               bytes_in=os.path.getsize(excel_path), bytes_out=os.path.getsize(save_path))
+    return {
+        'save_path': save_path, 'json_str': json_str, 'rows': rows,
+        'cached': bool(cached), 'copied': clipboard is not None, 'clipboard': clipboard,
+        # Для попадания в кэш - сколько заняла исходная конвертация
+        'saved_seconds': cached[1].get('seconds', 0) if cached else 0,
+        'baseline': baseline if index is not None else None, 'patch_path': patch_path,
+        'changes': patch_summary(patch) if patch is not None else None,
+        'unchanged': patch == [],
+    }
+
+# === КОНВЕРТАЦИЯ НЕСКОЛЬКИХ ЛИСТОВ ===
+# Режимы вывода для нескольких листов: отдельный JSON на лист или общий документ
+SHEET_OUTPUTS = ('split', 'combined')
+
+# Суффикс имени общего документа листов: <книга>_sheets_<дата>.json (не совпадает
+# с именем результата одного листа)
+COMBINED_SHEETS_SUFFIX = 'sheets'
+
+def read_workbook_sheets(excel_path, sheets=None, reader='auto'):
+    """Читает книгу один раз и возвращает словарь имя листа → результат конвертации.
+
+    sheets - список имен листов (None - все листы). Для листа, который не удалось
+    конвертировать, вместо словаря возвращается исключение.
+    """
+    engine = reader_engine(excel_path, reader)
+    if engine.streaming:
+        # Книга открывается один раз; read_only-книгу читаем из одного потока
+        results = {}
+        workbook = open_workbook_streaming(excel_path)
+        try:
+            names = workbook.sheetnames if sheets is None else sheets
+            for name in names:
+                try:
+                    results[name] = dict(iter_converted_rows(iter_worksheet_rows(workbook[name])))
+                except Exception as e:
+                    results[name] = e
+        finally:
+            workbook.close()
+        return results
+
+    # pandas открывает архив один раз и разбирает только нужные листы
+    frames = engine.read_frame(excel_path, sheet_name=sheets, usecols=lambda column: column < 3)
+    return {name: frame for name, frame in frames.items()}
+
+def convert_sheet_frame(frame):
+    """Конвертирует DataFrame листа; ошибку возвращает вместо результата"""
+    try:
+        return convert_dataframe(frame)
+    except Exception as e:
+        return e
+
+def write_sheet_json(save_path, result, json_format='pretty', compression=None, backend='auto'):
+    """Записывает результат одного листа в файл JSON"""
+    temp_path = f"{save_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open_output(temp_path, compression) as f:
+            write_json_pairs(f, result.items(), json_format=json_format, backend=backend)
+        os.replace(temp_path, save_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def write_combined_json(save_path, results, json_format='pretty', compression=None, backend='auto'):
+    """Записывает общий документ {имя листа: {ключ: значение}} (листы с ошибками пропускаются).
+
+    Поддерживаются форматы pretty и compact: в ndjson общий документ не укладывается.
+    """
+    if json_format == 'ndjson':
+        raise ValueError("Общий документ листов нельзя записать в формате ndjson")
+    # pretty: ключ листа с новой строки и отступом, compact - без пробелов
+    opening, separator, closing = ('\n  ', ': ', '\n}') if json_format == 'pretty' else ('', ':', '}')
+    temp_path = f"{save_path}.{os.getpid()}.tmp"
+    try:
+        with open_output(temp_path, compression) as f:
+            count = 0
+            for name, result in results.items():
+                if isinstance(result, Exception):
+                    continue
+                f.write(f"{',' if count else '{'}{opening}{_encode_plain(str(name))}{separator}")
+                write_json_pairs(f, result.items(), level=1, json_format=json_format, backend=backend)
+                count += 1
+            f.write(closing if count else '{}')
+        os.replace(temp_path, save_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def convert_workbook_sheets(excel_path, sheets=None, output='split', reader='auto',
+                            workers=None, on_stage=None, json_format='pretty', compression=None,
+                            json_backend='auto'):
+    """Конвертирует несколько листов книги за одно чтение.
+
+    sheets - список имен листов (None - все), output - split (JSON на каждый лист,
+    <книга>_<лист>_<дата>.json, см. build_json_save_paths) или combined (один JSON с ключами-именами листов,
+    <книга>_sheets_<дата>.json).
+    Конвертация и запись листов распределяются по пулу потоков (workers).
+    json_format, compression, json_backend - как в convert_excel_file
+    (combined не поддерживает ndjson). Возвращает словарь с ключами save_paths, rows (всего ключей) и sheets
+    (имя листа → {'rows', 'save_path', 'error'}).
+    """
+    if output not in SHEET_OUTPUTS:
+        raise ValueError(f"Неизвестный режим вывода листов: {output}")
+    check_output_options(json_format, compression, json_backend)
+    if output == 'combined' and json_format == 'ndjson':
+        raise ValueError("Общий документ листов нельзя записать в формате ndjson")
+    extension = output_extension(json_format, compression)
+    if on_stage:
+        on_stage("Чтение книги...")
+    with measure_stage('read_workbook', file=excel_path, bytes_in=os.path.getsize(excel_path)) as stage:
+        sheet_data = read_workbook_sheets(excel_path, sheets, reader)
+        stage.update(sheets=len(sheet_data))
+
+    if on_stage:
+        on_stage("Конвертация листов...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Листы, прочитанные pandas, конвертируются параллельно
+        futures = {name: pool.submit(convert_sheet_frame, data) for name, data in sheet_data.items()
+                   if isinstance(data, pd.DataFrame)}
+        results = {name: futures[name].result() if name in futures else data
+                   for name, data in sheet_data.items()}
+
+        summary = {name: {'rows': 0 if isinstance(result, Exception) else len(result),
+                          'save_path': None,
+                          'error': str(result) if isinstance(result, Exception) else None}
+                   for name, result in results.items()}
+
+        if on_stage:
+            on_stage("Сохранение файлов...")
+        if output == 'combined':
+            save_path = build_json_save_path(excel_path, COMBINED_SHEETS_SUFFIX, extension)
+            write_combined_json(save_path, results, json_format, compression, json_backend)
+            save_paths = [save_path]
+            for info in summary.values():
+                if not info['error']:
+                    info['save_path'] = save_path
+        else:
+            writes = {}
+            paths = build_json_save_paths(excel_path, [name for name, result in results.items()
+                                                       if not isinstance(result, Exception)], extension)
+            for name, result in results.items():
+                if not isinstance(result, Exception):
+                    summary[name]['save_path'] = paths[name]
+                    writes[name] = pool.submit(write_sheet_json, summary[name]['save_path'], result,
+                                               json_format, compression, json_backend)
+            for name, future in writes.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    summary[name].update(save_path=None, error=str(e))
+            save_paths = [info['save_path'] for info in summary.values() if info['save_path']]
+
+    return {
+        'save_paths': save_paths,
+        'rows': sum(info['rows'] for info in summary.values() if not info['error']),
+        'sheets': summary,
+    }
+
+# === НЕСКОЛЬКО СТОЛБЦОВ ЗНАЧЕНИЙ ===
+def parse_column(column):
+    """Позиция столбца (с нуля) по букве (A, B, ..., AA) или номеру с единицы"""
+    text = str(column).strip()
+    if text.isascii() and text.isdigit() and int(text) > 0:
+        return int(text) - 1
+    # Проверяем до upper(): 'ß'.upper() дает латинские 'SS'
+    if not text or not text.isascii() or not text.isalpha():
+        raise ValueError(f"Неверный столбец: {column!r} (ожидается буква, например B, или номер)")
+    position = 0
+    for letter in text.upper():
+        position = position * 26 + ord(letter) - ord('A') + 1
+    return position - 1
+
+def column_letter(position):
+    """Буква столбца по позиции с нуля (0 → A, 26 → AA)"""
+    letters = ''
+    position += 1
+    while position:
+        position, rest = divmod(position - 1, 26)
+        letters = chr(ord('A') + rest) + letters
+    return letters
+
+def check_value_columns(columns, key_column, type_column):
+    """Проверяет, что столбцы значений (имя → позиция) не совпадают со столбцами ключей и типов"""
+    if key_column == type_column:
+        raise ValueError(f"Столбец ключей и столбец типов совпадают ({column_letter(key_column)})")
+    for name, position in columns.items():
+        if position in (key_column, type_column):
+            role = 'ключей' if position == key_column else 'типов'
+            raise ValueError(f"Столбец варианта {name} ({column_letter(position)}) совпадает со столбцом {role}")
+
+def parse_column_map(text):
+    """Разбирает 'dev=B,test=D,prod=E' в словарь имя варианта → позиция столбца"""
+    columns = {}
+    for item in text.split(','):
+        name, sep, column = item.partition('=')
+        name = name.strip()
+        if not sep or not name:
+            raise ValueError(f"Неверное описание столбца: {item.strip()!r} (ожидается имя=столбец)")
+        if name in columns:
+            raise ValueError(f"Вариант {name} указан дважды")
+        columns[name] = parse_column(column)
+    return columns
+
+def read_value_columns(excel_path, positions, reader='auto'):
+    """Читает лист один раз и конвертирует столбцы значений с общими ключами и типами.
+
+    positions - позиции столбцов (ключ, тип, значения...). Возвращает список
+    словарей - по одному на столбец значений.
+    """
+    engine = reader_engine(excel_path, reader)
+    count = len(positions) - 2
+    if engine.streaming:
+        workbook = open_workbook_streaming(excel_path)
+        try:
+            results = [{} for _ in range(count)]
+            rows = iter_worksheet_rows(workbook.worksheets[0], positions)
+            for key, values in iter_converted_columns(rows):
+                for result, value in zip(results, values):
+                    result[key] = value
+        finally:
+            workbook.close()
+        return results
+
+    wanted = set(positions)
+    frame = engine.read_frame(excel_path, usecols=lambda column: column in wanted)
+    # Столбцы вне заполненной части листа читаются как пустые
+    frame = frame.reindex(columns=positions)
+    frame.columns = range(len(positions))
+    return convert_dataframe_columns(frame, list(range(2, len(positions))), 1)
+
+def convert_workbook_columns(excel_path, columns, key_column='A', type_column='C', reader='auto',
+                             workers=None, on_stage=None, json_format='pretty', compression=None,
+                             json_backend='auto'):
+    """Конвертирует несколько столбцов значений первого листа в отдельные JSON за одно чтение.
+
+    columns - словарь имя варианта → столбец значений (буква или позиция с нуля,
+    см. parse_column_map), key_column и type_column - столбцы ключа и типа.
+    Каждый вариант пишется в <книга>_<имя>_<дата>.json (см. build_json_save_paths);
+    файлы записываются параллельно в пуле потоков (workers). Столбцы значений не
+    должны совпадать со столбцами ключей и типов. Возвращает словарь с ключами
+    save_paths, rows (всего ключей) и columns (имя → {'rows', 'save_path', 'error'}).
+    """
+    if not columns:
+        raise ValueError("Не указаны столбцы значений")
+    check_output_options(json_format, compression, json_backend)
+    extension = output_extension(json_format, compression)
+    positions = [column if isinstance(column, int) else parse_column(column)
+                 for column in (key_column, type_column, *columns.values())]
+    check_value_columns(dict(zip(columns, positions[2:])), positions[0], positions[1])
+    if on_stage:
+        on_stage("Чтение книги...")
+    with measure_stage('read_columns', file=excel_path, bytes_in=os.path.getsize(excel_path),
+                       columns=len(columns)) as stage:
+        results = dict(zip(columns, read_value_columns(excel_path, positions, reader)))
+        stage.update(rows=sum(len(result) for result in results.values()))
+
+    if on_stage:
+        on_stage("Сохранение файлов...")
+    paths = build_json_save_paths(excel_path, results, extension)
+    summary = {name: {'rows': len(result), 'save_path': paths[name], 'error': None}
+               for name, result in results.items()}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        writes = {name: pool.submit(write_sheet_json, summary[name]['save_path'], result,
+                                    json_format, compression, json_backend)
+                  for name, result in results.items()}
+        for name, future in writes.items():
+            try:
+                future.result()
+            except Exception as e:
+                summary[name].update(save_path=None, error=str(e))
+
+    return {
+        'save_paths': [info['save_path'] for info in summary.values() if info['save_path']],
+        'rows': sum(info['rows'] for info in summary.values() if not info['error']),
+        'columns': summary,
+    }
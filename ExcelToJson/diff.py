@@ -0,0 +1,127 @@
+"""Инкрементальная конвертация: JSON Patch (RFC 6902) к предыдущему результату"""
+import json
+import os
+import re
+import io
+import hashlib
+
+from .metrics import measure_stage
+from .cache import write_atomic
+
+# === ПРЕДЫДУЩИЙ РЕЗУЛЬТАТ ===
+# Имя результата: <книга>_<ГГГГ.ММ.ДД_ЧЧ-ММ><расширение>; патчи (.patch.json) сюда не попадают
+OUTPUT_NAME_PATTERN = r'_(\d{4}\.\d{2}\.\d{2}_\d{2}-\d{2})(\.json|\.ndjson)(\.gz|\.zst)?'
+PATCH_EXTENSION = '.patch.json'
+
+def find_previous_output(excel_path):
+    """Возвращает путь к последнему результату <книга>_<дата>.json рядом с книгой или None.
+
+    Подходят и сжатые/NDJSON-результаты; последний определяется по дате в имени,
+    при равной дате (несколько запусков за минуту) - по времени изменения.
+    Результаты листов (<книга>_<лист>_<дата>) и общий документ листов
+    (<книга>_sheets_<дата>) по имени не подходят.
+    """
+    folder = os.path.dirname(excel_path) or '.'
+    base_name = os.path.splitext(os.path.basename(excel_path))[0]
+    pattern = re.compile(re.escape(base_name) + OUTPUT_NAME_PATTERN + '$')
+    found = []
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return None
+    for name in names:
+        match = pattern.match(name)
+        path = os.path.join(folder, name)
+        if match and os.path.isfile(path):
+            found.append((match.group(1), os.path.getmtime(path), path))
+    return max(found)[2] if found else None
+
+def open_json_input(path):
+    """Открывает результат на чтение текста с учетом сжатия по расширению (.gz, .zst)"""
+    if path.endswith('.gz'):
+        import gzip
+
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Для чтения .zst установите пакет zstandard (pip install zstandard)")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True),
+                                encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def iter_output_pairs(path):
+    """Возвращает пары (ключ, значение) результата: объекта JSON или строк NDJSON"""
+    with open_json_input(path) as f:
+        if '.ndjson' in os.path.basename(path):
+            for line in f:
+                if line.strip():
+                    yield from json.loads(line).items()
+            return
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: ожидался объект JSON")
+    yield from data.items()
+
+def value_fingerprint(value):
+    """Отпечаток значения: хэш канонической записи (1, 1.0 и true различаются)"""
+    text = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def index_output(path):
+    """Индекс ключей результата: ключ → отпечаток значения (сами значения не хранятся)"""
+    with measure_stage('diff_index', file=path, bytes_in=os.path.getsize(path)) as stage:
+        index = {key: value_fingerprint(value) for key, value in iter_output_pairs(path)}
+        stage.update(rows=len(index))
+    return index
+
+# === JSON PATCH ===
+def json_pointer(key):
+    """Путь JSON Pointer (RFC 6901) к ключу верхнего уровня"""
+    return '/' + key.replace('~', '~0').replace('/', '~1')
+
+def diff_pairs(index, pairs):
+    """Строит операции JSON Patch от индекса старого результата к новым парам.
+
+    Новые и измененные ключи идут в порядке нового документа, удаленные - в порядке старого.
+    """
+    patch = []
+    seen = set()
+    for key, value in pairs:
+        seen.add(key)
+        old = index.get(key)
+        if old is None:
+            patch.append({'op': 'add', 'path': json_pointer(key), 'value': value})
+        elif old != value_fingerprint(value):
+            patch.append({'op': 'replace', 'path': json_pointer(key), 'value': value})
+    patch.extend({'op': 'remove', 'path': json_pointer(key)} for key in index if key not in seen)
+    return patch
+
+def patch_summary(patch):
+    """Число операций по видам: {'add': n, 'replace': n, 'remove': n}"""
+    summary = {'add': 0, 'replace': 0, 'remove': 0}
+    for operation in patch:
+        summary[operation['op']] += 1
+    return summary
+
+def build_patch_path(save_path):
+    """Путь патча рядом с полным результатом: <книга>_<дата>.patch.json"""
+    name = os.path.basename(save_path)
+    stem = re.sub(r'(\.json|\.ndjson)(\.gz|\.zst)?$', '', name)
+    return os.path.join(os.path.dirname(save_path), stem + PATCH_EXTENSION)
+
+def write_output_patch(index, save_path, baseline_path):
+    """Сравнивает новый результат с индексом старого и записывает патч рядом с ним.
+
+    Пустой патч не записывается. Возвращает (путь патча или None, операции).
+    """
+    with measure_stage('diff', file=save_path, baseline=baseline_path) as stage:
+        patch = diff_pairs(index, iter_output_pairs(save_path))
+        stage.update(rows=len(patch))
+        if not patch:
+            return None, patch
+        patch_path = build_patch_path(save_path)
+        write_atomic(patch_path, json.dumps(patch, ensure_ascii=False, indent=2))
+        stage.update(bytes_out=os.path.getsize(patch_path))
+    return patch_path, patch
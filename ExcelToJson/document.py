@@ -0,0 +1,198 @@
+"""Проверка текста JSON и документ для больших файлов (без Tk)"""
+import json
+import os
+import mmap
+
+from .lazy import np
+
+def check_json_text(content):
+    """Проверяет текст JSON и возвращает результат для show_validation_result:
+    ('empty',), ('ok',), ('error', строка, сообщение) или ('exception', текст)
+    """
+    if not content:
+        return ('empty',)
+    try:
+        json.loads(content)
+        return ('ok',)
+    except json.JSONDecodeError as e:
+        return ('error', e.lineno, e.msg)
+    except Exception as ex:
+        return ('exception', str(ex))
+
+# Сколько байт LineDocument.get_lines отдает за раз по умолчанию (предел окна редактора)
+LARGE_WINDOW_MAX_BYTES = 4 * 1024 * 1024
+
+# Индекс хранит смещение каждой N-й строки - память почти не зависит от размера файла
+LINE_INDEX_STEP = 64
+LINE_INDEX_CHUNK_BYTES = 16 * 1024 * 1024
+
+class LineDocument:
+    """Документ из файла, отображенного в память (mmap), с таблицей фрагментов для правок.
+
+    Документ - последовательность строк (с символами перевода строки).
+    Фрагменты: ('orig', a, b) - строки a..b-1 исходного файла,
+    ('add', [строки]) - строки, введенные пользователем.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._size = len(self._mm)
+        self._index, self._orig_total = self._build_line_index()
+        self.pieces = [('orig', 0, self._orig_total)] if self._orig_total else []
+        # Строки исходного документа, показанные в Text, и версия текста на момент показа
+        self.window = (0, 0)
+        self.window_generation = None
+        self.newline = '\r\n' if self._mm.find(b'\r\n', 0, 64 * 1024) >= 0 else '\n'
+        # Файл - временный результат переформатирования: редактор удаляет его при закрытии
+        self.temporary = False
+
+    def _build_line_index(self):
+        """Один раз проходит файл и запоминает смещения каждой LINE_INDEX_STEP-й строки"""
+        parts = [np.zeros(1, dtype=np.int64)]
+        starts = 1  # число найденных начал строк (строка 0 начинается с 0)
+        for chunk_start in range(0, self._size, LINE_INDEX_CHUNK_BYTES):
+            count = min(LINE_INDEX_CHUNK_BYTES, self._size - chunk_start)
+            chunk = np.frombuffer(self._mm, dtype=np.uint8, count=count, offset=chunk_start)
+            newlines = np.flatnonzero(chunk == 10)
+            del chunk  # mmap нельзя закрыть, пока на него есть ссылки из numpy
+            first = (-starts) % LINE_INDEX_STEP
+            parts.append(newlines[first::LINE_INDEX_STEP].astype(np.int64) + chunk_start + 1)
+            starts += len(newlines)
+        # Перевод строки в конце файла не начинает новую строку
+        total = starts - 1 if self._size and self._mm[self._size - 1] == 10 else starts
+        return np.concatenate(parts), (total if self._size else 0)
+
+    def _line_offset(self, line):
+        """Смещение начала строки исходного файла: ближайшая точка индекса + поиск вперед"""
+        if line >= self._orig_total:
+            return self._size
+        pos = int(self._index[line // LINE_INDEX_STEP])
+        for _ in range(line % LINE_INDEX_STEP):
+            pos = self._mm.find(b'\n', pos) + 1
+        return pos
+
+    def _orig_lines(self, a, b, max_bytes):
+        """Читает строки a..b-1 исходного файла, пока не превышен max_bytes.
+
+        Возвращает (строки, truncated): если первая же строка больше max_bytes,
+        читается только ее начало и truncated = True.
+        """
+        lines = []
+        read = 0
+        pos = self._line_offset(a)
+        for _ in range(a, b):
+            end = self._mm.find(b'\n', pos)
+            end = self._size if end < 0 else end + 1
+            if end - pos > max_bytes and not lines:
+                return [self._mm[pos:pos + max_bytes].decode('utf-8', errors='ignore')], True
+            if read + end - pos > max_bytes:
+                break
+            lines.append(self._mm[pos:end].decode('utf-8', errors='replace'))
+            read += end - pos
+            pos = end
+        return lines, False
+
+    @property
+    def line_count(self):
+        """Число строк документа с учетом правок"""
+        return sum(piece[2] - piece[1] if piece[0] == 'orig' else len(piece[1])
+                   for piece in self.pieces)
+
+    def get_lines(self, start, stop, max_bytes=LARGE_WINDOW_MAX_BYTES):
+        """Возвращает (строки start..stop-1, truncated) - не больше max_bytes, но хотя бы одну.
+
+        truncated = True, если единственная строка слишком длинная и прочитано только ее начало.
+        """
+        lines = []
+        read = 0
+        position = 0
+        for piece in self.pieces:
+            length = piece[2] - piece[1] if piece[0] == 'orig' else len(piece[1])
+            offset = position
+            position += length
+            a, b = max(start, offset), min(stop, position)
+            if a >= b:
+                continue
+            if piece[0] == 'orig':
+                chunk, truncated = self._orig_lines(piece[1] + a - offset, piece[1] + b - offset,
+                                                    max_bytes - read if lines else max_bytes)
+                if truncated:
+                    return (lines, False) if lines else (chunk, True)
+            else:
+                chunk = piece[1][a - offset:b - offset]
+            for line in chunk:
+                if lines and read + len(line) > max_bytes:
+                    return lines, False
+                lines.append(line)
+                read += len(line)
+            if position >= stop:
+                break
+        return lines, False
+
+    def _split(self, line):
+        """Разрезает фрагменты так, чтобы на позиции line начинался новый фрагмент"""
+        position = 0
+        for i, piece in enumerate(self.pieces):
+            length = piece[2] - piece[1] if piece[0] == 'orig' else len(piece[1])
+            if position == line:
+                return i
+            if position < line < position + length:
+                cut = line - position
+                if piece[0] == 'orig':
+                    left, right = ('orig', piece[1], piece[1] + cut), ('orig', piece[1] + cut, piece[2])
+                else:
+                    left, right = ('add', piece[1][:cut]), ('add', piece[1][cut:])
+                self.pieces[i:i + 1] = [left, right]
+                return i + 1
+            position += length
+        return len(self.pieces)
+
+    def replace_lines(self, start, stop, lines):
+        """Заменяет строки start..stop-1 новыми строками"""
+        first = self._split(start)
+        last = self._split(stop)
+        self.pieces[first:last] = [('add', list(lines))] if lines else []
+
+    def iter_chunks(self, chunk_bytes=1024 * 1024, pieces=None):
+        """Выдает содержимое документа блоками байтов для потоковой записи.
+
+        pieces - снимок self.pieces для чтения из другого потока, пока документ правится.
+        """
+        for piece in self.pieces if pieces is None else pieces:
+            if piece[0] == 'orig':
+                start = self._line_offset(piece[1])
+                end = self._line_offset(piece[2])
+                for pos in range(start, end, chunk_bytes):
+                    yield self._mm[pos:min(pos + chunk_bytes, end)]
+            else:
+                for i in range(0, len(piece[1]), 1000):
+                    yield ''.join(piece[1][i:i + 1000]).encode('utf-8')
+
+    def save(self, save_path):
+        """Потоково записывает документ во временный файл и переименовывает его в save_path.
+
+        Документ при этом закрывается - дальше работать с файлом по новому пути.
+        """
+        temp_path = f"{save_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                for chunk in self.iter_chunks():
+                    f.write(chunk)
+            # На Windows нельзя заменить файл, пока он отображен в память
+            self.close()
+            os.replace(temp_path, save_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @property
+    def closed(self):
+        return self._mm.closed
+
+    def close(self):
+        """Освобождает отображение файла"""
+        if not self._mm.closed:
+            self._mm.close()
+            self._file.close()
@@ -0,0 +1,1765 @@
+"""Окна программы: конвертер, JSON-редактор и главное меню (tkinter)"""
+from tkinter import *
+from tkinter import ttk
+from tkinter import filedialog, messagebox
+import os
+import sys
+from datetime import datetime
+import time
+import queue
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .metrics import emit_stage, measure_stage
+from .writer import ConversionCancelled
+from .convert import convert_excel_file
+from .reverse import json_to_excel_file
+from .document import LineDocument, check_json_text
+from .lexer import INITIAL_STATE, TOKEN_TAGS, WINDOW_STATE, IncrementalLexer
+from .reformat import REFORMAT_CHUNK_CHARS, ReformatError, decode_chunks, reformat_json
+from .outline import build_structure_index, child_path, lines_edit
+
+# Глобальные переменные
+ask_window = None
+current_file_path = None
+text_widget = None
+status_label = None
+editor_win = None
+converter_win = None
+progress_bar = None
+convert_button = None
+excel_button = None
+cancel_button = None
+cancel_event = None
+
+# Период опроса очереди событий фоновой конвертации (мс)
+POLL_INTERVAL_MS = 100
+
+# Состояние проверки JSON в редакторе
+edit_generation = 0        # номер версии текста, растет при каждом изменении
+validation_job = None      # отложенная проверка (after)
+validation_future = None   # проверка, выполняемая в отдельном процессе
+validation_result = None   # (версия текста, результат check_json_text)
+validation_pool = None
+
+# Большой файл, открытый в режиме окна (LineDocument), и полоса прокрутки редактора
+large_document = None
+large_recenter_job = None
+editor_scroll_y = None
+
+# Пауза в наборе, после которой запускается проверка (мс)
+VALIDATION_DELAY_MS = 500
+
+# Текст короче этого проверяется сразу, без передачи в другой процесс
+VALIDATION_INLINE_CHARS = 256 * 1024
+
+# Подсветка синтаксиса и список ошибок (разбор по строкам, см. lexer)
+editor_lexer = None
+highlight_job = None
+error_scan_job = None
+error_frame = None
+error_listbox = None
+error_items = []           # (строка, столбец) для пунктов списка ошибок
+
+# Цвета подсветки JSON
+HIGHLIGHT_COLORS = {
+    'json_key': "#0451a5", 'json_string': "#a31515", 'json_number': "#098658",
+    'json_literal': "#0000ff", 'json_punct': "#555555",
+}
+
+# Сколько строк разбирается за один шаг фонового поиска ошибок (окно не замирает)
+# и сколько ошибок показывается в списке
+ERROR_SCAN_LINES = 2000
+ERROR_LIST_LIMIT = 500
+
+# Переформатирование текста редактора (см. reformat): флаг отмены выполняемого
+# и результат, который вставляется в Text, - (открытый файл, путь)
+reformat_cancel = None
+reformat_output = None
+
+# Сколько символов результата вставляется в Text за один шаг (окно не замирает)
+REFORMAT_INSERT_CHARS = 256 * 1024
+
+# Структура документа и переход по пути ключа
+structure_index = None     # StructureIndex текущего текста (правки учитываются по мере набора)
+structure_build = None     # фоновое построение: (cancel, правки, сделанные за время построения)
+outline_tree = None
+outline_entry = None
+outline_search_job = None
+outline_items = {}         # пункт дерева → путь ключа
+outline_more = {}          # пункт «ещё N» → (родительский пункт, путь, с какого элемента)
+outline_opened = []        # пути раскрытых узлов (сохраняются, пока дерево показывает поиск)
+outline_searching = False  # дерево показывает найденные пути, а не структуру
+
+# Сколько элементов узла показывается в дереве за раз и сколько путей - при поиске
+OUTLINE_CHILDREN_LIMIT = 1000
+OUTLINE_SEARCH_LIMIT = 200
+
+
+def place_window_near_cursor(window, width, height, dx=0, dy=0, screen_margin=20):
+    x, y = window.winfo_pointerxy()
+    screen_width = window.winfo_screenwidth()
+    screen_height = window.winfo_screenheight()
+
+    win_x = x + dx
+    win_y = y + dy
+
+    if win_x + width > screen_width - screen_margin:
+        win_x = screen_width - width - screen_margin
+    if win_y + height > screen_height - screen_margin:
+        win_y = screen_height - height - screen_margin
+    if win_x < screen_margin:
+        win_x = screen_margin
+    if win_y < screen_margin:
+        win_y = screen_margin
+
+    window.geometry(f"{width}x{height}+{win_x}+{win_y}")
+
+def select_excel_file():
+    """Открывает диалог выбора Excel файла и запускает его конвертацию"""
+    global converter_win, status_label
+
+    # Пока идет конвертация, новую не начинаем
+    if cancel_event is not None:
+        return
+
+    filepath = filedialog.askopenfilename(
+        title="Выберите Excel файл для конвертации",
+        filetypes=[
+            ("Файлы Excel", "*.xl*;*.xlsx;*.xlsm;*.xls"),
+            ("XLSX files", "*.xlsx"),
+            ("XLSM files", "*.xlsm"),
+            ("XLS files", "*.xls"),
+            ("All files", "*.*")
+        ]
+    )
+    if filepath:
+        start_conversion(filepath)
+
+def select_json_for_excel():
+    """Открывает диалог выбора JSON и запускает обратную конвертацию в книгу Excel"""
+    if cancel_event is not None:
+        return
+
+    filepath = filedialog.askopenfilename(
+        title="Выберите JSON файл для конвертации в Excel",
+        filetypes=[
+            ("JSON files", "*.json;*.ndjson;*.gz;*.zst"),
+            ("All files", "*.*")
+        ]
+    )
+    if filepath:
+        start_conversion(filepath, json_to_excel_file)
+
+def start_conversion(filepath, convert=convert_excel_file):
+    """Запускает конвертацию в фоновом потоке.
+
+    Поток не трогает виджеты: он кладет события в очередь, которую окно
+    опрашивает через after(). convert - convert_excel_file или json_to_excel_file.
+    """
+    global cancel_event
+    events = queue.Queue()
+    cancel_event = threading.Event()
+    cancel = cancel_event
+
+    def worker():
+        try:
+            converted = convert(
+                filepath,
+                on_stage=lambda text: events.put(('stage', text)),
+                on_progress=lambda done, total: events.put(('progress', done, total)),
+                cancel=cancel)
+            events.put(('done', converted))
+        except ConversionCancelled:
+            events.put(('cancelled',))
+        except Exception as e:
+            events.put(('error', e))
+
+    set_converting(True)
+    status_label.config(text="Чтение файла...", fg="blue")
+    threading.Thread(target=worker, daemon=True).start()
+    converter_win.after(POLL_INTERVAL_MS, poll_conversion, events, cancel)
+
+def set_converting(active):
+    """Переключает окно конвертации между режимами ожидания и выполнения"""
+    convert_button.config(state=DISABLED if active else NORMAL)
+    excel_button.config(state=DISABLED if active else NORMAL)
+    cancel_button.config(state=NORMAL if active else DISABLED)
+    progress_bar.stop()
+    progress_bar.config(mode='indeterminate' if active else 'determinate', value=0)
+    if active:
+        progress_bar.start(15)
+
+def cancel_conversion():
+    """Просит фоновую конвертацию остановиться при следующей проверке"""
+    if cancel_event is not None:
+        cancel_event.set()
+        status_label.config(text="Отмена...", fg="orange")
+
+def poll_conversion(events, cancel):
+    """Применяет события фоновой конвертации к окну и планирует следующий опрос"""
+    global cancel_event
+    try:
+        while True:
+            event = events.get_nowait()
+            kind = event[0]
+            if kind == 'stage':
+                if not cancel.is_set():
+                    status_label.config(text=event[1], fg="blue")
+            elif kind == 'progress':
+                done, total = event[1], event[2]
+                if total:
+                    if str(progress_bar.cget('mode')) != 'determinate':
+                        progress_bar.stop()
+                        progress_bar.config(mode='determinate', maximum=100)
+                    progress_bar.config(value=min(done * 100 / total, 100))
+                    if not cancel.is_set():
+                        status_label.config(text=f"Обработано строк: {done} из {total}", fg="blue")
+                elif not cancel.is_set():
+                    # Размер листа неизвестен - полоса остается в режиме ожидания
+                    status_label.config(text=f"Обработано строк: {done}", fg="blue")
+            else:
+                cancel_event = None
+                set_converting(False)
+                finish_conversion(event)
+                return
+    except queue.Empty:
+        pass
+    converter_win.after(POLL_INTERVAL_MS, poll_conversion, events, cancel)
+
+def finish_conversion(event):
+    """Показывает итог фоновой конвертации"""
+    kind = event[0]
+    if kind == 'cancelled':
+        status_label.config(text="Конвертация отменена", fg="gray")
+    elif kind == 'error':
+        e = event[1]
+        status_label.config(text=f"❌ Ошибка: {str(e)}", fg="red")
+        messagebox.showerror("Ошибка конвертации", f"Не удалось конвертировать файл:\n{e}")
+    elif 'json_path' in event[1]:
+        converted = event[1]
+        progress_bar.config(value=100)
+        status_label.config(text=f"✅ Книга Excel создана ({converted['rows']} ключей)", fg="green")
+        messagebox.showinfo("Успех", f"JSON конвертирован в Excel!\n\nСохранено: {converted['save_path']}")
+    else:
+        converted = event[1]
+        progress_bar.config(value=100)
+        source = " из кэша" if converted['cached'] else ""
+        copied = "(json строка скопирована)" if converted['copied'] else ""
+        status_label.config(text=f"✅ Конвертация{source} завершена!{copied}", fg="green")
+        copied = "JSON скопирован в буфер обмена." if converted['copied'] else \
+            "JSON не скопирован в буфер обмена - используйте сохраненный файл."
+        messagebox.showinfo("Успех", 
+            f"Файл успешно конвертирован!\n\n"
+            f"Сохранено: {converted['save_path']}\n\n"
+            f"{copied}")
+
+def start_xls2json_win():
+    """Создает окно конвертации Excel в JSON"""
+    global ask_window, converter_win, status_label, progress_bar, convert_button, cancel_button
+    global excel_button
+    
+    if ask_window:
+        ask_window.destroy()
+        ask_window = None
+    
+    converter_win = Tk()
+    converter_win.title("Конвертация Excel → JSON")
+    converter_win.configure(bg="#f9f9f9")
+    converter_win.resizable(False, False)
+    place_window_near_cursor(converter_win, 450, 320, 0, 0, 200)
+    
+    Label(converter_win, text="Конвертация Excel в JSON", 
+          font=("Segoe UI", 12, "bold"), bg="#f9f9f9").pack(pady=15)
+    
+    # Поле статуса (Jobizdan)
+    status_label = Label(converter_win, text="Готов к конвертации", 
+                        relief=SUNKEN, anchor=W, bg="white", fg="gray", 
+                        font=("Segoe UI", 9))
+    status_label.pack(fill=X, padx=10, pady=5)
+
+    # Прогресс фоновой конвертации
+    progress_bar = ttk.Progressbar(converter_win, orient=HORIZONTAL, mode='determinate', maximum=100)
+    progress_bar.pack(fill=X, padx=10, pady=5)
+    
+    btn_frame = Frame(converter_win, bg="#f9f9f9")
+    btn_frame.pack(pady=10)
+    
+    convert_button = ttk.Button(btn_frame, text="Выбрать файл и конвертировать", 
+                                command=select_excel_file, width=35)
+    convert_button.pack(pady=5)
+    excel_button = ttk.Button(btn_frame, text="Выбрать JSON и создать Excel",
+                              command=select_json_for_excel, width=35)
+    excel_button.pack(pady=5)
+    cancel_button = ttk.Button(btn_frame, text="Отмена", 
+                               command=cancel_conversion, width=35, state=DISABLED)
+    cancel_button.pack(pady=5)
+    
+    btn_frame2 = Frame(converter_win, bg="#f9f9f9")
+    btn_frame2.pack(pady=5)
+    
+    ttk.Button(btn_frame2, text="Справка", 
+               command=show_help, width=15).pack(side=LEFT, padx=5)
+    ttk.Button(btn_frame2, text="Назад", 
+               command=lambda: go_back_to_main(converter_win), width=15).pack(side=LEFT, padx=5)
+    
+    # Горячая клавиша для выбора файла
+    converter_win.bind('<Control-o>', lambda e: select_excel_file())
+    converter_win.bind('<Return>', lambda e: select_excel_file())
+    converter_win.bind('<Control-j>', lambda e: select_json_for_excel())
+    converter_win.bind('<Escape>', lambda e: cancel_conversion())
+    
+    converter_win.mainloop()
+
+def show_help():
+    """Открывает окно со справкой"""
+    help_window = Toplevel()
+    help_window.title("Справка")
+    help_window.configure(bg="#f9f9f9")
+    help_window.resizable(True, True)
+    help_window.geometry("700x600")
+    
+    # Создаем текстовое поле с прокруткой
+    text_frame = Frame(help_window)
+    text_frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
+    
+    scrollbar = Scrollbar(text_frame)
+    scrollbar.pack(side=RIGHT, fill=Y)
+    
+    help_text = Text(text_frame, wrap=WORD, font=("Segoe UI", 10), 
+                     yscrollcommand=scrollbar.set, bg="white", padx=10, pady=10)
+    scrollbar.config(command=help_text.yview)
+    help_text.pack(side=LEFT, fill=BOTH, expand=True)
+    
+    # Содержимое справки
+    help_content = """
+СПРАВКА ПО ИСПОЛЬЗОВАНИЮ УТИЛИТЫ XLSX/JSON HELPER
+
+═══════════════════════════════════════════════════════════════
+
+1. КОНВЕРТАЦИЯ EXCEL В JSON
+───────────────────────────────────────────────────────────────
+
+Структура Excel файла:
+  • Столбец A: Ключи (названия полей JSON)
+  • Столбец B: Значения (данные для полей)
+  • Столбец C: Типы данных (опционально)
+  • Первая строка: Заголовки (пропускается при обработке)
+
+Поддерживаемые типы данных в столбце C:
+  • number, int, integer, число, числовой - числа без кавычек
+  • bool, boolean, логический - логические значения (true/false)
+  • null, none, пусто - пустые значения
+  • string, текст (или пусто) - строковые значения с экранированием
+  • float, дробный - дробные числа
+  • date, дата - дата в формате ГГГГ-ММ-ДД
+  • json - значение разбирается как JSON (объект, массив, ...)
+  • list, список - JSON-массив или элементы через запятую
+  • decimal, десятичный - число без потери точности
+
+Пример структуры Excel:
+  ┌─────────────┬──────────────┬──────────────┐
+  │ Заголовок 1 │ Заголовок 2  │ Заголовок 3  │
+  ├─────────────┼──────────────┼──────────────┤
+  │ name        │ Иван         │ string       │
+  │ age         │ 25           │ number       │
+  │ active      │ true         │ bool         │
+  └─────────────┴──────────────┴──────────────┘
+
+Результат JSON:
+  {
+    "name": "Иван",
+    "age": 25,
+    "active": true
+  }
+
+Процесс конвертации:
+  1. Нажмите "Выбрать файл и конвертировать"
+  2. Выберите Excel файл (*.xlsx, *.xlsm, *.xls)
+  3. Дождитесь завершения конвертации
+  4. JSON файл будет сохранен рядом с исходным файлом
+  5. JSON строка автоматически скопируется в буфер обмена
+
+Конвертация выполняется в фоне: окно не блокируется, полоса
+показывает прогресс по строкам, кнопка "Отмена" прерывает работу
+(недописанный файл JSON не сохраняется).
+
+Обратная конвертация JSON → Excel: кнопка "Выбрать JSON и создать Excel"
+создает рядом с JSON книгу <имя>_<дата>.xlsx с той же таблицей (ключ,
+значение, тип). Тип подбирается так, чтобы книга конвертировалась
+обратно в те же данные; объекты и массивы записываются типом json.
+Файл читается и книга пишется потоково - подходят и JSON в сотни МБ
+(до 1 048 575 ключей - предел строк листа Excel).
+
+Горячие клавиши:
+  • Ctrl+O - открыть диалог выбора файла
+  • Enter - выбрать файл и конвертировать
+  • Ctrl+J - выбрать JSON и создать Excel
+  • Escape - отменить конвертацию
+
+═══════════════════════════════════════════════════════════════
+
+2. РЕДАКТОР JSON С ПРОВЕРКОЙ СИНТАКСИСА
+───────────────────────────────────────────────────────────────
+
+Функции редактора:
+  • Открытие JSON файлов для редактирования
+  • Автоматическая проверка синтаксиса JSON после паузы в наборе
+    (большие файлы проверяются в фоне, окно не блокируется)
+  • Подсветка строк с ошибками
+  • Цветовая подсветка ключей, строк, чисел и true/false/null; ошибки
+    подчеркиваются сразу при наборе (перекрашиваются только видимые строки)
+  • Список всех ошибок под текстом: двойной щелчок или Enter переводит
+    курсор к ошибке
+  • Формат (отступы), Сжать (без пробелов) и Сортировать ключи - текст
+    переписывается в фоне с показом хода работы (Esc - отмена); строки
+    и числа не меняются, замену можно отменить одним Ctrl+Z
+  • Структура документа слева: дерево ключей (вложенные раскрываются
+    по щелчку), выбор ключа переводит курсор к нему
+  • Переход по пути ключа: поле над деревом (Ctrl+G) - путь вида
+    a.b[12].c, ключ со скобками или кавычками пишется как ["ключ"]; при
+    наборе показываются пути, которые начинаются с введенного, Enter
+    переходит к пути (или к первому найденному)
+  • Сохранение отредактированных файлов
+
+Использование:
+  1. Нажмите "Открыть файл"
+  2. Выберите JSON файл
+  3. Отредактируйте содержимое
+  4. Нажмите "Проверить" для проверки синтаксиса
+  5. Нажмите "Сохранить" для сохранения изменений
+
+Большие файлы (от 50 МБ) открываются в режиме окна: файл не читается
+целиком, в редакторе находятся только строки вокруг видимой области,
+правки запоминаются отдельно и записываются при сохранении потоково.
+Проверка синтаксиса и список ошибок в этом режиме недоступны (цветовая
+подсветка и структура документа остаются; структура большого файла
+строится в фоне), отмена правок (Ctrl+Z)
+действует в пределах загруженного окна.
+
+Горячие клавиши:
+  • Ctrl+O - открыть файл
+  • Ctrl+S - сохранить файл
+  • F5 - проверить синтаксис JSON
+  • Ctrl+Shift+F / Ctrl+Shift+M / Ctrl+Shift+K - формат / сжать /
+    сортировать ключи
+  • Ctrl+G - переход по пути ключа
+
+Статусная строка показывает:
+  • ✅ Корректный JSON - файл валиден
+  • ❌ Ошибка в строке X - найдена ошибка
+  • Файл пуст - файл не содержит данных
+
+═══════════════════════════════════════════════════════════════
+
+3. ОБРАБОТКА СПЕЦИАЛЬНЫХ СИМВОЛОВ
+───────────────────────────────────────────────────────────────
+
+Программа автоматически экранирует специальные символы в строках:
+  • Кавычки (") → \\"
+  • Обратный слэш (\\) → \\\\
+  • Переносы строк → \\n
+  • Табуляции → \\t
+  • И другие управляющие символы
+
+Пример:
+  Входная строка: Привет "мир"!
+  JSON результат: "Привет \\"мир\\"!"
+
+═══════════════════════════════════════════════════════════════
+
+4. ТРЕБОВАНИЯ К ФАЙЛАМ
+───────────────────────────────────────────────────────────────
+
+Поддерживаемые форматы Excel:
+  • .xlsx (Excel 2007 и новее)
+  • .xlsm (Excel с макросами)
+  • .xls (Excel 97-2003)
+
+Кодировка:
+  • Все файлы обрабатываются в кодировке UTF-8
+  • Поддержка кириллицы и других Unicode символов
+
+═══════════════════════════════════════════════════════════════
+
+5. РЕШЕНИЕ ПРОБЛЕМ
+───────────────────────────────────────────────────────────────
+
+Проблема: "Не удалось конвертировать файл"
+  • Убедитесь, что файл не открыт в другой программе
+  • Проверьте, что файл имеет правильный формат Excel
+  • Убедитесь, что столбцы A, B, C содержат данные
+
+Проблема: "Ошибка в строке X"
+  • Проверьте синтаксис JSON в указанной строке
+  • Убедитесь, что все кавычки закрыты
+  • Проверьте запятые между элементами
+
+Проблема: "Не удалось скопировать в буфер обмена"
+  • Установите pyperclip: pip install pyperclip
+  • Или скопируйте JSON вручную из сохраненного файла
+  • JSON больше 10 МБ не копируется; предел задает переменная
+    окружения EXCELTOJSON_CLIPBOARD_MAX_MB
+
+═══════════════════════════════════════════════════════════════
+
+6. ПАКЕТНЫЙ РЕЖИМ (КОМАНДНАЯ СТРОКА)
+───────────────────────────────────────────────────────────────
+
+Конвертация множества файлов без окон и без буфера обмена:
+  python -m ExcelToJson convert <файлы | маски | папки>
+
+Параметры:
+  • -j N, --workers N - число рабочих процессов (по умолчанию - число ядер)
+  • -r, --recursive - обходить вложенные папки
+  • --reader auto|pandas|stream|calamine - движок чтения; stream читает
+    книгу построчно с постоянным расходом памяти, calamine (пакет
+    python-calamine) - самый быстрый. auto берет calamine, если он
+    установлен, иначе pandas, а для .xlsx/.xlsm больше 20 МБ - stream.
+    В столбце без текста (даже без заголовка) pandas приводит значения к
+    одному типу, а stream - нет: тип string даст "True" вместо "1".
+    Сравнить движки на своих файлах: python -m ExcelToJson engines <файлы>
+  • --all-sheets - конвертировать все листы книги (книга читается один раз)
+  • --sheet ИМЯ - конвертировать указанный лист (можно повторять)
+  • --sheet-output split|combined - JSON на каждый лист
+    (<книга>_<лист>_<дата>.json) или один JSON с ключами-именами листов
+    (<книга>_sheets_<дата>.json)
+  • --columns dev=B,test=D,prod=E - несколько вариантов значений (среды,
+    языки) в одной книге: каждый столбец - в свой <книга>_<имя>_<дата>.json.
+    Книга читается и типы разбираются один раз, файлы пишутся параллельно.
+    --key-column и --type-column задают столбцы ключей и типов (A и C)
+  • --format pretty|compact|ndjson - JSON с отступами (как в окне),
+    без пробелов или NDJSON - по объекту {ключ: значение} на строку (.ndjson)
+  • --compress gzip|zstd - сжимать файл при записи (.json.gz / .json.zst;
+    для zstd нужен пакет zstandard). Сжатый результат в буфер не копируется
+  • --json-backend auto|orjson|json - кодировщик; orjson (пакет orjson)
+    быстрее, файл получается тем же байт в байт
+  • --incremental - сравнить с последним результатом <книга>_<дата>.json
+    рядом с книгой и записать изменения как JSON Patch (RFC 6902) в
+    <книга>_<дата>.patch.json; --baseline ФАЙЛ - сравнить с указанным
+    файлом (convert, одна книга); --skip-unchanged - если изменений нет,
+    новый JSON не оставлять. Работает для первого листа книги
+  • --types-module МОДУЛЬ - модуль со своими типами (register_type)
+  • --metrics ФАЙЛ - писать время, скорость и объемы по этапам
+    в формате JSON-lines ('-' - в stderr); --metrics-memory добавляет
+    пик памяти. То же включают переменные окружения
+    EXCELTOJSON_METRICS и EXCELTOJSON_METRICS_MEMORY=1 (и для окон)
+  • --no-cache - не использовать кэш результатов
+  • --cache-dir ПАПКА - папка кэша
+
+Кэш: результат конвертации запоминается по содержимому книги, версии
+конвертера и параметрам. Если книга не менялась, JSON берется из кэша
+без повторного чтения. Записи старше 30 дней и сверх 512 МБ удаляются.
+
+Для каждого файла выводится результат, в конце - общая скорость.
+
+Наблюдение за папками - новые и измененные книги конвертируются сами:
+  python -m ExcelToJson watch <папки> [-r] [-j N] [--settle 2] [--existing]
+Книга берется в работу, когда перестает меняться (--settle секунд).
+На Linux используется inotify, иначе папки опрашиваются (--interval).
+Принимает те же параметры конвертации, что и convert; в журнал пишутся
+очередь, задержка от появления файла до результата и ошибки.
+
+Служба конвертации для своих инструментов (pandas уже загружен в пуле):
+  python -m ExcelToJson serve [--port 8765 | --unix СОКЕТ] [-j N] [--queue 8]
+  curl --data-binary @книга.xlsx "http://127.0.0.1:8765/convert?name=книга.xlsx"
+  curl -X POST "http://127.0.0.1:8765/convert?path=/путь/к/книге.xlsx"
+Конвертация файлов по пути (?path=) включается параметром --allow-paths.
+JSON возвращается в ответе потоком; ?reader= и ?format= меняют движок и
+формат для запроса. Книги больше --max-upload МБ отклоняются (413), при
+занятой очереди служба отвечает 503. Состояние: GET /health.
+
+Обратная конвертация JSON (NDJSON, .gz, .zst) в книгу Excel:
+  python -m ExcelToJson to-excel <файлы JSON> [-o книга.xlsx] [--writer openpyxl]
+Книга пишется через xlsxwriter (constant_memory), если он установлен,
+иначе через openpyxl в режиме write_only.
+
+Замеры скорости на тестовых книгах:
+  python -m ExcelToJson bench --sizes 1000,100000 --formats .xlsx,.xlsm -o new.json
+  python -m ExcelToJson compare old.json new.json
+bench создает книги с заданной смесью типов (--types number=3,текст=1)
+и замеряет этапы: чтение, конвертацию, формирование JSON, запись и
+(с --clipboard) буфер обмена, а также пик памяти. compare отмечает
+этапы, ставшие медленнее более чем на 20% (--threshold).
+Холодный старт ядра, окон и командной строки:
+  python -m ExcelToJson startup
+
+═══════════════════════════════════════════════════════════════
+
+Версия: 1.0
+Дата обновления: 17.12.2025
+Разработчик: Подпорин Н. Ю.(dgecon17@gmail.com)(n.podporin@credos.ru)
+"""
+    
+    help_text.insert('1.0', help_content)
+    help_text.config(state=DISABLED)  # Только для чтения
+    
+    # Кнопка закрытия
+    btn_frame = Frame(help_window, bg="#f9f9f9")
+    btn_frame.pack(pady=10)
+    ttk.Button(btn_frame, text="Закрыть", command=help_window.destroy, width=20).pack()
+
+def go_back_to_main(current_window):
+    """Возвращает к главному окну"""
+    global ask_window, cancel_event
+    # Незавершенную фоновую конвертацию останавливаем - окно, которое ее ждет, закрывается
+    if cancel_event is not None:
+        cancel_event.set()
+        cancel_event = None
+    if current_window is editor_win:
+        # Временный результат переформатирования не должен остаться на диске
+        cancel_reformat()
+        close_large_document(text_widget)
+        reset_structure()
+    if current_window:
+        current_window.destroy()
+    create_ask_window()
+
+# === НОВАЯ ФУНКЦИЯ: JSON РЕДАКТОР С ПОДСВЕТКОЙ ОШИБОК ===
+
+def show_validation_result(editor, result):
+    """Подсвечивает строку с ошибкой и выводит результат проверки в строку статуса"""
+    editor.tag_remove('error', '1.0', END)
+    kind = result[0]
+    if kind == 'empty':
+        status_label.config(text="Файл пуст", fg="gray")
+    elif kind == 'ok':
+        status_label.config(text="✅ Корректный JSON", fg="green")
+    elif kind == 'error':
+        error_line, msg = result[1], result[2]
+        start = f"{error_line}.0"
+        end = f"{error_line}.end"
+        editor.tag_add('error', start, end)
+        editor.tag_config('error', background="yellow", foreground="red")
+        status_label.config(text=f"❌ Ошибка в строке {error_line}: {msg}", fg="red")
+    else:
+        status_label.config(text=f"⚠️ Ошибка: {result[1]}", fg="orange")
+
+def get_validation_pool():
+    """Возвращает процесс для проверки JSON (json.loads не отпускает GIL, поток не помог бы)"""
+    global validation_pool
+    if validation_pool is None:
+        validation_pool = ProcessPoolExecutor(max_workers=1)
+    return validation_pool
+
+def current_validation():
+    """Возвращает результат проверки текущего текста редактора или None, если он устарел"""
+    if validation_result and validation_result[0] == edit_generation:
+        return validation_result[1]
+    return None
+
+def remember_validation(generation, result):
+    """Запоминает результат проверки для версии текста generation"""
+    global validation_result
+    validation_result = (generation, result)
+
+def mark_edited():
+    """Отмечает новую версию текста редактора (прежний результат проверки устаревает)"""
+    global edit_generation
+    edit_generation += 1
+
+def on_editor_modified(event):
+    """Отмечает новую версию текста и откладывает проверку до паузы в наборе"""
+    global validation_job
+    editor = event.widget
+    if not editor.edit_modified():
+        return
+    editor.edit_modified(False)
+    mark_edited()
+    if validation_job:
+        editor.after_cancel(validation_job)
+    validation_job = editor.after(VALIDATION_DELAY_MS, start_validation, editor)
+
+def start_validation(editor):
+    """Запускает фоновую проверку текущей версии текста и обновляет структуру документа"""
+    global validation_job, validation_future
+    validation_job = None
+    update_structure(editor)
+    if large_document is not None:
+        # Полный разбор потребовал бы памяти пропорционально размеру файла
+        status_label.config(text="Большой файл: проверка синтаксиса недоступна", fg="gray")
+        show_error_list([])
+        return
+    start_error_scan(editor)
+    result = current_validation()
+    if result:
+        show_validation_result(editor, result)
+        return
+
+    # Устаревшую проверку, которая еще не началась, отменяем
+    if validation_future is not None:
+        validation_future.cancel()
+
+    generation = edit_generation
+    content = editor.get('1.0', END).strip()
+    if len(content) < VALIDATION_INLINE_CHARS:
+        # Небольшой текст быстрее проверить сразу, чем передавать в другой процесс
+        with measure_stage('validate_json', chars=len(content), mode='inline'):
+            remember_validation(generation, check_json_text(content))
+        show_validation_result(editor, validation_result[1])
+        return
+
+    status_label.config(text="Проверка JSON...", fg="blue")
+    validation_future = get_validation_pool().submit(check_json_text, content)
+    editor.after(POLL_INTERVAL_MS, poll_validation, editor, validation_future, generation,
+                 time.perf_counter(), len(content))
+
+def poll_validation(editor, future, generation, started=None, chars=None):
+    """Дожидается результата фоновой проверки и применяет его, если текст не менялся"""
+    if not future.done():
+        editor.after(POLL_INTERVAL_MS, poll_validation, editor, future, generation, started, chars)
+        return
+    if started is not None:
+        emit_stage('validate_json', started, chars=chars, mode='process',
+                   stale=future.cancelled() or generation != edit_generation)
+    if future.cancelled() or generation != edit_generation:
+        return
+    try:
+        result = future.result()
+    except Exception as e:
+        result = ('exception', str(e))
+    remember_validation(generation, result)
+    show_validation_result(editor, result)
+
+def validate_json(editor):
+    """Проверяет JSON в редакторе: повторно использует готовый результат или запускает проверку"""
+    global validation_job
+    if validation_job:
+        editor.after_cancel(validation_job)
+    start_validation(editor)
+
+# === ПОДСВЕТКА СИНТАКСИСА И СПИСОК ОШИБОК ===
+def track_text_changes(editor):
+    """Перехватывает insert/delete/replace редактора, чтобы знать измененные строки.
+
+    <<Modified>> сообщает только о факте правки, поэтому команда виджета
+    подменяется; через нее проходят и правки отмены/повтора.
+    """
+    original = editor._w + '_orig'
+    editor.tk.call('rename', editor._w, original)
+
+    def line_of(index):
+        return int(editor.tk.call(original, 'index', index).split('.')[0])
+
+    def dispatch(*args):
+        change = None
+        if args and args[0] in ('insert', 'delete', 'replace') \
+                and str(editor.tk.call(original, 'cget', '-state')) == NORMAL:
+            change = text_change(args[0], args[1:], line_of)
+        result = editor.tk.call((original,) + args)
+        if change is not None:
+            note_text_change(editor, change)
+        return result
+
+    editor.tk.createcommand(editor._w, dispatch)
+
+def text_change(command, args, line_of):
+    """Правка в строках: (первая строка с 0, удалено переводов строк, добавлено) или () - неизвестно"""
+    last = line_of('end - 1 char')
+    if command == 'insert':
+        return min(line_of(args[0]), last) - 1, 0, sum(chars.count('\n') for chars in args[1::2])
+    if command == 'delete' and len(args) > 2:
+        # Удаление нескольких диапазонов за раз - проще разобрать текст заново
+        return ()
+    first = min(line_of(args[0]), last)
+    end = min(line_of(args[1] if len(args) > 1 else f"{args[0]} + 1 char"), last)
+    added = sum(chars.count('\n') for chars in args[2::2]) if command == 'replace' else 0
+    return first - 1, max(end - first, 0), added
+
+def note_text_change(editor, change):
+    """Передает правку разбору и структуре документа и откладывает перекраску видимых строк"""
+    if editor_lexer is None:
+        return
+    if large_document is None:
+        # В режиме окна строки Text - не строки документа; правки учитываются при переносе окна
+        note_structure_edit(change)
+    if change:
+        editor_lexer.edit(*change)
+    else:
+        editor_lexer.reset(editor_line_count(editor))
+    schedule_highlight(editor)
+
+def editor_line_count(editor):
+    return int(editor.index('end - 1 char').split('.')[0])
+
+def editor_lines(editor):
+    """Функция get_lines(first, last) для разбора: тексты строк first..last-1 (с нуля)"""
+    def get_lines(first, last):
+        return editor.get(f"{first + 1}.0", f"{last + 1}.0").split('\n')[:last - first]
+    return get_lines
+
+def schedule_highlight(editor):
+    """Перекрашивает видимые строки, когда окно освободится (несколько правок - одна перекраска)"""
+    global highlight_job
+    if editor_lexer is not None and not highlight_job:
+        highlight_job = editor.after_idle(highlight_viewport, editor)
+
+def highlight_viewport(editor):
+    """Разбирает строки до конца видимой части и раскрашивает видимые строки.
+
+    Работа пропорциональна правке и размеру окна: строки за пределами экрана
+    разбираются, только пока после правки меняется состояние разбора.
+    """
+    global highlight_job
+    highlight_job = None
+    lexer = editor_lexer
+    count = editor_line_count(editor)
+    if lexer.line_count != count:
+        # Правка прошла мимо перехвата - разбираем заново
+        lexer.reset(count)
+    first = int(editor.index('@0,0').split('.')[0]) - 1
+    last = min(count, int(editor.index(f"@0,{editor.winfo_height()}").split('.')[0])) - 1
+    get_lines = editor_lines(editor)
+    lexer.advance(get_lines, last)
+
+    spans = {tag: [] for tag in TOKEN_TAGS}
+    errors = []
+    runs = []
+    for offset, text in enumerate(get_lines(first, last + 1)):
+        line = first + offset
+        if not lexer.painted[line]:
+            tokens, _ = lexer.line_tokens(line, text)
+            for tag, start, end in tokens:
+                spans[tag] += (f"{line + 1}.{start}", f"{line + 1}.{end}")
+            lexer.painted[line] = True
+            if runs and runs[-1][1] == line:
+                runs[-1][1] = line + 1
+            else:
+                runs.append([line, line + 1])
+        for start, end, _ in lexer.errors[line] or ():
+            errors += (f"{line + 1}.{start}", f"{line + 1}.{max(end, start + 1)}")
+
+    for start, end in runs:
+        for tag in TOKEN_TAGS:
+            editor.tag_remove(tag, f"{start + 1}.0", f"{end}.end")
+    for tag, indices in spans.items():
+        if indices:
+            editor.tag_add(tag, *indices)
+    editor.tag_remove('json_error', f"{first + 1}.0", f"{last + 1}.end")
+    if errors and large_document is None:
+        # В окне большого файла начало разбора угадано - ошибки могли бы быть ложными
+        editor.tag_add('json_error', *errors)
+
+def on_editor_yscroll(first, last):
+    """Прокрутка обычного режима: двигает полосу и докрашивает показанные строки"""
+    editor_scroll_y.set(first, last)
+    schedule_highlight(text_widget)
+
+def start_error_scan(editor):
+    """Запускает поиск всех ошибок документа порциями между событиями окна"""
+    global error_scan_job
+    if error_scan_job:
+        editor.after_cancel(error_scan_job)
+    error_scan_job = editor.after_idle(scan_errors, editor)
+
+def scan_errors(editor):
+    """Шаг фонового поиска ошибок; в конце заполняет список ошибок"""
+    global error_scan_job
+    error_scan_job = None
+    lexer = editor_lexer
+    count = editor_line_count(editor)
+    if lexer.line_count != count:
+        lexer.reset(count)
+    get_lines = editor_lines(editor)
+    lexer.advance(get_lines, count, ERROR_SCAN_LINES)
+    if not lexer.complete:
+        error_scan_job = editor.after(1, scan_errors, editor)
+        return
+    show_error_list(lexer.document_errors(get_lines, ERROR_LIST_LIMIT))
+
+def show_error_list(errors):
+    """Показывает список ошибок под редактором (пустой список скрывается)"""
+    error_listbox.delete(0, END)
+    error_items.clear()
+    for line, start, _, message in errors:
+        error_listbox.insert(END, f"Строка {line + 1}, столбец {start + 1}: {message}")
+        error_items.append((line + 1, start))
+    if len(errors) >= ERROR_LIST_LIMIT:
+        error_listbox.insert(END, f"Показаны первые {ERROR_LIST_LIMIT} ошибок")
+    if errors:
+        error_frame.pack(side=BOTTOM, fill=X, padx=5, before=text_widget.master)
+    else:
+        error_frame.pack_forget()
+
+def go_to_error(event=None):
+    """Переводит курсор к выбранной в списке ошибке"""
+    selection = error_listbox.curselection()
+    if not selection or selection[0] >= len(error_items):
+        return
+    line, column = error_items[selection[0]]
+    text_widget.mark_set(INSERT, f"{line}.{column}")
+    text_widget.see(INSERT)
+    text_widget.focus_set()
+
+# === РЕЖИМ БОЛЬШИХ ФАЙЛОВ В РЕДАКТОРЕ ===
+# Файлы от этого размера открываются в режиме окна: в Text только видимая часть
+LARGE_FILE_BYTES = 50 * 1024 * 1024
+
+# Размер окна: строк всего и строк запаса над верхней видимой строкой
+LARGE_WINDOW_LINES = 3000
+LARGE_WINDOW_MARGIN = 1000
+
+# Доля окна у края, при подходе к которой окно сдвигается
+LARGE_WINDOW_EDGE = 0.1
+
+def open_large_document(filepath, editor, temporary=False):
+    """Открывает большой файл в режиме окна: в Text попадают только строки вокруг видимых.
+
+    temporary - файл временный (результат переформатирования), удаляется при закрытии.
+    """
+    global large_document
+    close_large_document(editor, keep_path=filepath)
+    reset_structure()
+    large_document = LineDocument(filepath)
+    large_document.temporary = temporary
+    large_document.window_generation = edit_generation
+    editor.config(yscrollcommand=on_large_yscroll)
+    editor_scroll_y.config(command=large_yview)
+    editor_lexer.reset(editor_line_count(editor), WINDOW_STATE)
+    load_large_window(editor, 0)
+    # Структура большого файла строится в фоне сразу: проверка в этом режиме не запускается
+    start_structure_build(editor)
+
+def close_large_document(editor, keep_path=None):
+    """Закрывает большой файл и возвращает редактору обычную прокрутку"""
+    global large_document
+    if large_document is None:
+        return
+    large_document.close()
+    if large_document.temporary and large_document.path != keep_path:
+        os.remove(large_document.path)
+    large_document = None
+    editor.config(state=NORMAL, yscrollcommand=on_editor_yscroll)
+    editor_scroll_y.config(command=editor.yview)
+    editor_lexer.reset(editor_line_count(editor), INITIAL_STATE)
+
+def commit_large_window(editor):
+    """Переносит правки из окна Text в таблицу фрагментов документа"""
+    doc = large_document
+    if doc is None or doc.window_generation == edit_generation:
+        return
+    parts = editor.get('1.0', 'end-1c').split('\n')
+    lines = [part + doc.newline for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    start, end = doc.window
+    change = None
+    if structure_index is not None or structure_build is not None:
+        change = lines_edit(start, doc.get_lines(start, end, sys.maxsize)[0], lines)
+    doc.replace_lines(start, end, lines)
+    doc.window = (start, start + len(lines))
+    doc.window_generation = edit_generation
+    if change is not None:
+        note_structure_edit(change)
+
+def large_window_start(top_line):
+    """Первая строка окна для заданной верхней видимой строки"""
+    return max(0, top_line - LARGE_WINDOW_MARGIN)
+
+def load_large_window(editor, top_line):
+    """Показывает в Text окно документа вокруг строки top_line (нумерация с 0)"""
+    doc = large_document
+    commit_large_window(editor)
+    total = doc.line_count
+    top_line = max(0, min(top_line, total - 1))
+    start = large_window_start(top_line)
+    lines, truncated = doc.get_lines(start, min(total, start + LARGE_WINDOW_LINES))
+    if start + len(lines) <= top_line:
+        # Запас над строкой не поместился по объему - начинаем окно с нее самой
+        start = top_line
+        lines, truncated = doc.get_lines(start, min(total, start + LARGE_WINDOW_LINES))
+
+    editor.config(state=NORMAL)
+    editor.delete('1.0', END)
+    editor.insert('1.0', ''.join(lines).replace('\r\n', '\n'))
+    editor.edit_modified(False)
+    editor.edit_reset()
+    doc.window = (start, start + len(lines))
+    doc.window_generation = edit_generation
+    editor.yview(f"{top_line - start + 1}.0")
+
+    if truncated:
+        # Строка длиннее окна: показываем только начало и запрещаем правку
+        editor.config(state=DISABLED)
+        status_label.config(text=f"Строка {start + 1} слишком длинная - показано начало, "
+                                 f"правка недоступна", fg="orange")
+    else:
+        status_label.config(text=f"Большой файл: {total} строк, загружены "
+                                 f"{start + 1}–{start + len(lines)}", fg="gray")
+
+def on_large_yscroll(first, last):
+    """Переводит положение прокрутки окна в положение во всем документе и сдвигает окно у краев"""
+    global large_recenter_job
+    doc = large_document
+    first, last = float(first), float(last)
+    start, end = doc.window
+    count = max(end - start, 1)
+    total = max(doc.line_count, 1)
+    editor_scroll_y.set((start + first * count) / total, (start + last * count) / total)
+    schedule_highlight(text_widget)
+
+    near_top = first < LARGE_WINDOW_EDGE and start > 0
+    near_bottom = last > 1 - LARGE_WINDOW_EDGE and end < total
+    if (near_top or near_bottom) and not large_recenter_job:
+        large_recenter_job = text_widget.after_idle(recenter_large_window, start + int(first * count))
+
+def recenter_large_window(top_line):
+    """Перезагружает окно вокруг top_line, сохраняя положение курсора"""
+    global large_recenter_job
+    large_recenter_job = None
+    doc = large_document
+    if doc is None or large_window_start(top_line) == doc.window[0]:
+        return
+    insert_line = doc.window[0] + int(text_widget.index(INSERT).split('.')[0]) - 1
+    insert_column = text_widget.index(INSERT).split('.')[1]
+    load_large_window(text_widget, top_line)
+    start, end = doc.window
+    if start <= insert_line < end:
+        text_widget.mark_set(INSERT, f"{insert_line - start + 1}.{insert_column}")
+
+def large_yview(*args):
+    """Команда полосы прокрутки в режиме большого файла: положение - во всем документе"""
+    doc = large_document
+    if args[0] != 'moveto':
+        text_widget.yview(*args)
+        return
+    top_line = int(float(args[1]) * doc.line_count)
+    start, end = doc.window
+    if start <= top_line < end:
+        text_widget.yview(f"{top_line - start + 1}.0")
+    else:
+        load_large_window(text_widget, top_line)
+
+def save_large_document(save_path):
+    """Потоково сохраняет большой файл с правками и открывает сохраненный файл"""
+    global current_file_path
+    doc = large_document
+    try:
+        commit_large_window(text_widget)
+        top_line = doc.window[0] + int(text_widget.index('@0,0').split('.')[0]) - 1
+        status_label.config(text="Сохранение...", fg="blue")
+        status_label.update()
+        doc.save(save_path)
+        open_large_document(save_path, text_widget)
+        load_large_window(text_widget, top_line)
+        current_file_path = save_path
+        messagebox.showinfo("Успех", f"Файл успешно сохранён!\n\n{save_path}")
+    except Exception as e:
+        if large_document is doc and doc.closed:
+            # Файл закрыт перед заменой, но заменить не удалось - открываем исходный
+            open_large_document(doc.path, text_widget, doc.temporary)
+        messagebox.showerror("Ошибка", f"Не удалось сохранить файл:\n{e}")
+
+def load_file_into_editor(filepath, editor):
+    global current_file_path
+    cancel_reformat()
+    try:
+        size = os.path.getsize(filepath)
+        if size >= LARGE_FILE_BYTES:
+            # Большой файл не читаем целиком - показываем окно вокруг видимых строк
+            with measure_stage('editor_load', file=filepath, bytes_in=size, mode='large'):
+                open_large_document(filepath, editor)
+            current_file_path = filepath
+            return
+        close_large_document(editor)
+        reset_structure()
+        with measure_stage('editor_load', file=filepath, bytes_in=size, mode='full'):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+            editor.delete('1.0', END)
+            editor.insert('1.0', content)
+        current_file_path = filepath
+        # Новый текст - новая версия; проверяем сразу, не дожидаясь паузы
+        editor.edit_modified(False)
+        mark_edited()
+        validate_json(editor)
+    except Exception as e:
+        messagebox.showerror("Ошибка", f"Не удалось загрузить файл:\n{e}")
+
+def select_json_for_edit():
+    global text_widget
+    if not text_widget:
+        messagebox.showerror("Ошибка", "Редактор не инициализирован")
+        return
+    filepath = filedialog.askopenfilename(
+        title="Выберите JSON-файл",
+        filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+    )
+    if filepath:
+        load_file_into_editor(filepath, text_widget)
+
+def choose_save_path():
+    """Спрашивает, куда сохранить файл; возвращает путь или None"""
+    # Если файл уже открыт, предлагаем сохранить в том же месте или выбрать новое
+    if current_file_path and os.path.exists(current_file_path):
+        if messagebox.askyesno("Сохранить", f"Сохранить в текущий файл?\n{current_file_path}"):
+            save_path = current_file_path
+        else:
+            # Определяем базовое имя
+            base_name = os.path.splitext(os.path.basename(current_file_path))[0]
+            timestamp = datetime.now().strftime("%Y.%m.%d_%H-%M")
+            suggested_name = f"{base_name}_{timestamp}.json"
+            
+            save_path = filedialog.asksaveasfilename(
+                initialfile=suggested_name,
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            )
+            if not save_path:
+                return None
+    else:
+        # Определяем базовое имя
+        if current_file_path:
+            base_name = os.path.splitext(os.path.basename(current_file_path))[0]
+        else:
+            base_name = "безымянный"
+
+        # Форматируем дату и время
+        timestamp = datetime.now().strftime("%Y.%m.%d_%H-%M")
+        suggested_name = f"{base_name}_{timestamp}.json"
+
+        save_path = filedialog.asksaveasfilename(
+            initialfile=suggested_name,
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if not save_path:
+            return None
+
+    return save_path
+
+def save_json():
+    global current_file_path
+    if not text_widget:
+        messagebox.showerror("Ошибка", "Редактор не инициализирован")
+        return
+    if reformat_cancel is not None:
+        messagebox.showwarning("Предупреждение", "Дождитесь окончания переформатирования или отмените его (Esc).")
+        return
+
+    if large_document is not None:
+        save_path = choose_save_path()
+        if save_path:
+            with measure_stage('editor_save', file=save_path, mode='large'):
+                save_large_document(save_path)
+        return
+        
+    content = text_widget.get('1.0', END).strip()
+    if not content:
+        messagebox.showwarning("Предупреждение", "Файл пуст.")
+        return
+
+    # Проверка корректности JSON (опционально) - используем готовый результат, если текст не менялся
+    generation = edit_generation
+    result = current_validation()
+    if result is None:
+        with measure_stage('validate_json', chars=len(content), mode='save'):
+            result = check_json_text(content)
+        remember_validation(generation, result)
+    if result[0] == 'error':
+        if not messagebox.askyesno(
+            "Некорректный JSON",
+            f"Обнаружена ошибка:\n{result[2]} (строка {result[1]})\n\nСохранить файл в текущем виде?"
+        ):
+            return
+
+    save_path = choose_save_path()
+    if not save_path:
+        return
+
+    try:
+        with measure_stage('editor_save', file=save_path, mode='full') as stage, \
+                open(save_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            stage.update(bytes_out=f.tell())
+        messagebox.showinfo("Успех", f"Файл успешно сохранён!\n\n{save_path}")
+        current_file_path = save_path
+        # Сохранение не меняет текст - повторный разбор не нужен
+        show_validation_result(text_widget, result)
+    except Exception as e:
+        messagebox.showerror("Ошибка", f"Не удалось сохранить файл:\n{e}")
+
+# === ФОРМАТИРОВАНИЕ, СЖАТИЕ И СОРТИРОВКА КЛЮЧЕЙ ===
+REFORMAT_TITLES = {
+    ('pretty', False): "Форматирование",
+    ('compact', False): "Сжатие",
+    ('pretty', True): "Сортировка ключей",
+}
+
+def start_reformat(editor, style, sort_keys=False):
+    """Переписывает текст редактора в фоновом потоке (см. reformat_json).
+
+    Поток читает снимок текста и пишет результат во временный файл, окно
+    опрашивает очередь событий. Дальше результат вставляется в Text порциями,
+    а большой результат открывается в режиме окна.
+    """
+    global reformat_cancel
+    if reformat_cancel is not None:
+        status_label.config(text="Переформатирование уже выполняется", fg="orange")
+        return
+    doc = large_document
+    if doc is not None:
+        # Снимок фрагментов: окно можно листать и править, пока поток читает документ
+        commit_large_window(editor)
+        pieces = list(doc.pieces)
+        total = os.path.getsize(doc.path)
+        read_chunks = lambda: doc.iter_chunks(REFORMAT_CHUNK_CHARS, pieces)
+    else:
+        content = editor.get('1.0', 'end-1c')
+        if not content.strip():
+            status_label.config(text="Файл пуст", fg="gray")
+            return
+        total = len(content)
+        read_chunks = lambda: (content[i:i + REFORMAT_CHUNK_CHARS]
+                               for i in range(0, total, REFORMAT_CHUNK_CHARS))
+
+    events = queue.Queue()
+    cancel = reformat_cancel = threading.Event()
+    title = REFORMAT_TITLES[style, sort_keys]
+
+    def source():
+        done = 0
+        for chunk in read_chunks():
+            done += len(chunk)
+            events.put(('progress', done))
+            yield chunk
+
+    def worker():
+        fd, temp_path = tempfile.mkstemp(prefix='reformat_', suffix='.json')
+        try:
+            with measure_stage('editor_reformat', style=style, sort_keys=sort_keys,
+                               mode='large' if doc is not None else 'full') as stage, \
+                    open(fd, 'w', encoding='utf-8', newline='') as f:
+                chunks = decode_chunks(source()) if doc is not None else source()
+                stage.update(chars=reformat_json(chunks, f.write, style, sort_keys, cancel))
+            events.put(('done', temp_path))
+        except Exception as e:
+            os.remove(temp_path)
+            events.put(('cancelled',) if isinstance(e, ConversionCancelled) else ('error', e))
+
+    status_label.config(text=f"{title}...", fg="blue")
+    threading.Thread(target=worker, daemon=True).start()
+    editor.after(POLL_INTERVAL_MS, poll_reformat, editor, events, cancel,
+                 (edit_generation, doc, total, title))
+
+def poll_reformat(editor, events, cancel, started):
+    """Показывает ход фонового переформатирования и применяет результат, если текст не менялся"""
+    generation, doc, total, title = started
+    try:
+        while True:
+            event = events.get_nowait()
+            if event[0] == 'progress':
+                if not cancel.is_set():
+                    percent = min(event[1] * 100 // max(total, 1), 99)
+                    status_label.config(text=f"{title}: {percent}% (Esc - отмена)", fg="blue")
+                continue
+            break
+    except queue.Empty:
+        editor.after(POLL_INTERVAL_MS, poll_reformat, editor, events, cancel, started)
+        return
+
+    kind = event[0]
+    if cancel.is_set() or kind == 'cancelled':
+        if kind == 'done':
+            os.remove(event[1])
+        return
+    if kind == 'error':
+        finish_reformat()
+        status_label.config(text=f"❌ {title} невозможно: {event[1]}", fg="red")
+        if isinstance(event[1], ReformatError) and doc is None and generation == edit_generation:
+            editor.mark_set(INSERT, f"{event[1].line}.0")
+            editor.see(INSERT)
+        return
+    if generation != edit_generation or large_document is not doc:
+        # Текст поменялся, пока поток работал, - результат относится к прежнему тексту
+        os.remove(event[1])
+        finish_reformat()
+        status_label.config(text=f"{title}: текст изменился во время работы, повторите", fg="orange")
+        return
+
+    temp_path = event[1]
+    if doc is not None or os.path.getsize(temp_path) >= LARGE_FILE_BYTES:
+        open_large_document(temp_path, editor, temporary=True)
+        finish_reformat()
+        status_label.config(text=f"✅ {title} завершено (сохраните файл, чтобы записать результат)",
+                            fg="green")
+        return
+    replace_editor_text(editor, temp_path, title)
+
+def replace_editor_text(editor, path, title):
+    """Заменяет текст редактора содержимым файла порциями, чтобы окно не замирало.
+
+    Замена - один шаг отмены (Ctrl+Z); на время вставки правка запрещена.
+    """
+    global reformat_output
+    reformat_output = (open(path, 'r', encoding='utf-8', newline=''), path)
+    editor.config(autoseparators=False)
+    editor.edit_separator()
+    editor.delete('1.0', END)
+    editor.config(state=DISABLED)
+    editor.after(1, insert_reformatted_chunk, editor, reformat_output, title)
+
+def insert_reformatted_chunk(editor, output, title):
+    """Вставляет следующую порцию результата; после последней проверяет новый текст"""
+    if reformat_output is not output:
+        # Отменено - файл уже закрыт и удален
+        return
+    chunk = output[0].read(REFORMAT_INSERT_CHARS)
+    if chunk:
+        editor.config(state=NORMAL)
+        editor.insert('end - 1 char', chunk)
+        editor.config(state=DISABLED)
+        editor.after(1, insert_reformatted_chunk, editor, output, title)
+        return
+    finish_reformat()
+    editor.edit_separator()
+    editor.mark_set(INSERT, '1.0')
+    editor.see(INSERT)
+    editor.edit_modified(False)
+    mark_edited()
+    validate_json(editor)
+    if current_validation() is None or current_validation()[0] == 'ok':
+        status_label.config(text=f"✅ {title} завершено", fg="green")
+
+def finish_reformat():
+    """Освобождает состояние переформатирования и возвращает редактору правку"""
+    global reformat_cancel, reformat_output
+    reformat_cancel = None
+    if reformat_output is not None:
+        output, path = reformat_output
+        reformat_output = None
+        output.close()
+        os.remove(path)
+        text_widget.config(state=NORMAL, autoseparators=True)
+
+def cancel_reformat():
+    """Останавливает переформатирование (Esc, загрузка другого файла, выход из редактора).
+
+    Если результат уже вставлялся, прежний текст возвращается отменой правки.
+    """
+    if reformat_cancel is None:
+        return
+    inserting = reformat_output is not None
+    reformat_cancel.set()
+    finish_reformat()
+    if inserting:
+        text_widget.edit_separator()
+        text_widget.edit_undo()
+    status_label.config(text="Переформатирование отменено", fg="gray")
+
+# === СТРУКТУРА ДОКУМЕНТА И ПЕРЕХОД ПО ПУТИ КЛЮЧА ===
+def note_structure_edit(change):
+    """Передает правку структурному индексу (и строящемуся - она повторится после построения)"""
+    if structure_build is not None:
+        structure_build[1].append(change)
+    if structure_index is not None:
+        if change:
+            structure_index.edit(*change)
+        else:
+            structure_index.invalidate()
+
+def structure_lines(editor):
+    """(get_lines, число строк) текущего текста для StructureIndex.update"""
+    doc = large_document
+    if doc is None:
+        return editor_lines(editor), editor_line_count(editor)
+
+    def get_lines(first, last):
+        return [line.rstrip('\r\n') for line in doc.get_lines(first, last, sys.maxsize)[0]]
+    return get_lines, doc.line_count
+
+def reset_structure():
+    """Забывает структуру документа (загружен другой текст) и останавливает ее построение"""
+    global structure_index, structure_build
+    if structure_build is not None:
+        structure_build[0].set()
+        structure_build = None
+    structure_index = None
+    show_outline()
+
+def update_structure(editor):
+    """Приводит структуру документа к текущему тексту.
+
+    Обычно заново разбираются только затронутые правками члены корня (StructureIndex.update);
+    если так нельзя, индекс строится целиком. Пока текст не разбирается, остается прежний индекс.
+    """
+    if structure_build is not None:
+        # Правки, сделанные за время построения, будут учтены после него
+        return
+    if large_document is not None:
+        commit_large_window(editor)
+    if structure_index is not None:
+        changed = structure_index.dirty is not None
+        if structure_index.update(*structure_lines(editor)):
+            if changed:
+                show_outline()
+            return
+    start_structure_build(editor)
+
+def start_structure_build(editor):
+    """Строит структуру документа: небольшой текст - сразу, большой - в фоновом потоке"""
+    global structure_build
+    doc = large_document
+    if doc is not None:
+        pieces = list(doc.pieces)
+        fields = {'bytes_in': os.path.getsize(doc.path), 'mode': 'large'}
+        read_chunks = lambda: decode_chunks(doc.iter_chunks(REFORMAT_CHUNK_CHARS, pieces))
+    else:
+        content = editor.get('1.0', 'end-1c')
+        chars = len(content)
+        fields = {'chars': chars, 'mode': 'thread'}
+        if not content.strip():
+            reset_structure()
+            return
+        if chars < VALIDATION_INLINE_CHARS:
+            try:
+                with measure_stage('structure_index', chars=chars, mode='inline'):
+                    index = build_structure_index([content])
+            except ReformatError:
+                # Текст не разбирается - остается прежняя структура
+                return
+            set_structure_index(index)
+            return
+        read_chunks = lambda: (content[i:i + REFORMAT_CHUNK_CHARS]
+                               for i in range(0, chars, REFORMAT_CHUNK_CHARS))
+
+    events = queue.Queue()
+    build = structure_build = (threading.Event(), [])
+
+    def worker():
+        try:
+            with measure_stage('structure_index', **fields):
+                events.put(('done', build_structure_index(read_chunks(), build[0])))
+        except Exception as e:
+            events.put(('error', e))
+
+    threading.Thread(target=worker, daemon=True).start()
+    editor.after(POLL_INTERVAL_MS, poll_structure_build, editor, events, build)
+
+def poll_structure_build(editor, events, build):
+    """Дожидается фонового построения и повторяет на новом индексе правки, сделанные за это время"""
+    global structure_build
+    try:
+        kind, result = events.get_nowait()
+    except queue.Empty:
+        editor.after(POLL_INTERVAL_MS, poll_structure_build, editor, events, build)
+        return
+    if structure_build is not build:
+        # Загружен другой текст
+        return
+    structure_build = None
+    if kind == 'error':
+        return
+    for change in build[1]:
+        if change:
+            result.edit(*change)
+        else:
+            result.invalidate()
+    set_structure_index(result)
+    if build[1]:
+        update_structure(editor)
+
+def set_structure_index(index):
+    """Делает index структурой текущего текста и обновляет дерево"""
+    global structure_index
+    structure_index = index
+    show_outline()
+
+def show_outline():
+    """Показывает в дереве структуру документа (или найденные пути, если в поле перехода есть текст).
+
+    Раскрытые узлы и прокрутка сохраняются по путям ключей.
+    """
+    global outline_searching
+    if outline_tree is None:
+        return
+    tree = outline_tree
+    if not outline_searching:
+        outline_opened[:] = [path for item, path in outline_items.items() if tree.item(item, 'open')]
+    top = tree.yview()[0]
+    tree.delete(*tree.get_children())
+    outline_items.clear()
+    outline_more.clear()
+    index = structure_index
+    if index is None:
+        return
+    prefix = outline_entry.get().strip()
+    outline_searching = bool(prefix)
+    if prefix:
+        for path, node in index.search(prefix, OUTLINE_SEARCH_LIMIT):
+            outline_items[tree.insert('', END, text=path, values=(node_summary(node),))] = path
+        return
+
+    fill_outline_children('', 0, '')
+    by_path = {path: item for item, path in outline_items.items()}
+    for path in outline_opened:
+        # Пути идут в порядке раскрытия: родитель раскрывается раньше потомков
+        item = by_path.get(path)
+        if item is not None:
+            tree.item(item, open=True)
+            expand_outline_item(item)
+            by_path.update({shown: shown_item for shown_item, shown in outline_items.items()})
+    tree.yview_moveto(top)
+
+def node_summary(node):
+    """Подпись размера узла в дереве: {N} у объекта, [N] у массива"""
+    children = structure_index.children.get(node)
+    if children is None:
+        return ''
+    return f"{{{len(children)}}}" if isinstance(children, dict) else f"[{len(children)}]"
+
+def fill_outline_children(parent, node, path, start=0):
+    """Добавляет в дерево элементы узла начиная с start (не больше OUTLINE_CHILDREN_LIMIT)"""
+    tree = outline_tree
+    items = structure_index.items(node)
+    for key, child in items[start:start + OUTLINE_CHILDREN_LIMIT]:
+        child_item = tree.insert(parent, END, text=f"[{key}]" if isinstance(key, int) else key,
+                                 values=(node_summary(child),))
+        outline_items[child_item] = child_path(path, key)
+        if structure_index.children.get(child):
+            # Пустой пункт-заглушка, чтобы узел можно было раскрыть
+            tree.insert(child_item, END, text='')
+    rest = len(items) - start - OUTLINE_CHILDREN_LIMIT
+    if rest > 0:
+        more = tree.insert(parent, END, text=f"… ещё {rest}")
+        outline_more[more] = (parent, path, start + OUTLINE_CHILDREN_LIMIT)
+
+def expand_outline_item(item):
+    """Заполняет узел дерева при первом раскрытии"""
+    children = outline_tree.get_children(item)
+    if len(children) != 1 or children[0] in outline_items or children[0] in outline_more:
+        return
+    outline_tree.delete(children[0])
+    node = structure_index.find(outline_items[item])
+    if node is not None:
+        fill_outline_children(item, node, outline_items[item])
+
+def on_outline_open(event):
+    item = outline_tree.focus()
+    if item in outline_items:
+        expand_outline_item(item)
+
+def on_outline_select(focus=False):
+    """Переходит к выбранному в дереве ключу; пункт «ещё N» показывает следующие элементы.
+
+    focus - перевести фокус в текст (Enter, двойной щелчок); при выборе стрелками он остается в дереве.
+    """
+    selection = outline_tree.selection()
+    if not selection:
+        return
+    item = selection[0]
+    if item in outline_more:
+        parent, path, start = outline_more.pop(item)
+        outline_tree.delete(item)
+        node = structure_index.find(path)
+        if node is not None:
+            fill_outline_children(parent, node, path, start)
+        return
+    if item in outline_items:
+        go_to_path(outline_items[item], focus)
+
+def schedule_outline_search(event=None):
+    """Обновляет найденные пути, когда набор в поле перехода приостановится"""
+    global outline_search_job
+    if outline_search_job:
+        outline_entry.after_cancel(outline_search_job)
+    outline_search_job = outline_entry.after(150, run_outline_search)
+
+def run_outline_search():
+    global outline_search_job
+    outline_search_job = None
+    show_outline()
+
+def go_to_entered_path(event=None):
+    """Enter в поле перехода: к пути, а если его нет - к первому найденному"""
+    path = outline_entry.get().strip()
+    if structure_index is None:
+        status_label.config(text="Структура документа еще не построена", fg="orange")
+        return
+    if structure_index.find(path) is None:
+        found = structure_index.search(path, 1)
+        if not found:
+            status_label.config(text=f"Путь не найден: {path}", fg="orange")
+            return
+        path = found[0][0]
+    go_to_path(path)
+
+def go_to_path(path, focus=True):
+    """Переводит курсор к ключу (или элементу массива) по пути.
+
+    Позиция берется с учетом правок после последнего обновления структуры: в строке,
+    которую правили с тех пор, столбец может быть неточным.
+    """
+    editor = text_widget
+    doc = large_document
+    if doc is not None:
+        commit_large_window(editor)
+    node = structure_index.find(path) if structure_index is not None else None
+    if node is None:
+        status_label.config(text=f"Путь не найден: {path}", fg="orange")
+        return
+    line, column = structure_index.position(node)
+    if doc is not None:
+        if not doc.window[0] <= line - 1 < doc.window[1]:
+            load_large_window(editor, line - 1)
+        line -= doc.window[0]
+    editor.mark_set(INSERT, f"{line}.{column}")
+    editor.see(INSERT)
+    if focus:
+        editor.focus_set()
+
+def focus_outline_entry():
+    outline_entry.focus_set()
+    outline_entry.select_range(0, END)
+    return 'break'
+
+def create_json_editor_window():
+    global ask_window, text_widget, status_label, editor_win, editor_scroll_y, large_document
+    global editor_lexer, error_frame, error_listbox, outline_tree, outline_entry
+    
+    if ask_window:
+        ask_window.destroy()
+        ask_window = None
+
+    editor_win = Tk()
+    editor_win.title("JSON Редактор с проверкой")
+    editor_win.configure(bg="#f9f9f9")
+    place_window_near_cursor(editor_win, 1040, 540, 0, 0, 200)
+
+    # Статусная строка
+    status_label = Label(editor_win, text="Загрузите JSON-файл", relief=SUNKEN, anchor=W, bg="white")
+    status_label.pack(side=BOTTOM, fill=X)
+
+    # Кнопки
+    btn_frame = Frame(editor_win, bg="#f9f9f9")
+    btn_frame.pack(side=TOP, fill=X, padx=10, pady=5)
+
+    ttk.Button(btn_frame, text="Открыть файл", command=select_json_for_edit).pack(side=LEFT, padx=5)
+    ttk.Button(btn_frame, text="Проверить", command=lambda: validate_json(text_widget)).pack(side=LEFT, padx=5)
+    ttk.Button(btn_frame, text="Сохранить", command=save_json).pack(side=LEFT, padx=5)
+    ttk.Button(btn_frame, text="Формат", command=lambda: start_reformat(text_widget, 'pretty')).pack(side=LEFT, padx=5)
+    ttk.Button(btn_frame, text="Сжать", command=lambda: start_reformat(text_widget, 'compact')).pack(side=LEFT, padx=5)
+    ttk.Button(btn_frame, text="Сортировать ключи",
+               command=lambda: start_reformat(text_widget, 'pretty', sort_keys=True)).pack(side=LEFT, padx=5)
+    ttk.Button(btn_frame, text="Справка", command=show_help).pack(side=RIGHT, padx=5)
+    ttk.Button(btn_frame, text="Назад", command=lambda: go_back_to_main(editor_win)).pack(side=RIGHT, padx=5)
+
+    # Структура документа: поле перехода по пути ключа и дерево ключей
+    outline_frame = Frame(editor_win)
+    outline_frame.pack(side=LEFT, fill=Y, padx=(5, 0), pady=5)
+    outline_entry = ttk.Entry(outline_frame)
+    outline_entry.pack(side=TOP, fill=X, pady=(0, 3))
+    outline_entry.bind('<KeyRelease>', schedule_outline_search)
+    outline_entry.bind('<Return>', go_to_entered_path)
+    outline_tree = ttk.Treeview(outline_frame, columns=('size',), selectmode=BROWSE)
+    outline_tree.heading('#0', text="Ключ")
+    outline_tree.heading('size', text="Размер")
+    outline_tree.column('#0', width=170)
+    outline_tree.column('size', width=60, anchor=E, stretch=False)
+    outline_scroll = Scrollbar(outline_frame, orient=VERTICAL, command=outline_tree.yview)
+    outline_tree.config(yscrollcommand=outline_scroll.set)
+    outline_scroll.pack(side=RIGHT, fill=Y)
+    outline_tree.pack(side=LEFT, fill=Y, expand=True)
+    outline_tree.bind('<<TreeviewOpen>>', on_outline_open)
+    outline_tree.bind('<<TreeviewSelect>>', lambda e: on_outline_select())
+    outline_tree.bind('<Double-Button-1>', lambda e: on_outline_select(focus=True))
+    outline_tree.bind('<Return>', lambda e: on_outline_select(focus=True))
+    outline_items.clear()
+    outline_more.clear()
+
+    # Текстовое поле с прокруткой
+    text_frame = Frame(editor_win)
+    text_frame.pack(fill=BOTH, expand=True, padx=5, pady=5)
+
+    text_widget = Text(text_frame, wrap=NONE, font=("Consolas", 10), undo=True)
+    scroll_y = Scrollbar(text_frame, orient=VERTICAL, command=text_widget.yview)
+    scroll_x = Scrollbar(text_frame, orient=HORIZONTAL, command=text_widget.xview)
+    text_widget.config(yscrollcommand=on_editor_yscroll, xscrollcommand=scroll_x.set)
+    editor_scroll_y = scroll_y
+    large_document = None
+
+    scroll_y.pack(side=RIGHT, fill=Y)
+    scroll_x.pack(side=BOTTOM, fill=X)
+    text_widget.pack(side=LEFT, fill=BOTH, expand=True)
+
+    # Список ошибок документа (показывается под текстом, когда ошибки есть)
+    error_frame = Frame(editor_win)
+    error_listbox = Listbox(error_frame, height=5, font=("Consolas", 9), fg="red")
+    error_scroll = Scrollbar(error_frame, orient=VERTICAL, command=error_listbox.yview)
+    error_listbox.config(yscrollcommand=error_scroll.set)
+    error_scroll.pack(side=RIGHT, fill=Y)
+    error_listbox.pack(side=LEFT, fill=X, expand=True)
+    error_listbox.bind('<Double-Button-1>', go_to_error)
+    error_listbox.bind('<Return>', go_to_error)
+
+    # Теги подсветки; тег ошибки настраивается последним, чтобы быть поверх них
+    for tag, color in HIGHLIGHT_COLORS.items():
+        text_widget.tag_configure(tag, foreground=color)
+    text_widget.tag_configure('json_error', underline=True, foreground="red")
+    text_widget.tag_configure('error', background="yellow", foreground="red")
+
+    # Подсветка по правкам: разбираются только измененные и видимые строки
+    editor_lexer = IncrementalLexer()
+    track_text_changes(text_widget)
+    text_widget.bind('<Configure>', lambda e: schedule_highlight(text_widget))
+
+    # Автоматическая проверка после паузы в наборе
+    text_widget.bind('<<Modified>>', on_editor_modified)
+    
+    # Горячие клавиши
+    editor_win.bind('<Control-o>', lambda e: select_json_for_edit())
+    editor_win.bind('<Control-s>', lambda e: save_json())
+    editor_win.bind('<F5>', lambda e: validate_json(text_widget))
+    editor_win.bind('<Control-Shift-F>', lambda e: start_reformat(text_widget, 'pretty'))
+    editor_win.bind('<Control-Shift-M>', lambda e: start_reformat(text_widget, 'compact'))
+    editor_win.bind('<Control-Shift-K>', lambda e: start_reformat(text_widget, 'pretty', sort_keys=True))
+    editor_win.bind('<Escape>', lambda e: cancel_reformat())
+    editor_win.bind('<Control-g>', lambda e: focus_outline_entry())
+    
+    editor_win.mainloop()
+
+# === ОСНОВНОЕ МЕНЮ ===
+def create_ask_window():
+    global ask_window, editor_win, converter_win
+    
+    # Закрываем другие окна если они открыты
+    if editor_win:
+        try:
+            editor_win.destroy()
+        except:
+            pass
+        editor_win = None
+    
+    if converter_win:
+        try:
+            converter_win.destroy()
+        except:
+            pass
+        converter_win = None
+    
+    ask_window = Tk()
+    ask_window.title("XLSX/JSON Helper")
+    ask_window.configure(bg="#f9f9f9")
+    ask_window.resizable(False, False)
+    place_window_near_cursor(ask_window, 350, 180, 0, 0, 250)
+
+    Label(ask_window, text="Что вы хотите сделать?", 
+          font=("Segoe UI", 12, "bold"), bg="#f9f9f9").pack(pady=15)
+    
+    btn_frame = Frame(ask_window, bg="#f9f9f9")
+    btn_frame.pack(pady=10)
+    
+    ttk.Button(btn_frame, text="Конвертировать *.xlsx/*.xlsm в *.json", 
+               command=start_xls2json_win, width=40).pack(anchor=CENTER, pady=5)
+    ttk.Button(btn_frame, text="Исправление синтаксиса *.json", 
+               command=create_json_editor_window, width=40).pack(anchor=CENTER, pady=5)
+    ttk.Button(btn_frame, text="Справка", 
+               command=show_help, width=40).pack(anchor=CENTER, pady=5)
+    
+    # Горячие клавиши для быстрого доступа
+    ask_window.bind('<Control-1>', lambda e: start_xls2json_win())
+    ask_window.bind('<Control-2>', lambda e: create_json_editor_window())
+    ask_window.bind('<Escape>', lambda e: ask_window.destroy())
+
+    ask_window.mainloop()
@@ -0,0 +1,30 @@
+"""Отложенный импорт тяжелых библиотек: pandas и numpy загружаются при первом обращении"""
+import sys
+import importlib.util
+
+def lazy_import(name):
+    """Возвращает модуль, который выполнится при первом обращении к его атрибутам.
+
+    Уже загруженный модуль возвращается как есть.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"Не найден модуль {name}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def ensure_loaded(*modules):
+    """Загружает отложенные модули сразу (например, при прогреве рабочих процессов)"""
+    for module in modules:
+        getattr(module, '__name__')
+
+# Открытие редактора и запуск команд не ждут загрузки pandas (около полсекунды)
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
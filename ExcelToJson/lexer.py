@@ -0,0 +1,288 @@
+"""Построчный разбор JSON для подсветки и списка ошибок в редакторе (без Tk).
+
+Строка JSON не может переходить на следующую строку текста, поэтому разбор
+ведется по строкам: для каждой строки хранится состояние на ее начале (стек
+скобок и ожидаемый элемент). После правки строки перебираются от измененной,
+пока состояние не совпадет с прежним - дальше текст и результаты прежние.
+"""
+import re
+
+# === РАЗБОР СТРОКИ ===
+TOKEN_RE = re.compile(r'''
+    (?P<ws>[ \t\r\n]+)
+  | (?P<string>"(?:[^"\\]|\\.?)*(?P<close>")?)
+  | (?P<word>-?[A-Za-z_]\w*)
+  | (?P<number>-?\d[\w.]*(?:(?<=[eE])[+-][\w.]*)?|-)
+  | (?P<punct>[{}\[\]:,])
+  | (?P<other>.)
+''', re.VERBOSE)
+
+NUMBER_RE = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+# Escape-последовательности разбираются слева направо: вторая \ в \\ не начинает новую
+ESCAPE_RE = re.compile(r'\\(?:u[0-9a-fA-F]{4}|["\\/bfnrt]|(?P<bad>u[0-9a-fA-F]{0,3}|.))')
+CONTROL_CHAR_RE = re.compile(r'[\x00-\x1f]')
+
+# Слова, которые принимает json.loads (NaN и Infinity - как и проверка в редакторе)
+JSON_WORDS = frozenset(('true', 'false', 'null', 'NaN', 'Infinity', '-Infinity'))
+
+# Теги подсветки: ключ, строка, число, true/false/null, знаки; ошибки - отдельным тегом
+TOKEN_TAGS = ('json_key', 'json_string', 'json_number', 'json_literal', 'json_punct')
+CLOSERS = {'}': '{', ']': '['}
+
+# Состояние: (стек открытых скобок строкой, ожидаемый элемент). Ожидание:
+# value0 - значение или ']' (начало документа, после '['), value - значение,
+# key0 - ключ или '}' (после '{'), key - ключ, colon - ':', comma - ',' или
+# закрывающая скобка, end - конец документа
+INITIAL_STATE = ('', 'value0')
+
+# Начало окна большого файла: документ почти всегда - объект, окно начинается с ключа
+WINDOW_STATE = ('{', 'key0')
+
+_STATES = {}
+
+def intern_state(state):
+    """Возвращает общий экземпляр состояния: различных состояний немного, строк - миллионы"""
+    return _STATES.setdefault(state, state)
+
+def after_value(stack):
+    """Ожидание после законченного значения"""
+    return 'comma' if stack else 'end'
+
+def lex_line(text, state, opened=None):
+    """Разбирает одну строку, начиная с состояния state.
+
+    Возвращает (токены [(тег, начало, конец)], ошибки [(начало, конец, сообщение)],
+    состояние на конце строки, наименьшая глубина скобок в строке).
+    Разбор не останавливается на ошибке: после нее восстанавливается
+    по самому вероятному исправлению (пропущенная запятая, лишняя скобка...).
+    opened - словарь глубина → столбец последней открывшей ее скобки (заполняется).
+    """
+    stack, expect = state
+    tokens = []
+    errors = []
+    depth_min = len(stack)
+    for match in TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'ws':
+            continue
+        start, end = match.span()
+        value = match.group()
+
+        if kind == 'punct' and value in '}]':
+            tokens.append(('json_punct', start, end))
+            opener = CLOSERS[value]
+            if not stack or opener not in stack:
+                errors.append((start, end, f"Лишняя '{value}'"))
+                continue
+            if stack[-1] != opener:
+                errors.append((start, end, f"Не закрыта '{stack[-1]}' перед '{value}'"))
+                stack = stack[:stack.rindex(opener) + 1]
+            elif expect == 'key' or (expect == 'value' and opener == '['):
+                errors.append((start, end, f"Лишняя ',' перед '{value}'"))
+            elif expect in ('colon', 'value'):
+                errors.append((start, end, f"Нет значения перед '{value}'"))
+            stack = stack[:-1]
+            depth_min = min(depth_min, len(stack))
+            expect = after_value(stack)
+            continue
+
+        if kind == 'punct' and value == ':':
+            tokens.append(('json_punct', start, end))
+            if expect == 'colon':
+                expect = 'value'
+            else:
+                errors.append((start, end, "Неожиданное ':'"))
+            continue
+
+        if kind == 'punct' and value == ',':
+            tokens.append(('json_punct', start, end))
+            if expect == 'comma':
+                expect = 'key' if stack[-1] == '{' else 'value'
+            elif expect in ('key', 'value'):
+                errors.append((start, end, "Лишняя ','"))
+            else:
+                errors.append((start, end, "Неожиданная ','"))
+            continue
+
+        if kind == 'other':
+            errors.append((start, end, f"Недопустимый символ {value!r}"))
+            continue
+
+        # Начало значения: строка, число, слово или открывающая скобка
+        is_key = False
+        if expect in ('key0', 'key'):
+            if kind == 'string':
+                is_key = True
+            else:
+                errors.append((start, end, "Ожидался ключ в кавычках"))
+                if kind != 'punct':
+                    # Ключ без кавычек: дальше ожидается ':', а не ','
+                    tokens.append(('json_key', start, end))
+                    expect = 'colon'
+                    continue
+        elif expect == 'colon':
+            errors.append((start, end, "Пропущено ':'"))
+        elif expect == 'comma':
+            errors.append((start, end, "Пропущена ','"))
+            is_key = kind == 'string' and stack[-1] == '{'
+        elif expect == 'end':
+            errors.append((start, end, "Лишние данные после JSON"))
+
+        if kind == 'punct':
+            tokens.append(('json_punct', start, end))
+            stack += value
+            expect = 'key0' if value == '{' else 'value0'
+            if opened is not None:
+                opened[len(stack)] = start
+            continue
+
+        if kind == 'string':
+            tokens.append(('json_key' if is_key else 'json_string', start, end))
+            if match.group('close') is None:
+                errors.append((start, end, "Строка не закрыта"))
+            else:
+                for escape in ESCAPE_RE.finditer(value, 1, len(value) - 1):
+                    if escape.group('bad') is not None:
+                        errors.append((start + escape.start(), start + escape.end(),
+                                       "Неверная escape-последовательность"))
+                        break
+                control = CONTROL_CHAR_RE.search(value)
+                if control:
+                    errors.append((start + control.start(), start + control.end(),
+                                   "Управляющий символ в строке"))
+        elif kind == 'number':
+            tokens.append(('json_number', start, end))
+            if not NUMBER_RE.fullmatch(value):
+                errors.append((start, end, f"Неверное число {value}"))
+        else:
+            if value in JSON_WORDS:
+                tokens.append(('json_literal', start, end))
+            else:
+                errors.append((start, end, f"Неизвестное слово {value}"))
+        expect = 'colon' if is_key else after_value(stack)
+    return tokens, errors, intern_state((stack, expect)), depth_min
+
+# === ИНКРЕМЕНТАЛЬНЫЙ РАЗБОР ДОКУМЕНТА ===
+# Сколько строк запрашивается у редактора за раз
+LEX_BLOCK_LINES = 256
+
+class IncrementalLexer:
+    """Результаты построчного разбора документа, обновляемые по правкам.
+
+    states[i] - состояние в начале строки i (с нуля), states[line_count] - после
+    последней строки; errors[i] - ошибки строки или None; depths[i] - наименьшая
+    глубина скобок в строке; painted[i] - строка уже раскрашена в редакторе.
+    Строки до frontier разобраны для текущего текста. Текст строк от dirty_end
+    и дальше не менялся с последнего разбора, и их прежние состояния служат для
+    проверки сходимости (после полного разбора dirty_end = 0).
+    """
+
+    def __init__(self, line_count=1, initial=INITIAL_STATE):
+        self.initial = initial
+        self.reset(line_count)
+
+    def reset(self, line_count, initial=None):
+        """Забывает все результаты (новый текст целиком)"""
+        if initial is not None:
+            self.initial = initial
+        self.states = [self.initial] + [None] * line_count
+        self.errors = [None] * line_count
+        self.depths = [0] * line_count
+        self.painted = [False] * line_count
+        self.frontier = 0
+        self.dirty_end = line_count
+
+    @property
+    def line_count(self):
+        return len(self.errors)
+
+    @property
+    def complete(self):
+        """Разобран ли весь документ"""
+        return self.frontier >= self.line_count
+
+    def edit(self, line, removed, added):
+        """Учитывает правку: строки line..line+removed заменены строками line..line+added"""
+        self.states[line + 1:line + removed + 1] = [None] * added
+        self.errors[line:line + removed + 1] = [None] * (added + 1)
+        self.depths[line:line + removed + 1] = [0] * (added + 1)
+        self.painted[line:line + removed + 1] = [False] * (added + 1)
+        dirty_end = self.dirty_end
+        if dirty_end > line:
+            dirty_end = dirty_end + added - removed if dirty_end > line + removed else line + added + 1
+        self.dirty_end = max(dirty_end, line + added + 1)
+        self.frontier = min(self.frontier, line)
+
+    def advance(self, get_lines, upto, max_lines=None):
+        """Разбирает строки от frontier до upto включительно (или до сходимости).
+
+        get_lines(first, last) возвращает тексты строк first..last-1. max_lines
+        ограничивает работу за один вызов (разбор по частям в фоне).
+        Возвращает число разобранных строк.
+        """
+        count = self.line_count
+        done = 0
+        line = self.frontier
+        while line < count and line <= upto:
+            block_end = min(count, line + LEX_BLOCK_LINES)
+            if max_lines is not None:
+                block_end = min(block_end, line + max(max_lines - done, 1))
+            for text in get_lines(line, block_end):
+                _, errors, state, depth = lex_line(text, self.states[line])
+                self.errors[line] = errors or None
+                self.depths[line] = depth
+                done += 1
+                line += 1
+                if line >= self.dirty_end and self.states[line] == state:
+                    # Дальше текст не менялся, и состояние совпало - прежние результаты верны
+                    self.frontier, self.dirty_end = count, 0
+                    return done
+                if self.states[line] != state and line < count:
+                    # От состояния зависит раскраска (ключ или строка) - строку перекрашиваем
+                    self.painted[line] = False
+                self.states[line] = state
+            self.frontier = line
+            if max_lines is not None and done >= max_lines:
+                break
+        # Состояния до frontier уже новые: сходимость проверяется только по прежним, за ним
+        self.dirty_end = 0 if self.frontier >= count else max(self.dirty_end, self.frontier + 1)
+        return done
+
+    def line_tokens(self, line, text):
+        """Токены и ошибки строки line для раскраски (строка должна быть разобрана)"""
+        tokens, errors, _, _ = lex_line(text, self.states[line])
+        return tokens, errors
+
+    def unclosed_brackets(self, get_lines):
+        """Ошибки для скобок, не закрытых к концу документа: [(строка, начало, конец, сообщение)]"""
+        stack = self.states[self.line_count][0]
+        found = []
+        line = self.line_count - 1
+        for level in range(len(stack), 0, -1):
+            # Скобка уровня level открыта в последней строке, где глубина опускалась ниже level
+            while line > 0 and self.depths[line] >= level:
+                line -= 1
+            text = get_lines(line, line + 1)[0]
+            opened = {}
+            lex_line(text, self.states[line], opened)
+            column = opened.get(level, 0)
+            found.append((line, column, column + 1, f"Не закрыта '{stack[level - 1]}'"))
+        return found[::-1]
+
+    def document_errors(self, get_lines, limit=None):
+        """Все ошибки документа по порядку: [(строка, начало, конец, сообщение)].
+
+        Документ должен быть разобран целиком (complete).
+        """
+        found = []
+        for line, errors in enumerate(self.errors):
+            if errors:
+                found.extend((line, start, end, message) for start, end, message in errors)
+                if limit is not None and len(found) >= limit:
+                    return found[:limit]
+        final_stack, final_expect = self.states[self.line_count]
+        if final_stack:
+            found.extend(self.unclosed_brackets(get_lines))
+        elif final_expect == 'value0' and found:
+            found.append((self.line_count - 1, 0, 0, "Нет значения JSON"))
+        return found[:limit] if limit is not None else found
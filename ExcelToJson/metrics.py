@@ -0,0 +1,163 @@
+"""Метрики этапов конвертации: замеры, подписчики и вывод в JSON-lines"""
+import json
+import os
+import sys
+import time
+import threading
+
+# === МЕТРИКИ ЭТАПОВ ===
+# Подписчики на записи метрик: функции, получающие словарь (см. measure_stage)
+METRICS_HOOKS = []
+# Замерять пик памяти (tracemalloc заметно замедляет работу, поэтому отдельно)
+METRICS_MEMORY = False
+
+def add_metrics_hook(hook):
+    """Подписывает функцию hook(record) на записи метрик этапов и возвращает ее"""
+    METRICS_HOOKS.append(hook)
+    return hook
+
+def remove_metrics_hook(hook):
+    """Отписывает функцию от записей метрик"""
+    if hook in METRICS_HOOKS:
+        METRICS_HOOKS.remove(hook)
+
+def emit_metrics(record):
+    """Передает запись всем подписчикам; ошибка подписчика не прерывает работу"""
+    for hook in list(METRICS_HOOKS):
+        try:
+            hook(record)
+        except Exception as e:
+            print(f"Ошибка обработчика метрик: {e}", file=sys.stderr)
+
+# Открытые этапы с замером памяти. Пик tracemalloc один на процесс: перед сбросом
+# пика для нового этапа текущий пик сохраняется во всех открытых (внешних) этапах
+MEMORY_STAGES = []
+MEMORY_LOCK = threading.Lock()
+# Трассировку включили сами замеры (выключается, когда закрыт последний этап)
+memory_tracing_started = False
+
+class StageMetrics:
+    """Замер одного этапа (контекстный менеджер).
+
+    При выходе передает подписчикам запись: stage, seconds, start (время Unix),
+    переданные поля (file, rows, bytes_in, bytes_out, ...), rows_per_second,
+    peak_bytes (если METRICS_MEMORY) и error (если этап завершился исключением).
+    Поля, известные только в конце этапа, добавляются через update().
+    peak_bytes - пик памяти процесса за время этапа, включая вложенные этапы и
+    работу других потоков в это время.
+    """
+    __slots__ = ('record', 'started', 'peak')
+
+    def __init__(self, stage, fields):
+        self.record = {'stage': stage, **fields}
+
+    def update(self, **fields):
+        self.record.update(fields)
+
+    def __enter__(self):
+        global memory_tracing_started
+        self.peak = None
+        if METRICS_MEMORY:
+            import tracemalloc
+
+            with MEMORY_LOCK:
+                # Если трассировку уже кто-то включил, только сбрасываем пик
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    memory_tracing_started = True
+                peak = tracemalloc.get_traced_memory()[1]
+                for stage in MEMORY_STAGES:
+                    stage.peak = max(stage.peak, peak)
+                tracemalloc.reset_peak()
+                self.peak = 0
+                MEMORY_STAGES.append(self)
+        self.record['start'] = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        global memory_tracing_started
+        seconds = time.perf_counter() - self.started
+        record = self.record
+        record['seconds'] = round(seconds, 6)
+        if record.get('rows') and seconds > 0:
+            record['rows_per_second'] = round(record['rows'] / seconds)
+        if self.peak is not None:
+            import tracemalloc
+
+            with MEMORY_LOCK:
+                record['peak_bytes'] = max(self.peak, tracemalloc.get_traced_memory()[1])
+                MEMORY_STAGES.remove(self)
+                if not MEMORY_STAGES and memory_tracing_started:
+                    tracemalloc.stop()
+                    memory_tracing_started = False
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        emit_metrics(record)
+        return False
+
+class NullStage:
+    """Замер-заглушка, когда подписчиков нет: ничего не считает и не выделяет"""
+    __slots__ = ()
+
+    def update(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+NULL_STAGE = NullStage()
+
+def measure_stage(stage, **fields):
+    """Возвращает замер этапа для with; без подписчиков - общую заглушку"""
+    if not METRICS_HOOKS:
+        return NULL_STAGE
+    return StageMetrics(stage, fields)
+
+def emit_stage(stage, started, **fields):
+    """Передает запись этапа, начатого в started (time.perf_counter) и законченного сейчас.
+
+    Для этапов, которые нельзя обернуть в with (например, ожидание через after).
+    """
+    if not METRICS_HOOKS:
+        return
+    seconds = time.perf_counter() - started
+    record = {'stage': stage, **fields, 'start': time.time() - seconds, 'seconds': round(seconds, 6)}
+    if record.get('rows') and seconds > 0:
+        record['rows_per_second'] = round(record['rows'] / seconds)
+    emit_metrics(record)
+
+class JsonLinesSink:
+    """Подписчик, пишущий записи метрик построчно в JSON (файл или stderr)"""
+
+    def __init__(self, target='-'):
+        self.target = target
+        self.lock = threading.Lock()
+        # Дописываем в конец: несколько процессов могут писать в один файл
+        self.file = sys.stderr if target == '-' else open(target, 'a', encoding='utf-8')
+
+    def __call__(self, record):
+        line = json.dumps({'pid': os.getpid(), **record}, ensure_ascii=False, default=str) + '\n'
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stderr:
+            self.file.close()
+
+def enable_metrics(target='-', memory=False):
+    """Включает вывод метрик в JSON-lines (путь к файлу или '-' для stderr) и возвращает подписчика"""
+    global METRICS_MEMORY
+    METRICS_MEMORY = METRICS_MEMORY or memory
+    return add_metrics_hook(JsonLinesSink(target))
+
+def enable_metrics_from_env():
+    """Включает метрики по переменным окружения EXCELTOJSON_METRICS (файл или '-')
+    и EXCELTOJSON_METRICS_MEMORY=1"""
+    target = os.environ.get('EXCELTOJSON_METRICS')
+    if target:
+        enable_metrics(target, os.environ.get('EXCELTOJSON_METRICS_MEMORY') == '1')
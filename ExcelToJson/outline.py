@@ -0,0 +1,504 @@
+"""Структурный индекс JSON для навигации в редакторе: путь ключа → строка и столбец (без Tk).
+
+Индекс - дерево узлов: у объекта словарь ключ → узел, у массива список узлов.
+Путь разбирается по дереву, поэтому переход к a.b[12].c не зависит от размера
+документа. Правки текста сразу учитываются сдвигом строк (edit), а при проверке
+JSON заново разбираются только затронутые члены корневого объекта или массива
+(update); полное построение нужно, только если так обновить нельзя.
+"""
+import json
+import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+from .reformat import TOKEN_TAIL_CHARS, ReformatError, _STRING
+from .writer import check_cancelled
+
+# === ПУТИ ===
+# Ключ без скобок и кавычек пишется в пути как есть, в том числе с точками: ключ
+# "раздел.ключ" находится так же, как вложенный; остальные ключи - в виде ["ключ"]
+PLAIN_KEY_RE = re.compile(r'[^\[\]".][^\[\]"]*')
+SEGMENT_RE = re.compile(r'\[(?:(?P<index>\d+)|(?P<quoted>"(?:[^"\\]|\\.)*"))\]')
+KEY_END_RE = re.compile(r'[.\[]')
+
+def key_segment(key, first=False):
+    """Запись ключа в пути: .ключ (в начале пути - без точки) или ["ключ"]"""
+    if PLAIN_KEY_RE.fullmatch(key):
+        return key if first else '.' + key
+    return '[' + json.dumps(key, ensure_ascii=False) + ']'
+
+def child_path(path, key):
+    """Путь элемента объекта (key - строка) или массива (key - номер)"""
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return path + key_segment(key, first=not path)
+
+# === ИНДЕКС ===
+# Объекты от этого размера сортируются для поиска по началу ключа сразу при построении
+SORT_KEYS_MIN = 256
+
+# Сколько строк вокруг правок update разбирает заново; при большей правке индекс строится целиком
+UPDATE_MAX_LINES = 20000
+
+class StructureIndex:
+    """Дерево ключей документа с позициями.
+
+    Узел - номер; lines/columns - его позиция при построении (строка с 1, столбец
+    с 0): у члена объекта - позиция ключа, у прочих - начало значения. children[узел] -
+    dict ключ → узел у объекта (повторный ключ - первый), list у массива; у простых
+    значений записи нет. Узел 0 - весь документ.
+    """
+
+    def __init__(self):
+        self.lines = array('l')
+        self.columns = array('l')
+        self.children = {}
+        self.edits = []       # правки после построения: (строка с 0, удалено строк, добавлено)
+        self.sorted_keys = {}  # узел объекта → отсортированные ключи (для search)
+        # Члены корня по порядку документа (у массива - тот же список, что children[0])
+        # и их ключи, если корень - объект
+        self.members = None
+        self.member_keys = None
+        # Строки текущего текста (с 0), затронутые правками с последнего update: (первая, за последней)
+        self.dirty = None
+        self.stale = False     # была правка неизвестного размера - нужно полное построение
+        # Узлы от added_from[i] добавлены update; их позиции - с правки added_edits[i] журнала
+        self.added_from = array('l')
+        self.added_edits = array('l')
+
+    def __len__(self):
+        return len(self.lines)
+
+    def edit(self, line, removed, added):
+        """Учитывает правку текста: строки line..line+removed заменены строками line..line+added"""
+        self.edits.append((line, removed, added))
+        if self.dirty is None:
+            first, end = line, line + added + 1
+        else:
+            first, end = self.dirty
+            if first > line + removed:
+                first += added - removed
+            if end - 1 > line + removed:
+                end += added - removed
+        self.dirty = (min(first, line), max(end, line + added + 1))
+
+    def invalidate(self):
+        """Учитывает правку, границы которой неизвестны: позиции приблизительны до полного построения"""
+        self.stale = True
+
+    def position(self, node):
+        """Текущая позиция узла (строка с 1, столбец) с учетом правок после построения.
+
+        Строка, которую правили, остается на месте - столбец в ней приблизительный.
+        """
+        line, column = self.lines[node] - 1, self.columns[node]
+        edits = self.edits
+        if self.added_from and node >= self.added_from[0]:
+            edits = edits[self.added_edits[bisect_right(self.added_from, node) - 1]:]
+        for start, removed, added in edits:
+            if line > start + removed:
+                line += added - removed
+            elif line > start + added:
+                line, column = start + added, 0
+        return line + 1, column
+
+    def find(self, path):
+        """Узел по пути вида a.b[12].c или ["ключ"] ("" - весь документ) или None"""
+        return self._find(0, path.strip()) if len(self) else None
+
+    def _find(self, node, rest):
+        if not rest:
+            return node
+        children = self.children.get(node)
+        if children is None:
+            return None
+        match = SEGMENT_RE.match(rest)
+        if match:
+            child = self._segment_child(children, match)
+            if child is None:
+                return None
+            rest = rest[match.end():]
+            return self._find(child, rest[1:] if rest.startswith('.') else rest)
+        if not isinstance(children, dict):
+            return None
+        # Ключ может содержать точки: пробуем каждую границу, где он мог бы закончиться
+        for end in self._key_ends(rest):
+            child = children.get(rest[:end])
+            if child is not None:
+                tail = rest[end:]
+                found = self._find(child, tail[1:] if tail.startswith('.') else tail)
+                if found is not None:
+                    return found
+        return None
+
+    @staticmethod
+    def _key_ends(rest):
+        ends = [match.start() for match in KEY_END_RE.finditer(rest)]
+        ends.append(len(rest))
+        return ends
+
+    @staticmethod
+    def _segment_child(children, match):
+        if match.group('index') is not None:
+            if isinstance(children, list):
+                index = int(match.group('index'))
+                return children[index] if index < len(children) else None
+            return None
+        if isinstance(children, dict):
+            return children.get(json.loads(match.group('quoted')))
+        return None
+
+    def search(self, prefix, limit=100):
+        """Элементы, путь которых начинается с prefix: [(путь, узел)].
+
+        Ищутся элементы того уровня, до которого prefix разбирается целиком:
+        для a.b - a.b, a.bc и ключ "a.b.c" верхнего уровня, но не потомки a.b.
+        """
+        found = []
+        if len(self):
+            self._search(0, '', prefix.strip(), limit, found)
+        return found[:limit]
+
+    def _search(self, node, path, rest, limit, found):
+        children = self.children.get(node)
+        if children is None or len(found) >= limit:
+            return
+        match = SEGMENT_RE.match(rest)
+        if match:
+            child = self._segment_child(children, match)
+            if child is not None:
+                tail = rest[match.end():]
+                key = int(match.group('index')) if match.group('index') is not None \
+                    else json.loads(match.group('quoted'))
+                self._descend(child, child_path(path, key), tail, limit, found)
+            return
+        if isinstance(children, list):
+            self._search_indexes(children, path, rest, limit, found)
+            return
+
+        # Ключи, которые начинаются с rest, - по отсортированному списку
+        keys = self.sorted_keys.get(node)
+        if keys is None:
+            keys = self.sorted_keys[node] = sorted(children)
+        for i in range(bisect_left(keys, rest), len(keys)):
+            key = keys[i]
+            if not key.startswith(rest) or len(found) >= limit:
+                break
+            found.append((child_path(path, key), children[key]))
+        # И ключи, которыми rest начинается, - дальше по их потомкам
+        for end in self._key_ends(rest)[:-1]:
+            child = children.get(rest[:end])
+            if child is not None:
+                self._descend(child, child_path(path, rest[:end]), rest[end:], limit, found)
+
+    def _descend(self, node, path, tail, limit, found):
+        if tail.startswith('.'):
+            self._search(node, path, tail[1:], limit, found)
+        elif tail.startswith('['):
+            self._search(node, path, tail, limit, found)
+        elif not tail:
+            found.append((path, node))
+
+    @staticmethod
+    def _search_indexes(children, path, rest, limit, found):
+        # Номера, запись которых начинается с rest ('', '[', '[1'...), по возрастанию
+        digits = rest[1:] if rest.startswith('[') else rest
+        if rest and not rest.startswith('[') or digits and not digits.isdigit():
+            return
+        if not digits:
+            ranges = [(0, len(children))]
+        elif digits != '0' and digits.startswith('0'):
+            return
+        else:
+            # Номера с началом 12: 12, 120-129, 1200-1299...
+            ranges = []
+            first = int(digits)
+            scale = 1
+            while first * scale < len(children):
+                ranges.append((first * scale, min((first + 1) * scale, len(children))))
+                if first == 0:
+                    break
+                scale *= 10
+        for start, stop in ranges:
+            for index in range(start, stop):
+                if len(found) >= limit:
+                    return
+                found.append((f"{path}[{index}]", children[index]))
+
+    def items(self, node):
+        """Элементы узла по порядку: [(ключ или номер, узел)]"""
+        if node == 0 and self.member_keys is not None:
+            # После update порядок словаря корня не совпадает с порядком документа
+            return list(zip(self.member_keys, self.members))
+        children = self.children.get(node)
+        if children is None:
+            return []
+        if isinstance(children, dict):
+            return list(children.items())
+        return list(enumerate(children))
+
+    # === ОБНОВЛЕНИЕ ПО ПРАВКАМ ===
+    def update(self, get_lines, line_count):
+        """Разбирает заново члены корня, затронутые правками, и подставляет их в дерево.
+
+        get_lines(first, last) - тексты строк first..last-1 (с нуля, без переводов строк)
+        текущего текста, line_count - число его строк. Возвращает False, если так
+        обновить нельзя (правка до второго члена корня, затронуто больше
+        UPDATE_MAX_LINES строк, текст в месте правки - не JSON): тогда индекс нужно
+        построить заново (build_structure_index).
+        """
+        if self.stale:
+            return False
+        if self.dirty is None:
+            return True
+        if not self.members:
+            return False
+        first, end = self.dirty
+        members = self.members
+
+        # Разбираются строки от начала члена i до начала члена stop: член i начинается
+        # выше первой правки (его позиция точна), stop - ниже последней
+        i = self._members_before(first) - 1
+        if i < 0:
+            return False
+        start_line, start_column = self.position(members[i])
+        while i and self.position(members[i - 1])[0] == start_line:
+            i -= 1
+        stop = self._members_before(end)
+        stop_line = self.position(members[stop])[0] if stop < len(members) else line_count + 1
+        if stop_line - start_line > UPDATE_MAX_LINES:
+            return False
+        lines = get_lines(start_line - 1, stop_line - 1)
+        if len(lines) != stop_line - start_line or lines[0][:start_column].strip():
+            return False
+        # Разбираемый кусок - члены через запятую: за ним запятая перед членом stop
+        # или закрывающая скобка корня
+        opener, closer = ('{', '}') if self.member_keys is not None else ('[', ']')
+        body = '\n'.join(lines).rstrip()
+        if stop < len(members):
+            stop_column = self.position(members[stop])[1]
+            if not body.endswith(',') or get_lines(stop_line - 1, stop_line)[0][:stop_column].strip():
+                return False
+        elif not body.endswith(closer):
+            return False
+        try:
+            part = build_structure_index([opener + '\n', body[:-1], '\n' + closer])
+        except ReformatError:
+            return False
+        return self._splice(part, i, stop, start_line - 2)
+
+    def _members_before(self, line):
+        """Число членов корня, которые начинаются выше строки line (с 0)"""
+        low, high = 0, len(self.members)
+        while low < high:
+            middle = (low + high) // 2
+            if self.position(self.members[middle])[0] - 1 < line:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _splice(self, part, i, stop, line_shift):
+        # Узлы part (кроме его корня) добавляются в конец с номерами от base
+        members, keys = self.members, self.member_keys
+        old = members[i:stop]
+        if keys is not None:
+            # Повторные ключи корня проще учесть полным построением
+            root = self.children[0]
+            old_keys = keys[i:stop]
+            new_keys = part.member_keys
+            if any(root.get(key) != node for key, node in zip(old_keys, old)) \
+                    or len(set(new_keys)) != len(new_keys) \
+                    or any(key in root for key in set(new_keys).difference(old_keys)):
+                return False
+
+        base = len(self.lines)
+        shift = base - 1
+        self.lines.extend(line + line_shift for line in part.lines[1:])
+        self.columns.extend(part.columns[1:])
+        for node, container in part.children.items():
+            if node:
+                self.children[node + shift] = {key: child + shift for key, child in container.items()} \
+                    if isinstance(container, dict) else [child + shift for child in container]
+        for node, sorted_keys in part.sorted_keys.items():
+            if node:
+                self.sorted_keys[node + shift] = sorted_keys
+        self.added_from.append(base)
+        self.added_edits.append(len(self.edits))
+
+        for node in old:
+            self._forget(node)
+        members[i:stop] = [node + shift for node in part.members]
+        if keys is not None:
+            keys[i:stop] = new_keys
+            sorted_keys = self.sorted_keys.get(0)
+            for key in old_keys:
+                del root[key]
+                if sorted_keys is not None:
+                    del sorted_keys[bisect_left(sorted_keys, key)]
+            for key, node in zip(new_keys, members[i:i + len(new_keys)]):
+                root[key] = node
+                if sorted_keys is not None:
+                    insort(sorted_keys, key)
+        self.dirty = None
+        return True
+
+    def _forget(self, node):
+        # Убирает записи поддерева, замененного при update (позиции в массивах остаются)
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            children = self.children.pop(node, None)
+            if children is not None:
+                self.sorted_keys.pop(node, None)
+                pending.extend(children.values() if isinstance(children, dict) else children)
+
+# === ПОСТРОЕНИЕ ===
+# Токены для построения индекса. Проверка JSON идет отдельно, поэтому разбор
+# облегчен: запятые и двоеточия пропускаются вместе с пробелами (ключ от
+# строки-значения отличается по месту в объекте), числа и слова не разбираются
+STRUCTURE_TOKEN_RE = re.compile(r"""
+    [ \t\n\r,:]*
+    (?:
+        (?P<string>%s)
+      | (?P<open>[{\[])
+      | (?P<close>[}\]])
+      | (?P<scalar>[-+.0-9A-Za-z]+)
+      | (?P<bad>[^ \t\n\r,:])
+    )
+""" % _STRING, re.VERBOSE | re.DOTALL)
+
+def build_structure_index(chunks, cancel=None):
+    """Строит StructureIndex по порциям текста JSON.
+
+    Несогласованные скобки и недопустимые символы - ReformatError (прежний
+    индекс тогда остается в силе). cancel - threading.Event (ConversionCancelled).
+    """
+    index = StructureIndex()
+    lines, columns, children = index.lines, index.columns, index.children
+    add_line, add_column = lines.append, columns.append
+    stack = []            # children открытых контейнеров
+    members = []          # члены корня по порядку (у массива - сам children[0])
+    member_keys = []
+    in_object = False
+    key = None            # ключ, ожидающий значения, и его позиция
+    key_line = key_column = 0
+
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    scanned = 0           # до этого места переносы строк уже посчитаны
+    line = 1
+    line_start = 0        # начало текущей строки в buffer (может быть отрицательным)
+    token_start = 0
+    eof = False
+
+    def error(message):
+        return ReformatError(line + buffer.count('\n', scanned, token_start), message)
+
+    while not eof:
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+        else:
+            newlines = buffer.count('\n', scanned, pos)
+            if newlines:
+                line += newlines
+                line_start = buffer.rfind('\n', scanned, pos) + 1
+            buffer = buffer[pos:] + chunk
+            line_start -= pos
+            pos = scanned = 0
+            check_cancelled(cancel)
+        limit = len(buffer) if eof else len(buffer) - TOKEN_TAIL_CHARS
+
+        for match in STRUCTURE_TOKEN_RE.finditer(buffer, pos):
+            kind = match.lastgroup
+            token_start = start = match.start(kind)
+            if not eof and (match.end() > limit or (kind == 'bad' and buffer[start] == '"')):
+                # Токен мог оборваться на границе порции - разбираем его после дочитывания
+                break
+            pos = match.end()
+            if kind == 'close':
+                if not stack or (type(stack[-1]) is dict) != (buffer[start] == '}'):
+                    raise error(f"неожиданная '{buffer[start]}'")
+                stack.pop()
+                in_object = bool(stack) and type(stack[-1]) is dict
+                key = None
+                continue
+            if kind == 'bad':
+                raise error(f"недопустимый символ {buffer[start]!r}")
+
+            newlines = buffer.count('\n', scanned, start)
+            if newlines:
+                line += newlines
+                line_start = buffer.rfind('\n', scanned, start) + 1
+            scanned = start
+
+            if in_object and key is None:
+                if kind != 'string':
+                    raise error("ожидался ключ в кавычках")
+                token = match.group(kind)
+                key = json.loads(token) if '\\' in token else token[1:-1]
+                key_line = line
+                key_column = start - line_start
+                continue
+
+            # Начало значения: новый узел
+            node = len(lines)
+            if in_object:
+                add_line(key_line)
+                add_column(key_column)
+                stack[-1].setdefault(key, node)
+                if len(stack) == 1:
+                    members.append(node)
+                    member_keys.append(key)
+                key = None
+            else:
+                if not stack and node:
+                    raise error("лишние данные после JSON")
+                add_line(line)
+                add_column(start - line_start)
+                if stack:
+                    stack[-1].append(node)
+            if kind == 'open':
+                container = {} if buffer[start] == '{' else []
+                children[node] = container
+                stack.append(container)
+                in_object = type(container) is dict
+
+    if stack or not len(lines):
+        raise ReformatError(line, "документ оборван" if stack else "документ пуст")
+    root = children.get(0)
+    if isinstance(root, dict):
+        index.members, index.member_keys = members, member_keys
+    elif root is not None:
+        index.members = root
+    for node, container in children.items():
+        if isinstance(container, dict) and len(container) >= SORT_KEYS_MIN:
+            index.sorted_keys[node] = sorted(container)
+    return index
+
+def lines_edit(start, old, new):
+    """Правка для StructureIndex.edit по замене строк old строками new, начиная со строки start.
+
+    Совпадающие строки в начале и в конце не считаются измененными. None - строки
+    не изменились, () - границы правки выразить нельзя.
+    """
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    if prefix == len(old) == len(new):
+        return None
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    if prefix + suffix == limit:
+        # Строки только вставлены или только удалены: в правку входит соседняя строка
+        if prefix:
+            prefix -= 1
+        elif suffix:
+            suffix -= 1
+        else:
+            return ()
+    return start + prefix, len(old) - suffix - prefix - 1, len(new) - suffix - prefix - 1
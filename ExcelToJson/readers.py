@@ -0,0 +1,254 @@
+"""Движки чтения книг Excel: pandas, потоковое чтение openpyxl, calamine"""
+import os
+import importlib
+import importlib.util
+
+from .lazy import pd
+from .conversion import convert_dataframe, convert_value_by_type, resolve_converter
+from .metrics import measure_stage
+
+# === ПОТОКОВОЕ ЧТЕНИЕ БОЛЬШИХ ФАЙЛОВ ===
+# Начиная с этого размера файла режим auto читает книгу потоково
+STREAM_THRESHOLD_BYTES = 20 * 1024 * 1024
+
+# calamine держит лист в памяти целиком; больше этого размера auto читает потоково
+CALAMINE_MAX_BYTES = 200 * 1024 * 1024
+
+# Строки, которые pd.read_excel по умолчанию считает пустыми значениями
+EXCEL_NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+class ReaderEngine:
+    """Движок чтения книги.
+
+    Табличный движок читает лист в DataFrame через pd.read_excel(engine=pandas_engine),
+    потоковый (streaming) выдает строки по одной через openpyxl.
+    module - пакет, без которого движок недоступен (None - всегда доступен).
+    """
+
+    def __init__(self, name, extensions, pandas_engine=None, streaming=False, module=None):
+        self.name = name
+        self.extensions = extensions
+        self.pandas_engine = pandas_engine
+        self.streaming = streaming
+        self.module = module
+
+    def available(self):
+        return self.module is None or importlib.util.find_spec(self.module) is not None
+
+    def supports(self, excel_path):
+        return os.path.splitext(excel_path)[1].lower() in self.extensions
+
+    def read_frame(self, excel_path, sheet_name=0, usecols=(0, 1, 2)):
+        """Читает лист (или словарь листов) без заголовков, только столбцы usecols"""
+        return pd.read_excel(excel_path, sheet_name=sheet_name, header=None,
+                             usecols=list(usecols) if isinstance(usecols, tuple) else usecols,
+                             engine=self.pandas_engine)
+
+# Зарегистрированные движки чтения: имя → ReaderEngine
+READER_ENGINES = {}
+
+# Порядок выбора в режиме auto: (движок, файлы меньше скольких байт он берет; None - любые).
+# calamine (Rust) быстрее всех; без него небольшие книги читает pandas, большие - stream
+READER_AUTO_ORDER = [
+    ('calamine', CALAMINE_MAX_BYTES),
+    ('pandas', STREAM_THRESHOLD_BYTES),
+    ('stream', None),
+]
+
+def register_reader(engine):
+    """Регистрирует движок чтения (его имя можно передавать в reader)"""
+    READER_ENGINES[engine.name] = engine
+    return engine
+
+register_reader(ReaderEngine('pandas', ('.xlsx', '.xlsm', '.xls')))
+register_reader(ReaderEngine('stream', ('.xlsx', '.xlsm'), streaming=True, module='openpyxl'))
+register_reader(ReaderEngine('calamine', ('.xlsx', '.xlsm', '.xls'), pandas_engine='calamine',
+                             module='python_calamine'))
+
+def reader_modes():
+    """Допустимые значения reader: auto и имена зарегистрированных движков"""
+    return ('auto',) + tuple(READER_ENGINES)
+
+def choose_reader(excel_path, reader='auto'):
+    """Выбирает движок чтения книги: явно заданный или самый быстрый подходящий по формату и размеру"""
+    if reader != 'auto':
+        engine = READER_ENGINES.get(reader)
+        if engine is None:
+            raise ValueError(f"Неизвестный режим чтения: {reader}")
+        if not engine.available():
+            raise ValueError(f"Движок чтения {reader} недоступен: установите пакет {engine.module}")
+        if not engine.supports(excel_path):
+            raise ValueError(f"Движок чтения {reader} не читает файлы {os.path.splitext(excel_path)[1]}")
+        return reader
+    size = os.path.getsize(excel_path)
+    for name, max_bytes in READER_AUTO_ORDER:
+        engine = READER_ENGINES.get(name)
+        if (engine and engine.available() and engine.supports(excel_path)
+                and (max_bytes is None or size < max_bytes)):
+            return name
+    # Ни один движок не прошел по размеру - берем любой, который читает этот формат
+    for engine in READER_ENGINES.values():
+        if engine.available() and engine.supports(excel_path):
+            return engine.name
+    raise ValueError(f"Нет движка чтения для файлов {os.path.splitext(excel_path)[1]}")
+
+def reader_engine(excel_path, reader='auto'):
+    """Возвращает выбранный движок чтения (см. choose_reader)"""
+    return READER_ENGINES[choose_reader(excel_path, reader)]
+
+def read_cell(cell):
+    """Возвращает значение ячейки по тем же правилам, что и pd.read_excel"""
+    value = cell.value
+    if value is None or cell.data_type == 'e':
+        return None
+    if cell.data_type == 'n' and isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value in EXCEL_NA_STRINGS:
+        return None
+    return value
+
+def open_workbook_streaming(excel_path):
+    """Открывает книгу через openpyxl в режиме read_only (только значения, без внешних ссылок)"""
+    import openpyxl
+
+    return openpyxl.load_workbook(excel_path, read_only=True, data_only=True, keep_links=False)
+
+def unify_equal_cells(cells, memos):
+    """Заменяет True/1 и False/0 значением, которое раньше встретилось в том же столбце.
+
+    Так делает pd.read_excel в столбце с текстом (parsers.sanitize_objects): равные
+    значения заменяются первым из них, и тип string дает "True" или "1" по первой ячейке.
+    """
+    for i, value in enumerate(cells):
+        if (value is True or value is False or type(value) is int) and (value == 0 or value == 1):
+            cells[i] = memos[i].setdefault(value, value)
+
+def iter_worksheet_rows(sheet, columns=None):
+    """Лениво читает тройки (A, B, C) открытого листа.
+
+    columns - позиции читаемых столбцов (с нуля) в нужном порядке вместо A, B, C.
+    Значения столбца с текстом (обычно в нем есть заголовок) совпадают с pd.read_excel.
+    Столбец совсем без текста pandas приводит к одному типу (логические значения -
+    к числам, целые с пропусками - к дробным), а потоковое чтение оставляет каждой
+    ячейке ее тип: для таких столбцов тип string может дать другую строку.
+    """
+    if columns is None:
+        memos = [{}, {}, {}]
+        for row in sheet.iter_rows(max_col=3):
+            cells = [read_cell(cell) for cell in row]
+            cells.extend([None] * (3 - len(cells)))
+            # Полностью пустые строки pandas пропускает, делаем так же
+            if cells[0] is None and cells[1] is None and cells[2] is None:
+                continue
+            unify_equal_cells(cells, memos)
+            yield cells
+        return
+    memos = [{} for _ in columns]
+    for row in sheet.iter_rows(max_col=max(columns) + 1):
+        cells = [read_cell(row[column]) if column < len(row) else None for column in columns]
+        if any(cell is not None for cell in cells):
+            unify_equal_cells(cells, memos)
+            yield cells
+
+def iter_sheet_rows(excel_path, on_total=None):
+    """Лениво читает тройки (A, B, C) первого листа через openpyxl в режиме read_only.
+
+    on_total - необязательная функция, получающая число строк данных по размерам листа
+    (None, если размеры в файле не записаны).
+    """
+    workbook = open_workbook_streaming(excel_path)
+    try:
+        sheet = workbook.worksheets[0]
+        if on_total:
+            on_total(sheet.max_row - 1 if sheet.max_row else None)
+        yield from iter_worksheet_rows(sheet)
+    finally:
+        workbook.close()
+
+def iter_converted_rows(rows):
+    """Конвертирует тройки по мере поступления и выдает пары (ключ, значение).
+
+    Первая строка пропускается (заголовки), пустые ключи - тоже.
+    """
+    rows = iter(rows)
+    next(rows, None)
+    for key, value, data_type in rows:
+        if key is None:
+            continue
+        key = str(key).strip()
+        if key == '':
+            continue
+        yield key, convert_value_by_type(value, data_type)
+
+def iter_converted_columns(rows):
+    """Как iter_converted_rows для строк (ключ, тип, значение, значение, ...).
+
+    Тип каждой строки разбирается один раз на все ее значения; выдает пары
+    (ключ, [значения]).
+    """
+    rows = iter(rows)
+    next(rows, None)
+    for key, data_type, *values in rows:
+        if key is None:
+            continue
+        key = str(key).strip()
+        if key == '':
+            continue
+        converter = resolve_converter(data_type)
+        yield key, [None if pd.isna(value) or value == '' else converter(value) for value in values]
+
+def read_excel_result(excel_path, reader='auto', on_read=None):
+    """Читает книгу выбранным способом и возвращает словарь ключ → значение.
+
+    on_read() вызывается, когда лист прочитан целиком и еще не конвертирован
+    (в режиме stream чтение и конвертация идут вместе, и вызова нет).
+    """
+    engine = reader_engine(excel_path, reader)
+    if engine.streaming:
+        with measure_stage('read_convert', file=excel_path, reader=engine.name) as stage:
+            result = dict(iter_converted_rows(iter_sheet_rows(excel_path)))
+            stage.update(rows=len(result))
+        return result
+
+    # Читаем Excel файл без заголовков (header=None), так как первая строка - это заголовки таблицы
+    # Читаем только столбцы A (0), B (1), C (2)
+    with measure_stage('read_excel', file=excel_path, reader=engine.name,
+                       bytes_in=os.path.getsize(excel_path)) as stage:
+        df = engine.read_frame(excel_path)
+        stage.update(rows=len(df))
+    if on_read:
+        on_read()
+
+    # Конвертируем все строки пакетно, сгруппировав их по типу
+    with measure_stage('convert', file=excel_path, rows=len(df)):
+        return convert_dataframe(df)
+
+class DuplicateKeyError(Exception):
+    """Ключ встретился повторно - потоковую запись нужно повторить через словарь"""
+
+def iter_unique_pairs(pairs):
+    """Пропускает пары дальше, пока ключи не повторяются (хранит только сами ключи)"""
+    seen = set()
+    for key, value in pairs:
+        if key in seen:
+            raise DuplicateKeyError(key)
+        seen.add(key)
+        yield key, value
+
+def iter_excel_pairs(excel_path, reader='auto', on_total=None, on_read=None):
+    """Выдает пары (ключ, значение) книги выбранным способом чтения.
+
+    В режиме stream пары идут прямо из openpyxl; при повторном ключе выбрасывается
+    DuplicateKeyError, т.к. json.dumps оставляет первую позицию и последнее значение.
+    on_total получает ожидаемое число пар, как только оно становится известно,
+    on_read - см. read_excel_result.
+    """
+    if reader_engine(excel_path, reader).streaming:
+        return iter_unique_pairs(iter_converted_rows(iter_sheet_rows(excel_path, on_total)))
+    result = read_excel_result(excel_path, reader, on_read)
+    if on_total:
+        on_total(len(result))
+    return iter(result.items())
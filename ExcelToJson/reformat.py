@@ -0,0 +1,275 @@
+"""Потоковое переформатирование JSON для редактора: отступы, сжатие, сортировка ключей (без Tk).
+
+Текст разбирается по токенам и сразу записывается заново: объекты Python не
+создаются, строки и числа переносятся как есть (escape-последовательности и
+запись чисел не меняются). При сортировке ключей члены внешнего объекта
+складываются во временный файл - в памяти остаются их ключи и вложенные
+объекты, которые еще не закрыты.
+"""
+import codecs
+import json
+import re
+import tempfile
+from array import array
+
+from .writer import check_cancelled
+
+# === ПЕРЕФОРМАТИРОВАНИЕ ===
+# Стили записи: pretty - как json.dumps(indent=2), compact - без пробелов
+REFORMAT_STYLES = ('pretty', 'compact')
+
+# Сколько символов исходного текста разбирается за одну порцию
+REFORMAT_CHUNK_CHARS = 1024 * 1024
+
+# Сколько кусков текста копится перед записью
+REFORMAT_FLUSH_PIECES = 4096
+
+# Токены JSON вместе с пробелами перед ними; ключ забирает и свое ':'. Строки и числа
+# проверяются полностью, всё прочее попадает в bad. Строка записана развернутым
+# циклом, а ни одна альтернатива не начинается с пробела - откат при неудаче линейный
+_STRING = r'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"'
+TOKEN_RE = re.compile(r"""
+    [ \t\n\r]*
+    (?:
+        (?P<key>%s)[ \t\n\r]*:
+      | (?P<string>%s)
+      | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?(?![0-9A-Za-z.+-]))
+      | (?P<literal>(?:true|false|null|NaN|-?Infinity)(?![0-9A-Za-z_]))
+      | (?P<punct>[{}\[\]:,])
+      | (?P<bad>[^ \t\n\r])
+    )
+""" % (_STRING, _STRING), re.VERBOSE | re.DOTALL)
+
+# Токен ближе к концу порции может быть оборван (число, слово) - он разбирается
+# после дочитывания следующей порции
+TOKEN_TAIL_CHARS = 64
+
+def decode_chunks(chunks):
+    """Декодирует порции байтов UTF-8 (BOM пропускается) в порции текста; символ может попасть на границу порций"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+class ReformatError(ValueError):
+    """Текст не является корректным JSON; line - номер строки (с единицы)"""
+
+    def __init__(self, line, message):
+        super().__init__(f"Строка {line}: {message}")
+        self.line = line
+
+def reformat_json(chunks, write, style='pretty', sort_keys=False, cancel=None):
+    """Переписывает JSON из порций текста chunks через write(текст) в стиле style.
+
+    sort_keys - упорядочить ключи объектов (как json.dumps(sort_keys=True);
+    повторные ключи сохраняются в исходном порядке). cancel - threading.Event для
+    остановки (ConversionCancelled), проверяется перед каждой порцией.
+    При ошибке в JSON выбрасывается ReformatError. Возвращает число записанных символов.
+    """
+    if style not in REFORMAT_STYLES:
+        raise ValueError(f"Неизвестный стиль: {style}")
+    pretty = style == 'pretty'
+    colon, comma = (': ', ',') if pretty else (':', ',')
+
+    stack = []          # открытые скобки
+    # При сортировке для каждого открытого объекта: [члены, текущий член, его ключ]
+    # и у внешнего объекта - смещения членов во временном файле spill
+    members = []
+    spill = None
+    out = []            # куски, еще не записанные в write
+    written = 0
+    expect = 'value0'
+    pending_open = False  # скобка только что открыта: перенос строки - перед первым элементом
+
+    def sink():
+        # Внутри сортируемого объекта текст копится в его текущем члене
+        return members[-1][1] if members else out
+
+    def flush():
+        nonlocal written
+        text = ''.join(out)
+        out.clear()
+        write(text)
+        written += len(text)
+
+    def finish_member():
+        # Члены внешнего сортируемого объекта уходят во временный файл, в памяти -
+        # только ключи и смещения; вложенные объекты собираются в памяти
+        frame = members[-1]
+        if frame[1] is None:
+            return
+        text = ''.join(frame[1])
+        frame[1] = None
+        if len(members) == 1:
+            spill.write(text.encode('utf-8'))
+            frame[0].append(frame[2])
+            frame[3].append(spill.tell())
+        else:
+            frame[0].append((frame[2], text))
+
+    def emit_object(items, depth):
+        target = sink()
+        if not items:
+            target.append('{}')
+            return
+        items.sort(key=lambda item: item[0])
+        if pretty:
+            inner = '\n' + '  ' * depth
+            target.append('{' + inner)
+            target.append((',' + inner).join(text for _, text in items))
+            target.append('\n' + '  ' * (depth - 1) + '}')
+        else:
+            target.append('{' + ','.join(text for _, text in items) + '}')
+
+    def emit_spilled(keys, offsets, depth):
+        if not keys:
+            out.append('{}')
+            return
+        inner = '\n' + '  ' * depth if pretty else ''
+        out.append('{' + inner)
+        for number, index in enumerate(sorted(range(len(keys)), key=keys.__getitem__)):
+            spill.seek(offsets[index])
+            text = spill.read(offsets[index + 1] - offsets[index]).decode('utf-8')
+            out.append(',' + inner + text if number else text)
+            if len(out) >= REFORMAT_FLUSH_PIECES:
+                flush()
+        out.append('\n' + '  ' * (depth - 1) + '}' if pretty else '}')
+        spill.seek(0)
+        spill.truncate()
+
+    def error(message):
+        # Номер строки считается только для ошибки: начало порции + переносы до токена
+        return ReformatError(line_base + buffer.count('\n', 0, token_start), message)
+
+    def bad_token(char):
+        if char == '"':
+            return error("неверная строка: не закрыта, управляющий символ или escape-последовательность")
+        if char in '-0123456789':
+            return error("неверное число")
+        return error("неизвестное слово" if char.isalpha() else f"недопустимый символ {char!r}")
+
+    try:
+        chunks = iter(chunks)
+        buffer = ''
+        pos = 0
+        token_start = 0
+        line_base = 1
+        eof = False
+        while not eof:
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+            else:
+                line_base += buffer.count('\n', 0, pos)
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                check_cancelled(cancel)
+            limit = len(buffer) if eof else len(buffer) - TOKEN_TAIL_CHARS
+
+            for match in TOKEN_RE.finditer(buffer, pos):
+                kind = match.lastgroup
+                token_start = match.start(kind)
+                if not eof and (match.end() > limit or (kind == 'bad' and match.group(kind) == '"')):
+                    # Токен мог оборваться на границе порции - разбираем его после дочитывания
+                    break
+                pos = match.end()
+                token = match.group(kind)
+
+                if kind == 'punct' and token in '}]':
+                    opener = '{' if token == '}' else '['
+                    if not stack or stack[-1] != opener:
+                        raise error(f"неожиданная '{token}'")
+                    if expect in ('key', 'value', 'colon'):
+                        raise error(f"нет значения перед '{token}'")
+                    stack.pop()
+                    if opener == '{' and sort_keys:
+                        finish_member()
+                        pending_open = False
+                        frame = members.pop()
+                        if members:
+                            emit_object(frame[0], len(stack) + 1)
+                        else:
+                            emit_spilled(frame[0], frame[3], len(stack) + 1)
+                    elif pending_open:
+                        sink().append(token)
+                        pending_open = False
+                    else:
+                        sink().append('\n' + '  ' * len(stack) + token if pretty else token)
+                    expect = 'comma' if stack else 'end'
+                elif kind == 'punct' and token == ',':
+                    if expect != 'comma':
+                        raise error("неожиданная ','")
+                    if stack[-1] == '{':
+                        if sort_keys:
+                            finish_member()
+                        else:
+                            sink().append(comma + '\n' + '  ' * len(stack) if pretty else comma)
+                        expect = 'key'
+                    else:
+                        sink().append(comma + '\n' + '  ' * len(stack) if pretty else comma)
+                        expect = 'value'
+                elif kind == 'punct' and token == ':':
+                    if expect != 'colon':
+                        raise error("неожиданное ':'")
+                    sink().append(colon)
+                    expect = 'value'
+                elif kind == 'bad':
+                    if expect in ('key0', 'key') and token != '"':
+                        raise error("ожидался ключ в кавычках")
+                    raise bad_token(token)
+                elif expect in ('key0', 'key'):
+                    # Ключ вместе с ':' (kind == 'key') или без него, если ':' в следующей порции
+                    if kind not in ('key', 'string'):
+                        raise error("ожидался ключ в кавычках")
+                    if sort_keys:
+                        frame = members[-1]
+                        frame[1] = []
+                        frame[2] = json.loads(token)
+                    elif pending_open and pretty:
+                        sink().append('\n' + '  ' * len(stack))
+                    pending_open = False
+                    if kind == 'key':
+                        sink().append(token + colon)
+                        expect = 'value'
+                    else:
+                        sink().append(token)
+                        expect = 'colon'
+                elif expect in ('value0', 'value'):
+                    if kind == 'key':
+                        raise error("неожиданное ':'")
+                    if pending_open and pretty:
+                        sink().append('\n' + '  ' * len(stack))
+                    pending_open = False
+                    if kind != 'punct':
+                        sink().append(token)
+                        expect = 'comma' if stack else 'end'
+                    else:
+                        stack.append(token)
+                        expect = 'key0' if token == '{' else 'value0'
+                        if token == '{' and sort_keys:
+                            if spill is None:
+                                spill = tempfile.TemporaryFile()
+                            members.append([[], None, None, array('q', [spill.tell()])])
+                        else:
+                            sink().append(token)
+                            pending_open = True
+                elif expect == 'end':
+                    raise error("лишние данные после JSON")
+                else:
+                    raise error("пропущена ','" if expect == 'comma' else "пропущено ':'")
+
+                if len(out) >= REFORMAT_FLUSH_PIECES:
+                    flush()
+
+        token_start = len(buffer)
+        if expect != 'end':
+            raise error("документ оборван" if stack or expect != 'value0' else "документ пуст")
+        flush()
+        return written
+    finally:
+        if spill is not None:
+            spill.close()
@@ -0,0 +1,329 @@
+"""Обратная конвертация JSON → Excel: таблица ключ / значение / тип.
+
+JSON читается потоково (пара за парой), книга пишется построчно: xlsxwriter в
+режиме constant_memory или openpyxl в режиме write_only. Значение и тип каждой
+строки подбираются так, чтобы обратная конвертация Excel → JSON вернула те же данные.
+"""
+import json
+import math
+import os
+import re
+import sys
+import time
+from decimal import Decimal
+
+from .metrics import measure_stage
+from .readers import EXCEL_NA_STRINGS
+from .writer import check_cancelled, iter_with_progress
+from .diff import open_json_input
+from .convert import build_json_save_path
+
+# === ПОТОКОВОЕ ЧТЕНИЕ JSON ===
+# Сколько символов читается из файла за раз
+READ_CHUNK_CHARS = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+# Символы, которыми может продолжаться число (1 → 1e5)
+_NUMBER_TAIL_RE = re.compile(r'[0-9.eE+-]*')
+
+def exact_number(value, text):
+    """Число верхнего уровня: float, если он записывается без потери точности, иначе Decimal"""
+    if type(value) is not float or not math.isfinite(value) or repr(value) == text:
+        return value
+    return value if Decimal(repr(value)) == Decimal(text) else Decimal(text)
+
+def iter_json_pairs(f, lines=False, chunk_chars=READ_CHUNK_CHARS):
+    """Потоково разбирает объект JSON верхнего уровня и выдает пары (ключ, значение).
+
+    В памяти держится только текущая пара и порция текста. lines=True - NDJSON:
+    объекты идут один за другим. Повторные ключи выдаются как есть, по порядку.
+    Числа верхнего уровня, которые float записал бы неточно, выдаются как Decimal.
+    """
+    buffer = ''
+    pos = 0
+    offset = 0
+    eof = False
+
+    def read_more():
+        # Прочитанное отбрасывается; порция не меньше уже накопленного - длинное значение
+        # разбирается заново не больше log(размер) раз
+        nonlocal buffer, pos, offset, eof
+        chunk = f.read(max(chunk_chars, len(buffer) - pos))
+        eof = not chunk
+        offset += pos
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def error(message, at=None):
+        return ValueError(f"Ошибка JSON на символе {offset + (pos if at is None else at)}: {message}")
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE_RE.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return
+            read_more()
+
+    def decode():
+        # Значение принимается, только если за ним в порции есть символ, которым
+        # оно не может продолжаться: иначе число на границе порции могло оборваться
+        nonlocal pos
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+                if eof or _NUMBER_TAIL_RE.match(buffer, end).end() < len(buffer):
+                    value = exact_number(value, buffer[pos:end])
+                    pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                truncated = e.pos >= len(buffer) - 8 or e.msg.startswith('Unterminated string')
+                if eof or not truncated:
+                    raise error(e.msg, e.pos)
+            read_more()
+
+    def expect(chars):
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise error("неожиданный конец файла")
+        char = buffer[pos]
+        if char not in chars:
+            raise error(f"ожидалось {' или '.join(repr(c) for c in chars)}, а не {char!r}")
+        pos += 1
+        return char
+
+    read_more()
+    if buffer.startswith('\ufeff'):
+        pos = 1
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            if not lines:
+                raise error("файл пуст")
+            return
+        if buffer[pos] != '{':
+            raise error("ожидался объект JSON {ключ: значение}")
+        pos += 1
+        skip_whitespace()
+        if buffer[pos:pos + 1] == '}':
+            pos += 1
+        else:
+            while True:
+                skip_whitespace()
+                if buffer[pos:pos + 1] != '"':
+                    raise error("ожидался ключ в кавычках")
+                key = decode()
+                expect(':')
+                skip_whitespace()
+                value = decode()
+                yield key, value
+                if expect(',}') == '}':
+                    break
+        if not lines:
+            skip_whitespace()
+            if pos < len(buffer):
+                raise error("лишние данные после JSON")
+            return
+
+def iter_json_file_pairs(json_path, chunk_chars=READ_CHUNK_CHARS):
+    """Пары (ключ, значение) файла JSON или NDJSON, в том числе сжатого (.gz, .zst)"""
+    with open_json_input(json_path) as f:
+        yield from iter_json_pairs(f, '.ndjson' in os.path.basename(json_path), chunk_chars)
+
+# === СТРОКИ КНИГИ ===
+# Заголовки таблицы (первая строка при чтении пропускается)
+EXCEL_HEADER = ['Ключ', 'Значение', 'Тип']
+
+# Ограничения формата xlsx: строк на листе и символов в ячейке
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_CELL_CHARS = 32767
+
+# Целые числа, которые ячейка-число (double) хранит точно; большие пишутся текстом
+EXCEL_MAX_EXACT_INT = 2 ** 53
+
+# Бесконечности и NaN ячейка-число не хранит ('NaN' при чтении стал бы пустым значением),
+# а -0.0 прочиталось бы как 0 - они пишутся текстом
+NON_FINITE_TEXT = {math.inf: 'Infinity', -math.inf: '-Infinity'}
+
+# Управляющие символы, недопустимые в XML книги
+ILLEGAL_CELL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+def check_cell_text(key, text):
+    """Проверяет, что текст помещается в ячейку"""
+    if len(text) > EXCEL_MAX_CELL_CHARS:
+        raise ValueError(f"Значение ключа {key!r} длиннее {EXCEL_MAX_CELL_CHARS} символов "
+                         f"- ячейка Excel его не вместит")
+    return text
+
+def excel_row(key, value):
+    """Строка книги [ключ, значение, тип], из которой convert_value_by_type вернет value.
+
+    Строки, которые при чтении книги стали бы пустыми ('', 'NA', ...) или содержат
+    недопустимые в xlsx символы, записываются как тип json в кавычках.
+    """
+    if not isinstance(key, str) or key != key.strip() or key in EXCEL_NA_STRINGS \
+            or ILLEGAL_CELL_CHARS_RE.search(key):
+        raise ValueError(f"Ключ {key!r} нельзя записать в Excel: при чтении книги он изменится или пропадет")
+    check_cell_text(key, key)
+    if value is None:
+        return [key, None, 'null']
+    if value is True or value is False:
+        return [key, value, 'bool']
+    if type(value) is int:
+        return [key, value if abs(value) <= EXCEL_MAX_EXACT_INT else str(value), 'number']
+    if type(value) is float:
+        if math.isnan(value):
+            return [key, 'NAN', 'float']
+        if value == 0 and math.copysign(1, value) < 0:
+            return [key, '-0.0', 'float']
+        return [key, NON_FINITE_TEXT.get(value, value), 'float']
+    if isinstance(value, Decimal):
+        return [key, str(value), 'decimal']
+    if isinstance(value, str):
+        if value in EXCEL_NA_STRINGS or ILLEGAL_CELL_CHARS_RE.search(value):
+            return [key, check_cell_text(key, json.dumps(value, ensure_ascii=False)), 'json']
+        return [key, check_cell_text(key, value), 'string']
+    return [key, check_cell_text(key, json.dumps(value, ensure_ascii=False, separators=(',', ':'))), 'json']
+
+def iter_excel_rows(pairs):
+    """Строки книги: заголовки, затем по строке на пару (не больше EXCEL_MAX_ROWS)"""
+    yield list(EXCEL_HEADER)
+    for number, (key, value) in enumerate(pairs, 2):
+        if number > EXCEL_MAX_ROWS:
+            raise ValueError(f"На листе Excel помещается не больше {EXCEL_MAX_ROWS - 1} ключей")
+        yield excel_row(key, value)
+
+# === ЗАПИСЬ КНИГИ ===
+# Способ записи: xlsxwriter (constant_memory, быстрее), openpyxl (write_only) или auto
+EXCEL_WRITERS = ('auto', 'xlsxwriter', 'openpyxl')
+
+def excel_writer(name='auto'):
+    """Выбирает способ записи книги; xlsxwriter - только если пакет установлен"""
+    if name not in EXCEL_WRITERS:
+        raise ValueError(f"Неизвестный способ записи книги: {name}")
+    if name == 'openpyxl':
+        return name
+    try:
+        import xlsxwriter  # noqa: F401
+    except ImportError:
+        if name == 'xlsxwriter':
+            raise ValueError("Для записи через xlsxwriter установите пакет xlsxwriter (pip install xlsxwriter)")
+        return 'openpyxl'
+    return 'xlsxwriter'
+
+def write_rows_xlsxwriter(path, rows):
+    """Пишет строки в книгу через xlsxwriter: в памяти держится только текущая строка"""
+    import xlsxwriter
+
+    # Текст пишется как есть: без превращения в формулы, числа и ссылки
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'strings_to_formulas': False,
+                                          'strings_to_numbers': False, 'strings_to_urls': False})
+    sheet = workbook.add_worksheet()
+    count = 0
+    try:
+        for count, row in enumerate(rows):
+            sheet.write_row(count, 0, row)
+    finally:
+        workbook.close()
+    return count
+
+def write_rows_openpyxl(path, rows):
+    """Пишет строки в книгу через openpyxl в режиме write_only (строки сразу уходят на диск)"""
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    count = 0
+    try:
+        for count, row in enumerate(rows):
+            for column in (0, 1):
+                value = row[column]
+                # Текст, похожий на формулу или код ошибки, openpyxl записал бы не строкой
+                if isinstance(value, str) and value[:1] in ('=', '#'):
+                    cell = WriteOnlyCell(sheet, value)
+                    cell.data_type = 's'
+                    row[column] = cell
+            sheet.append(row)
+    except BaseException:
+        # Лист закрывается и при ошибке (иначе его запись срабатывает уже после закрытия
+        # файла); недописанная книга удаляется
+        try:
+            workbook.save(path)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    workbook.save(path)
+    return count
+
+# Окончание имени результата конвертации: _<ГГГГ.ММ.ДД_ЧЧ-ММ>.json (.ndjson, .gz, .zst)
+JSON_NAME_RE = re.compile(r'(_\d{4}\.\d{2}\.\d{2}_\d{2}-\d{2})?(\.json|\.ndjson)(\.gz|\.zst)?$')
+
+def build_excel_save_path(json_path):
+    """Путь книги рядом с JSON: <имя>_<дата>.xlsx.
+
+    Дата из имени результата конвертации сохраняется (у результатов разных запусков -
+    разные книги), имени без даты добавляется текущая.
+    """
+    folder = os.path.dirname(json_path)
+    name = os.path.basename(json_path)
+    match = JSON_NAME_RE.search(name)
+    if match and match.group(1):
+        return os.path.join(folder, name[:match.start()] + match.group(1) + '.xlsx')
+    stem = name[:match.start()] if match else os.path.splitext(name)[0]
+    return build_json_save_path(os.path.join(folder, stem + '.json'), extension='.xlsx')
+
+def json_to_excel_file(json_path, save_path=None, writer='auto', on_stage=None, on_progress=None,
+                       cancel=None):
+    """Конвертирует JSON (объект ключ → значение) в книгу Excel с таблицей ключ / значение / тип.
+
+    Файл читается и пишется потоково, книга сохраняется через временный файл.
+    Возвращает словарь: json_path, save_path, rows, writer.
+    """
+    engine = excel_writer(writer)
+    save_path = save_path or build_excel_save_path(json_path)
+    temp_path = f"{save_path}.{os.getpid()}.tmp"
+    write_rows = write_rows_xlsxwriter if engine == 'xlsxwriter' else write_rows_openpyxl
+    if on_stage:
+        on_stage("Запись Excel...")
+    try:
+        with measure_stage('json_to_excel', file=json_path, writer=engine,
+                           bytes_in=os.path.getsize(json_path)) as stage:
+            pairs = iter_with_progress(iter_json_file_pairs(json_path), on_progress, cancel)
+            rows = write_rows(temp_path, iter_excel_rows(pairs))
+            check_cancelled(cancel)
+            stage.update(rows=rows, bytes_out=os.path.getsize(temp_path))
+        os.replace(temp_path, save_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return {'json_path': json_path, 'save_path': save_path, 'rows': rows, 'writer': engine}
+
+def run_json_to_excel(paths, output=None, writer='auto', out=sys.stdout):
+    """Конвертирует файлы JSON в книги по очереди и печатает итог по каждому.
+
+    Возвращает число файлов, которые не удалось сконвертировать.
+    """
+    failed = 0
+    produced = set()
+    for path in paths:
+        started = time.perf_counter()
+        save_path = output or build_excel_save_path(path)
+        # Книгу, записанную из другого файла в этом запуске, не перезаписываем
+        if os.path.abspath(save_path) in produced:
+            failed += 1
+            print(f"❌ {path}: {save_path} уже записан из другого файла", file=out)
+            continue
+        try:
+            result = json_to_excel_file(path, save_path, writer)
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"❌ {path}: {e}", file=out)
+            continue
+        produced.add(os.path.abspath(save_path))
+        print(f"✅ {path} → {result['save_path']} ({result['rows']} ключей, "
+              f"{time.perf_counter() - started:.2f} с, {result['writer']})", file=out)
+    return failed
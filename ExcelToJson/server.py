@@ -0,0 +1,324 @@
+"""Локальная служба конвертации: HTTP поверх asyncio и прогретый пул процессов"""
+import asyncio
+import os
+import sys
+import json
+import time
+import shutil
+import stat
+import tempfile
+from datetime import datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+from concurrent.futures import ProcessPoolExecutor
+
+from .conversion import CONVERTER_VERSION
+from .metrics import emit_stage, enable_metrics, remove_metrics_hook
+from .batch import convert_batch_item, init_batch_worker, is_excel_file
+from .convert import safe_file_name
+from .readers import reader_modes
+from .writer import JSON_FORMATS, check_output_options
+from .watch import warm_worker
+
+# === ПАРАМЕТРЫ СЛУЖБЫ ===
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+
+# Наибольший размер загружаемой книги; больше - ответ 413
+SERVICE_MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+
+# Наибольший размер строки запроса и заголовков
+SERVICE_MAX_HEADER_BYTES = 64 * 1024
+
+# Размер порции при приеме книги и отправке JSON
+SERVICE_CHUNK_BYTES = 256 * 1024
+
+HTTP_STATUS = {
+    200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 422: 'Unprocessable Entity',
+    431: 'Request Header Fields Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+# Тип содержимого и Content-Encoding ответа по формату и сжатию результата
+CONTENT_TYPES = {'pretty': 'application/json', 'compact': 'application/json', 'ndjson': 'application/x-ndjson'}
+CONTENT_ENCODINGS = {'gzip': 'gzip', 'zstd': 'zstd'}
+
+class HttpError(Exception):
+    """Ошибка запроса с кодом ответа HTTP"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+def log_service(out, message):
+    """Пишет строку журнала службы с отметкой времени"""
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", file=out, flush=True)
+
+# === HTTP ===
+async def read_request_head(reader):
+    """Читает строку запроса и заголовки; возвращает (метод, путь, параметры, заголовки)"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "Слишком длинные заголовки запроса")
+    except asyncio.IncompleteReadError:
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _version = lines[0].split(' ', 2)
+    except ValueError:
+        raise HttpError(400, "Неверная строка запроса")
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    url = urlsplit(target)
+    query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+    return method.upper(), unquote(url.path), query, headers
+
+async def send_head(writer, status, headers):
+    """Отправляет строку статуса и заголовки ответа"""
+    lines = [f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in {**headers, 'Connection': 'close'}.items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    await writer.drain()
+
+async def send_json(writer, status, data, headers=None):
+    """Отправляет небольшой ответ JSON (ошибки, состояние службы)"""
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    await send_head(writer, status, {'Content-Type': 'application/json; charset=utf-8',
+                                     'Content-Length': len(body), **(headers or {})})
+    writer.write(body)
+    await writer.drain()
+
+async def send_file(writer, path, headers):
+    """Отправляет файл порциями; drain() притормаживает чтение, пока клиент не примет данные"""
+    size = os.path.getsize(path)
+    await send_head(writer, 200, {**headers, 'Content-Length': size})
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(SERVICE_CHUNK_BYTES), b''):
+            writer.write(chunk)
+            await writer.drain()
+    return size
+
+async def receive_upload(reader, headers, path, max_bytes):
+    """Принимает тело запроса (книгу) в файл порциями, не держа его целиком в памяти"""
+    if 'content-length' not in headers:
+        raise HttpError(411, "Нужен заголовок Content-Length")
+    try:
+        remaining = int(headers['content-length'])
+    except ValueError:
+        raise HttpError(400, "Неверный Content-Length")
+    if remaining > max_bytes:
+        raise HttpError(413, f"Книга больше {max_bytes // (1024 * 1024)} МБ")
+    if remaining <= 0:
+        raise HttpError(400, "Пустое тело запроса: передайте книгу или параметр path")
+    received = remaining
+    with open(path, 'wb') as f:
+        while remaining:
+            chunk = await reader.read(min(remaining, SERVICE_CHUNK_BYTES))
+            if not chunk:
+                raise HttpError(400, "Соединение закрыто до конца тела запроса")
+            f.write(chunk)
+            remaining -= len(chunk)
+    return received
+
+# === СЛУЖБА КОНВЕРТАЦИИ ===
+class ConversionService:
+    """Принимает запросы и отдает конвертацию в прогретый пул процессов.
+
+    Одновременно в работе не больше queue_size запросов (в пуле и в ожидании
+    свободного процесса); сверх того служба сразу отвечает 503 с Retry-After,
+    не принимая тело запроса.
+    """
+
+    def __init__(self, pool, workers, queue_size, max_upload, allow_paths=False, out=sys.stdout,
+                 options=None):
+        self.pool = pool
+        self.slots = asyncio.Semaphore(workers)
+        self.queue_size = queue_size
+        self.max_upload = max_upload
+        self.allow_paths = allow_paths
+        self.out = out
+        self.options = options or {}
+        self.active = 0
+
+    async def handle(self, reader, writer):
+        """Обрабатывает одно соединение: один запрос и ответ (Connection: close)"""
+        started = time.perf_counter()
+        info = {'status': 500, 'bytes_in': 0, 'bytes_out': 0}
+        try:
+            request = await read_request_head(reader)
+            if request is None:
+                return
+            method, path, query, headers = request
+            info.update(method=method, path=path)
+            await self.route(reader, writer, method, path, query, headers, info)
+        except HttpError as e:
+            info['status'] = e.status
+            info['error'] = str(e)
+            await self.send_error(writer, e.status, str(e), e.headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            info['error'] = "соединение разорвано"
+        except Exception as e:
+            info['error'] = str(e)
+            await self.send_error(writer, 500, str(e))
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            emit_stage('service_request', started, **info)
+
+    async def send_error(self, writer, status, message, headers=None):
+        """Отправляет ошибку в виде {"error": ...}, если соединение еще живо"""
+        try:
+            await send_json(writer, status, {'error': message}, headers)
+        except ConnectionError:
+            pass
+
+    async def route(self, reader, writer, method, path, query, headers, info):
+        """Выбирает обработчик по пути запроса"""
+        if path == '/health':
+            info['status'] = 200
+            await send_json(writer, 200, {'status': 'ok', 'version': CONVERTER_VERSION,
+                                          'active': self.active, 'queue_size': self.queue_size})
+        elif path == '/convert':
+            if method != 'POST':
+                raise HttpError(405, "Используйте POST /convert", {'Allow': 'POST'})
+            await self.convert(reader, writer, query, headers, info)
+        else:
+            raise HttpError(404, f"Неизвестный путь: {path}")
+
+    def request_options(self, query):
+        """Параметры конвертации: настройки службы, переопределенные параметрами запроса"""
+        options = dict(self.options)
+        if 'reader' in query:
+            if query['reader'] not in reader_modes():
+                raise HttpError(400, f"Неизвестный движок чтения: {query['reader']}")
+            options['reader'] = query['reader']
+        if 'format' in query:
+            if query['format'] not in JSON_FORMATS:
+                raise HttpError(400, f"Неизвестный формат JSON: {query['format']}")
+            options['json_format'] = query['format']
+        return options
+
+    async def convert(self, reader, writer, query, headers, info):
+        """POST /convert: книга в теле запроса (?name=книга.xlsx) или путь на диске (?path=...)"""
+        if self.active >= self.queue_size:
+            raise HttpError(503, "Служба занята, повторите запрос позже", {'Retry-After': 1})
+        options = self.request_options(query)
+        self.active += 1
+        upload_dir = None
+        try:
+            if 'path' in query:
+                if not self.allow_paths:
+                    raise HttpError(403, "Конвертация файлов по пути выключена "
+                                         "(запустите службу с --allow-paths)")
+                excel_path = os.path.abspath(query['path'])
+                if not os.path.isfile(excel_path):
+                    raise HttpError(404, f"Файл не найден: {excel_path}")
+                if not is_excel_file(excel_path):
+                    raise HttpError(400, f"Ожидалась книга Excel, а не {os.path.basename(excel_path)}")
+            else:
+                name = safe_file_name(os.path.basename(query.get('name', 'upload.xlsx')))
+                if not is_excel_file(name):
+                    raise HttpError(400, f"Ожидалась книга Excel, а не {name}")
+                upload_dir = tempfile.mkdtemp(prefix='exceltojson-')
+                excel_path = os.path.join(upload_dir, name)
+                info['bytes_in'] = await receive_upload(reader, headers, excel_path, self.max_upload)
+            info['file'] = excel_path
+
+            # Свободный процесс пула: остальные запросы ждут здесь, не занимая пул
+            async with self.slots:
+                loop = asyncio.get_running_loop()
+                item = await loop.run_in_executor(self.pool, convert_batch_item, excel_path, options)
+            if item['error']:
+                raise HttpError(422, item['error'])
+
+            json_format = options.get('json_format', 'pretty')
+            response_headers = {
+                'Content-Type': f"{CONTENT_TYPES[json_format]}; charset=utf-8",
+                'X-Rows': item['rows'], 'X-Cached': int(item['cached']),
+                'X-Convert-Seconds': f"{item['seconds']:.3f}",
+            }
+            if options.get('compression'):
+                response_headers['Content-Encoding'] = CONTENT_ENCODINGS[options['compression']]
+            if upload_dir is None:
+                response_headers['X-Save-Path'] = item['save_path']
+            info['rows'] = item['rows']
+            info['bytes_out'] = await send_file(writer, item['save_path'], response_headers)
+            info['status'] = 200
+            log_service(self.out, f"✅ {query.get('path') or query.get('name', 'upload.xlsx')}: "
+                                  f"{item['rows']} ключей, {item['seconds']:.2f} с")
+        finally:
+            self.active -= 1
+            if upload_dir:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+
+def check_unix_socket_path(path):
+    """Удаляет оставшийся от прежнего запуска сокет; любой другой файл по этому пути - ошибка"""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{path} уже существует и не является сокетом - укажите другой путь --unix")
+    os.remove(path)
+
+async def run_service(host=SERVICE_HOST, port=SERVICE_PORT, unix_socket=None, workers=None,
+                      queue_size=None, max_upload=SERVICE_MAX_UPLOAD_BYTES, allow_paths=False,
+                      out=sys.stdout, stop=None, type_modules=(), metrics=None, metrics_memory=False,
+                      **options):
+    """Запускает службу и обслуживает запросы до остановки (stop - threading.Event).
+
+    allow_paths - принимать ?path= (служба читает любой файл, к которому у нее есть доступ).
+    """
+    workers = workers or os.cpu_count() or 1
+    queue_size = queue_size or workers * 4
+    check_output_options(options.get('json_format', 'pretty'), options.get('compression'),
+                         options.get('json_backend', 'auto'))
+    if unix_socket:
+        check_unix_socket_path(unix_socket)
+    # Записи о запросах пишет сам процесс службы
+    sink = enable_metrics(metrics) if metrics else None
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker,
+                               initargs=(type_modules, metrics, metrics_memory))
+    try:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(pool, warm_worker) for _ in range(workers)])
+        service = ConversionService(pool, workers, queue_size, max_upload, allow_paths, out, options)
+        if unix_socket:
+            server = await asyncio.start_unix_server(service.handle, unix_socket,
+                                                     limit=SERVICE_MAX_HEADER_BYTES)
+            address = unix_socket
+        else:
+            server = await asyncio.start_server(service.handle, host, port, limit=SERVICE_MAX_HEADER_BYTES)
+            address = "http://{}:{}".format(*server.sockets[0].getsockname()[:2])
+        async with server:
+            log_service(out, f"Служба конвертации: {address} (процессов: {workers}, "
+                             f"очередь: {queue_size}). Ctrl+C - остановка")
+            if stop is None:
+                await server.serve_forever()
+            else:
+                while not stop.is_set():
+                    await asyncio.sleep(0.2)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if unix_socket:
+            try:
+                check_unix_socket_path(unix_socket)
+            except ValueError:
+                pass
+        if sink:
+            remove_metrics_hook(sink)
+            sink.close()
+
+def serve(**kwargs):
+    """Синхронная обертка над run_service (до Ctrl+C или установки stop)"""
+    try:
+        asyncio.run(run_service(**kwargs))
+    except KeyboardInterrupt:
+        pass
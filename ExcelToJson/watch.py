@@ -0,0 +1,262 @@
+"""Наблюдение за папками и конвертация появившихся книг"""
+import os
+from datetime import datetime
+import sys
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .lazy import ensure_loaded, np, pd
+from .metrics import emit_stage, enable_metrics, remove_metrics_hook
+from .batch import (
+    collect_excel_files, convert_batch_item, describe_changes, init_batch_worker, is_excel_file
+)
+
+# === НАБЛЮДЕНИЕ ЗА ПАПКАМИ ===
+# Файл считается записанным, если его размер и время изменения не менялись столько секунд
+WATCH_SETTLE_SECONDS = 2.0
+# Период опроса папок, если inotify недоступен (с)
+WATCH_INTERVAL_SECONDS = 1.0
+
+# Флаги inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+def file_signature(path):
+    """Размер и время изменения файла или None, если файла нет"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def iter_watch_folders(folders, recursive):
+    """Папки для наблюдения (с вложенными, если recursive)"""
+    for folder in folders:
+        yield folder
+        if recursive:
+            for root, dirs, _ in os.walk(folder):
+                for name in dirs:
+                    yield os.path.join(root, name)
+
+class InotifyWatcher:
+    """Следит за папками через inotify (Linux) и возвращает пути измененных файлов"""
+
+    def __init__(self, folders, recursive=False):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.recursive = recursive
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 завершился с ошибкой")
+        self.folders = {}
+        for folder in iter_watch_folders(folders, recursive):
+            self.add_folder(folder)
+        # Переполнение очереди событий: вызывающий код должен пересканировать папки
+        self.overflowed = False
+
+    def add_folder(self, folder):
+        import ctypes
+
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Не удалось следить за папкой {folder}")
+        self.folders[wd] = folder
+
+    def poll(self, timeout):
+        """Ждет событий до timeout секунд и возвращает список измененных путей"""
+        import select
+        import struct
+
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+            offset += 16 + length
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            folder = self.folders.get(wd)
+            if folder is None or not name:
+                continue
+            path = os.path.join(folder, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                # Новая вложенная папка: следим и за ней, файлы в ней могли появиться раньше
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    for sub_folder in iter_watch_folders([path], True):
+                        self.add_folder(sub_folder)
+                    paths.extend(collect_excel_files([path], True))
+                continue
+            paths.append(path)
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Запасной способ: периодически сканирует папки и сравнивает размер и время изменения"""
+
+    def __init__(self, folders, recursive=False, interval=WATCH_INTERVAL_SECONDS):
+        self.folders = folders
+        self.recursive = recursive
+        self.interval = interval
+        self.overflowed = False
+        self.known = self.scan()
+
+    def scan(self):
+        return {path: file_signature(path) for path in collect_excel_files(self.folders, self.recursive)}
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self.scan()
+        changed = [path for path, signature in current.items() if self.known.get(path) != signature]
+        self.known = current
+        return changed
+
+    def close(self):
+        pass
+
+def make_watcher(folders, recursive=False, polling=False, interval=WATCH_INTERVAL_SECONDS):
+    """Возвращает наблюдатель inotify (Linux) или, если он недоступен, опрос папок"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folders, recursive)
+        except (OSError, AttributeError) as e:
+            print(f"inotify недоступен ({e}), папки будут опрашиваться", file=sys.stderr)
+    return PollingWatcher(folders, recursive, interval)
+
+def warm_worker():
+    """Прогревает рабочий процесс: загружает pandas и движки чтения, пока файлов еще нет"""
+    import openpyxl  # noqa: F401
+
+    ensure_loaded(pd, np)
+    return os.getpid()
+
+def log_watch(out, message):
+    """Пишет строку журнала наблюдения с отметкой времени"""
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", file=out, flush=True)
+
+def watch_folders(folders, recursive=False, workers=None, settle=WATCH_SETTLE_SECONDS,
+                  interval=WATCH_INTERVAL_SECONDS, queue_size=None, existing=False, polling=False,
+                  out=sys.stdout, stop=None, type_modules=(), metrics=None, metrics_memory=False,
+                  **options):
+    """Следит за папками и конвертирует появившиеся и измененные книги.
+
+    Файл берется в работу, когда его размер и время изменения не менялись settle
+    секунд. Одновременно в пуле не больше queue_size файлов (по умолчанию вдвое
+    больше числа процессов), остальные ждут. Процессы пула живут все время
+    наблюдения, поэтому pandas и openpyxl импортируются в них один раз.
+    existing - сконвертировать и книги, лежавшие в папках до запуска.
+    stop - threading.Event для остановки (иначе - до Ctrl+C).
+    Остальные параметры передаются в convert_excel_file, как в пакетном режиме.
+    """
+    folders = [os.path.abspath(folder) for folder in folders]
+    missing = [folder for folder in folders if not os.path.isdir(folder)]
+    if missing:
+        raise FileNotFoundError(f"Папки не найдены: {', '.join(missing)}")
+    workers = workers or os.cpu_count() or 1
+    queue_size = queue_size or workers * 2
+    stop = stop or threading.Event()
+
+    watcher = make_watcher(folders, recursive, polling, interval)
+    # Записи о задержке по файлам пишет сам наблюдающий процесс
+    sink = enable_metrics(metrics) if metrics else None
+    pending = {}   # путь → (время обнаружения, время последнего изменения, подпись файла)
+    running = {}   # Future → (путь, время обнаружения, подпись файла)
+    done = {}      # путь → подпись файла на момент последней конвертации
+    converted = failed = 0
+
+    def note(path, now):
+        first_seen = pending[path][0] if path in pending else now
+        pending[path] = (first_seen, now, file_signature(path))
+
+    now = time.monotonic()
+    for path in collect_excel_files(folders, recursive):
+        if existing:
+            note(path, now - settle)
+        else:
+            done[path] = file_signature(path)
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker,
+                               initargs=(type_modules, metrics, metrics_memory))
+    try:
+        for future in [pool.submit(warm_worker) for _ in range(workers)]:
+            future.result()
+        log_watch(out, f"Наблюдение за {', '.join(folders)} ({type(watcher).__name__}, "
+                       f"процессов: {workers}). Ctrl+C - остановка")
+        while not stop.is_set():
+            now = time.monotonic()
+            for path in watcher.poll(interval if not pending else min(interval, settle / 2)):
+                path = os.path.abspath(path)
+                if is_excel_file(path):
+                    note(path, time.monotonic())
+            if watcher.overflowed:
+                # События потеряны - сверяем папки целиком
+                watcher.overflowed = False
+                for path in collect_excel_files(folders, recursive):
+                    if done.get(path) != file_signature(path):
+                        note(path, now)
+
+            busy = {item[0] for item in running.values()}
+            now = time.monotonic()
+            for path, (first_seen, changed, signature) in list(pending.items()):
+                if len(running) >= queue_size:
+                    break
+                if now - changed < settle or path in busy:
+                    continue
+                current = file_signature(path)
+                if current is None or current == done.get(path):
+                    del pending[path]
+                    continue
+                if current != signature:
+                    # Файл еще пишется - ждем следующей паузы
+                    pending[path] = (first_seen, now, current)
+                    continue
+                del pending[path]
+                running[pool.submit(convert_batch_item, path, options)] = (path, first_seen, current)
+                log_watch(out, f"→ {path} (в работе: {len(running)}, ждут: {len(pending)})")
+
+            for future in [future for future in running if future.done()]:
+                path, first_seen, signature = running.pop(future)
+                done[path] = signature
+                item = future.result()
+                latency = time.monotonic() - first_seen
+                emit_stage('watch_file', time.perf_counter() - latency, file=path, rows=item['rows'],
+                           error=item['error'], convert_seconds=round(item['seconds'], 6),
+                           queue=len(running) + len(pending))
+                if item['error']:
+                    failed += 1
+                    log_watch(out, f"❌ {path}: {item['error']} (задержка {latency:.2f} с)")
+                else:
+                    converted += 1
+                    log_watch(out, f"✅ {path} → {item['save_path']} ({item['rows']} ключей, "
+                                   f"конвертация {item['seconds']:.2f} с, задержка {latency:.2f} с, "
+                                   f"в очереди: {len(running) + len(pending)})")
+                    if item.get('changes'):
+                        log_watch(out, f"   {describe_changes(item)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        pool.shutdown(wait=True, cancel_futures=True)
+        if sink:
+            remove_metrics_hook(sink)
+            sink.close()
+        log_watch(out, f"Наблюдение остановлено: сконвертировано {converted}, ошибок {failed}")
+    return converted, failed
@@ -0,0 +1,348 @@
+"""Потоковая запись JSON, прогресс и отмена конвертации"""
+import json
+import os
+from decimal import Decimal
+from functools import lru_cache
+import io
+
+from .metrics import measure_stage
+from .readers import DuplicateKeyError, iter_excel_pairs, read_excel_result
+
+# === ПРОГРЕСС И ОТМЕНА ===
+# Через сколько пар сообщать о прогрессе и проверять отмену
+PROGRESS_EVERY = 1000
+
+class ConversionCancelled(Exception):
+    """Конвертация отменена пользователем"""
+
+def check_cancelled(cancel):
+    """Прерывает конвертацию, если установлен флаг отмены (threading.Event)"""
+    if cancel is not None and cancel.is_set():
+        raise ConversionCancelled()
+
+def iter_with_progress(pairs, on_progress=None, cancel=None, get_total=None):
+    """Пропускает пары дальше, сообщая on_progress(done, total) и проверяя отмену.
+
+    get_total - функция, возвращающая ожидаемое число пар или None.
+    """
+    done = 0
+    for pair in pairs:
+        done += 1
+        if done % PROGRESS_EVERY == 0:
+            check_cancelled(cancel)
+            if on_progress:
+                on_progress(done, get_total() if get_total else None)
+        yield pair
+    if on_progress:
+        on_progress(done, done)
+
+# === ПОТОКОВАЯ ЗАПИСЬ JSON ===
+# Размер порции (в символах), которой текст сбрасывается в файл
+WRITE_CHUNK_CHARS = 64 * 1024
+
+# Сколько пар orjson кодирует за один вызов
+WRITE_CHUNK_PAIRS = 1000
+
+# Форматы вывода: pretty - как json.dumps(indent=2), compact - без пробелов,
+# ndjson - по одному объекту {ключ: значение} в строке
+JSON_FORMATS = ('pretty', 'compact', 'ndjson')
+
+# Сжатие файла результата (zstd - нужен пакет zstandard)
+COMPRESSIONS = ('gzip', 'zstd')
+
+# Кодировщик: orjson (если установлен) или стандартный json; результат одинаков
+JSON_BACKENDS = ('auto', 'orjson', 'json')
+
+# Типы значений, которые кодируются напрямую без дополнительных проверок
+PLAIN_JSON_TYPES = frozenset((str, int, float, bool, type(None)))
+
+_encode_plain = json.JSONEncoder(ensure_ascii=False).encode
+_encode_compact = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+# Числа, которые orjson пишет так же, как json.dumps: вне этого диапазона
+# float записывается с экспонентой в другом виде (1e16 вместо 1e+16)
+ORJSON_FLOAT_MIN = 1e-4
+ORJSON_FLOAT_MAX = 1e16
+ORJSON_INT_MIN = -2 ** 63
+ORJSON_INT_MAX = 2 ** 64 - 1
+
+@lru_cache(maxsize=None)
+def json_backend(name='auto'):
+    """Возвращает модуль orjson или None (стандартный json) для выбранного кодировщика"""
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Неизвестный кодировщик JSON: {name}")
+    if name == 'json':
+        return None
+    try:
+        import orjson
+    except ImportError:
+        if name == 'orjson':
+            raise ValueError("Кодировщик orjson недоступен: установите пакет orjson")
+        return None
+    return orjson
+
+def orjson_safe(value):
+    """Проверяет, что orjson закодирует значение теми же байтами, что и json.dumps"""
+    kind = type(value)
+    if kind is str or kind is bool or value is None:
+        return True
+    if kind is int:
+        return ORJSON_INT_MIN <= value <= ORJSON_INT_MAX
+    if kind is float:
+        # NaN и бесконечность не проходят сравнения
+        return value == 0.0 or ORJSON_FLOAT_MIN <= abs(value) < ORJSON_FLOAT_MAX
+    if kind is list:
+        return all(orjson_safe(item) for item in value)
+    if kind is dict:
+        return all(type(key) is str and orjson_safe(item) for key, item in value.items())
+    return False
+
+def encode_compact_value(value):
+    """Кодирует значение без пробелов, как json.dumps(..., separators=(',', ':'))"""
+    if type(value) in PLAIN_JSON_TYPES:
+        return _encode_compact(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+def encode_json_value(value, level=0):
+    """Кодирует значение так же, как json.dumps(..., indent=2) внутри объекта уровня level.
+
+    Decimal записывается числом без потери точности.
+    """
+    if type(value) in PLAIN_JSON_TYPES:
+        return _encode_plain(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    # Вложенные списки и объекты - с отступом на уровень глубже
+    return json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n' + '  ' * (level + 1))
+
+def write_json_pairs(f, pairs, chunk_chars=WRITE_CHUNK_CHARS, level=0, json_format='pretty',
+                     backend='auto'):
+    """Пишет пары (ключ, значение) в открытый файл порциями.
+
+    Для ключей без повторов результат побайтно совпадает с json.dumps(dict(pairs),
+    ensure_ascii=False, indent=2) (pretty), с separators=(',', ':') (compact)
+    или с построчной записью {ключ: значение} (ndjson). level - уровень вложенности
+    объекта (для объекта, вложенного в другой документ). backend - кодировщик
+    (см. JSON_BACKENDS); orjson используется только для порций, которые он
+    запишет теми же байтами. Возвращает число записанных пар.
+    """
+    if json_format not in JSON_FORMATS:
+        raise ValueError(f"Неизвестный формат JSON: {json_format}")
+    if json_format == 'ndjson':
+        return write_ndjson_pairs(f, pairs, chunk_chars, backend)
+    orjson = json_backend(backend)
+    if orjson is not None:
+        return write_json_pairs_orjson(f, pairs, orjson, level, json_format)
+    if json_format == 'compact':
+        return write_compact_pairs(f, pairs, chunk_chars)
+    encode = _encode_plain
+    encode_value = encode_json_value
+    indent = '\n' + '  ' * (level + 1)
+    buffer = []
+    buffered = 0
+    count = 0
+    for key, value in pairs:
+        item = f"{',' if count else '{'}{indent}{encode(key)}: {encode_value(value, level)}"
+        buffer.append(item)
+        buffered += len(item)
+        count += 1
+        if buffered >= chunk_chars:
+            f.write(''.join(buffer))
+            buffer.clear()
+            buffered = 0
+    buffer.append('\n' + '  ' * level + '}' if count else '{}')
+    f.write(''.join(buffer))
+    return count
+
+def write_compact_pairs(f, pairs, chunk_chars=WRITE_CHUNK_CHARS):
+    """Пишет пары объектом без пробелов (стандартный json)"""
+    encode = _encode_compact
+    encode_value = encode_compact_value
+    buffer = []
+    buffered = 0
+    count = 0
+    for key, value in pairs:
+        item = f"{',' if count else '{'}{encode(key)}:{encode_value(value)}"
+        buffer.append(item)
+        buffered += len(item)
+        count += 1
+        if buffered >= chunk_chars:
+            f.write(''.join(buffer))
+            buffer.clear()
+            buffered = 0
+    buffer.append('}' if count else '{}')
+    f.write(''.join(buffer))
+    return count
+
+def write_ndjson_pairs(f, pairs, chunk_chars=WRITE_CHUNK_CHARS, backend='auto'):
+    """Пишет каждую пару отдельной строкой {"ключ":значение}"""
+    orjson = json_backend(backend)
+    encode = _encode_compact
+    encode_value = encode_compact_value
+    buffer = []
+    buffered = 0
+    count = 0
+    for key, value in pairs:
+        item = None
+        if orjson is not None and type(key) is str and orjson_safe(value):
+            try:
+                item = orjson.dumps({key: value}).decode('utf-8') + '\n'
+            except orjson.JSONEncodeError:
+                pass
+        if item is None:
+            item = f"{{{encode(key)}:{encode_value(value)}}}\n"
+        buffer.append(item)
+        buffered += len(item)
+        count += 1
+        if buffered >= chunk_chars:
+            f.write(''.join(buffer))
+            buffer.clear()
+            buffered = 0
+    f.write(''.join(buffer))
+    return count
+
+def iter_pair_chunks(pairs, size=WRITE_CHUNK_PAIRS):
+    """Делит поток пар на списки по size пар"""
+    chunk = []
+    for pair in pairs:
+        chunk.append(pair)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def write_json_pairs_orjson(f, pairs, orjson, level=0, json_format='pretty'):
+    """Пишет пары через orjson порциями по WRITE_CHUNK_PAIRS.
+
+    Порция, которую orjson записал бы иначе, чем json.dumps (числа с экспонентой,
+    Decimal, повторные ключи) или не записал бы вовсе (одиночные суррогаты в тексте
+    ячейки), кодируется стандартным способом.
+    """
+    pretty = json_format == 'pretty'
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    indent = '\n' + '  ' * level
+    count = 0
+    for chunk in iter_pair_chunks(pairs):
+        data = dict(chunk)
+        text = None
+        if len(data) == len(chunk) and all(type(key) is str and orjson_safe(value) for key, value in chunk):
+            try:
+                text = orjson.dumps(data, option=option).decode('utf-8')
+            except orjson.JSONEncodeError:
+                pass
+        if text is not None:
+            # Убираем скобки объекта: {\n  "a": 1\n} → \n  "a": 1 (или "a":1 без отступов)
+            body = text[1:-2] if pretty else text[1:-1]
+            if pretty and level:
+                # Внутри строк JSON перевод строки экранирован, поэтому замена безопасна
+                body = body.replace('\n', indent)
+            f.write(('{' if not count else ',') + body)
+        else:
+            # Собираем порцию стандартным кодировщиком и отрезаем скобки так же
+            buffer = io.StringIO()
+            if pretty:
+                write_json_pairs(buffer, chunk, level=level, backend='json')
+                body = buffer.getvalue()[1:-len(indent) - 1]
+            else:
+                write_compact_pairs(buffer, chunk)
+                body = buffer.getvalue()[1:-1]
+            f.write(('{' if not count else ',') + body)
+        count += len(chunk)
+    if not count:
+        f.write('{}')
+    elif pretty:
+        f.write(indent + '}')
+    else:
+        f.write('}')
+    return count
+
+def check_output_options(json_format='pretty', compression=None, backend='auto'):
+    """Проверяет формат, сжатие и кодировщик до начала конвертации (ValueError при ошибке)"""
+    if json_format not in JSON_FORMATS:
+        raise ValueError(f"Неизвестный формат JSON: {json_format}")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Неизвестное сжатие: {compression}")
+    if compression == 'zstd':
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise ValueError("Для сжатия zstd установите пакет zstandard (pip install zstandard)")
+    json_backend(backend)
+
+def output_extension(json_format='pretty', compression=None):
+    """Расширение файла результата: .json или .ndjson, плюс .gz / .zst при сжатии"""
+    extension = '.ndjson' if json_format == 'ndjson' else '.json'
+    if compression:
+        extension += {'gzip': '.gz', 'zstd': '.zst'}[compression]
+    return extension
+
+def open_output(path, compression=None):
+    """Открывает файл результата на запись текста UTF-8, при необходимости со сжатием потоком"""
+    if compression is None:
+        return open(path, 'w', encoding='utf-8')
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Неизвестное сжатие: {compression}")
+    if compression == 'gzip':
+        import gzip
+
+        return gzip.open(path, 'wt', encoding='utf-8')
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Для сжатия zstd установите пакет zstandard (pip install zstandard)")
+    raw = open(path, 'wb')
+    # closefd=True: закрытие текстовой обертки завершает поток zstd и закрывает файл
+    return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw, closefd=True), encoding='utf-8')
+
+def write_json_file(save_path, excel_path, reader='auto', on_progress=None, cancel=None,
+                    json_format='pretty', compression=None, backend='auto', on_stage=None):
+    """Потоково конвертирует книгу в файл JSON и возвращает число ключей.
+
+    Файл пишется во временный и переименовывается, поэтому при ошибке или
+    отмене (cancel - threading.Event) частичный результат не остается.
+    on_progress(done, total) вызывается по мере записи пар, on_stage - текст этапа.
+    Отмена проверяется и между чтением листа и конвертацией; само чтение pandas
+    не прерывается, отмена срабатывает сразу после него.
+    json_format, compression, backend - формат, сжатие и кодировщик (см. write_json_pairs).
+    """
+    temp_path = f"{save_path}.{os.getpid()}.tmp"
+    total = [None]
+
+    def set_total(value):
+        total[0] = value
+
+    def after_read():
+        check_cancelled(cancel)
+        if on_stage:
+            on_stage("Конвертация и запись JSON...")
+
+    try:
+        try:
+            if on_stage:
+                on_stage("Чтение файла...")
+            pairs = iter_excel_pairs(excel_path, reader, set_total, after_read)
+            check_cancelled(cancel)
+            # В режиме stream чтение и конвертация идут внутри записи
+            with measure_stage('write_json', file=excel_path, format=json_format) as stage:
+                with open_output(temp_path, compression) as f:
+                    rows = write_json_pairs(f, iter_with_progress(pairs, on_progress, cancel, lambda: total[0]),
+                                            json_format=json_format, backend=backend)
+                stage.update(rows=rows, bytes_out=os.path.getsize(temp_path))
+        except DuplicateKeyError:
+            # Повторные ключи: собираем словарь, чтобы сохранить порядок json.dumps
+            result = read_excel_result(excel_path, reader, after_read)
+            check_cancelled(cancel)
+            with measure_stage('write_json', file=excel_path, format=json_format) as stage:
+                with open_output(temp_path, compression) as f:
+                    rows = write_json_pairs(f, iter_with_progress(result.items(), on_progress, cancel,
+                                                                  lambda: len(result)),
+                                            json_format=json_format, backend=backend)
+                stage.update(rows=rows, bytes_out=os.path.getsize(temp_path))
+        os.replace(temp_path, save_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return rows
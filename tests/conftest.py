@@ -0,0 +1,5 @@
+"""Пакет ExcelToJson импортируется из корня репозитория (он не устанавливается)"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,21 @@
+"""Тестовые книги замеров: ячейки своего типа и одинаковое чтение всеми движками"""
+import collections
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from ExcelToJson.bench import generate_workbook
+from ExcelToJson.readers import read_excel_result
+
+def test_synthetic_workbook_has_typed_cells(tmp_path):
+    path = generate_workbook(str(tmp_path / 'bench.xlsx'), 500)
+    sheet = openpyxl.load_workbook(path).active
+    kinds = collections.Counter(cell.data_type for cell in sheet['B'][1:] if cell.value is not None)
+    # Числа, логические значения, даты и текст
+    assert set(kinds) == {'n', 'b', 'd', 's'}
+
+    result = read_excel_result(path, 'pandas')
+    assert result == read_excel_result(path, 'stream')
+    kinds = collections.Counter(type(value) for value in result.values())
+    assert {int, float, bool, str, type(None)} <= set(kinds)
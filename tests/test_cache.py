@@ -0,0 +1,78 @@
+"""Кэш результатов: ключ по содержимому книги и вытеснение записей"""
+import os
+import shutil
+import time
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from ExcelToJson.cache import cache_evict, cache_key, cache_load, cache_store
+from ExcelToJson.convert import convert_excel_file
+
+OPTIONS = {'reader': 'stream', 'format': 'pretty'}
+
+def save_book(path, value):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in [('Ключ', 'Значение', 'Тип'), ('a', value, 'number')]:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def test_key_depends_on_content_and_options(tmp_path):
+    first = save_book(tmp_path / 'first.xlsx', 1)
+    os.makedirs(tmp_path / 'other')
+    moved = shutil.copy(first, tmp_path / 'other' / 'renamed.xlsx')
+    changed = save_book(tmp_path / 'changed.xlsx', 2)
+    assert cache_key(first, OPTIONS) == cache_key(moved, OPTIONS)
+    assert cache_key(first, OPTIONS) != cache_key(changed, OPTIONS)
+    assert cache_key(first, OPTIONS) != cache_key(first, {**OPTIONS, 'format': 'compact'})
+
+def test_conversion_hits_for_same_bytes_at_new_path(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = save_book(tmp_path / 'first.xlsx', 1)
+    os.makedirs(tmp_path / 'other')
+    moved = str(shutil.copy(first, tmp_path / 'other' / 'renamed.xlsx'))
+
+    def convert(path, **options):
+        return convert_excel_file(path, copy_result=False, reader='stream', cache_dir=cache_dir, **options)
+
+    assert not convert(first)['cached']
+    converted = convert(moved)
+    assert converted['cached']
+    with open(converted['save_path'], encoding='utf-8') as f:
+        assert f.read() == '{\n  "a": 1\n}'
+    assert not convert(moved, json_format='compact')['cached']
+    assert not convert(save_book(tmp_path / 'other' / 'renamed.xlsx', 2))['cached']
+
+def store(cache_dir, key, size, used):
+    source = os.path.join(cache_dir, 'source.tmp')
+    with open(source, 'w', encoding='utf-8') as f:
+        f.write('x' * size)
+    cache_store(cache_dir, key, source, {'rows': 1})
+    os.remove(source)
+    for ext in ('.json', '.meta'):
+        os.utime(os.path.join(cache_dir, key + ext), (used, used))
+
+def test_evict_by_age(tmp_path):
+    cache_dir = str(tmp_path)
+    now = time.time()
+    store(cache_dir, 'old', 10, now - 40 * 24 * 3600)
+    store(cache_dir, 'new', 10, now - 3600)
+    cache_evict(cache_dir, max_age_days=30)
+    assert cache_load(cache_dir, 'old') is None
+    assert cache_load(cache_dir, 'new') is not None
+
+def test_evict_least_recently_used_by_size(tmp_path):
+    cache_dir = str(tmp_path)
+    now = time.time()
+    for number, key in enumerate(['a', 'b', 'c']):
+        store(cache_dir, key, 1000, now - 300 + number * 100)
+    # Обращение к самой старой записи защищает ее от вытеснения
+    assert cache_load(cache_dir, 'a') is not None
+    cache_evict(cache_dir, max_bytes=2100)
+    assert cache_load(cache_dir, 'b') is None
+    assert cache_load(cache_dir, 'a') is not None and cache_load(cache_dir, 'c') is not None
+    cache_evict(cache_dir, max_bytes=0)
+    assert sorted(os.listdir(cache_dir)) == []
@@ -0,0 +1,78 @@
+"""Буфер обмена: выбор способа копирования и предел размера из окружения"""
+import sys
+
+import pytest
+
+from ExcelToJson import clipboard
+from ExcelToJson.clipboard import CLIPBOARD_MAX_MB, clipboard_backend, clipboard_max_mb, copy_to_clipboard
+
+@pytest.fixture
+def system(monkeypatch):
+    """Подменяет систему и набор команд; pyperclip считается неустановленным"""
+    monkeypatch.setitem(sys.modules, 'pyperclip', None)
+    monkeypatch.delenv('WAYLAND_DISPLAY', raising=False)
+    clipboard_backend.cache_clear()
+
+    def configure(name, commands=()):
+        monkeypatch.setattr(clipboard.platform, 'system', lambda: name)
+        monkeypatch.setattr(clipboard.shutil, 'which', lambda command: command if command in commands else None)
+        clipboard_backend.cache_clear()
+
+    yield configure
+    clipboard_backend.cache_clear()
+
+@pytest.mark.parametrize('name, commands, wayland, expected', [
+    ('Windows', ['clip'], False, 'clip'),
+    ('Darwin', ['pbcopy'], False, 'pbcopy'),
+    ('Linux', ['xclip', 'xsel'], False, 'xclip'),
+    ('Linux', ['xsel'], False, 'xsel'),
+    ('Linux', ['xclip', 'wl-copy'], True, 'wl-copy'),
+    ('Linux', ['wl-copy'], False, None),
+    ('Linux', [], False, None),
+])
+def test_backend_selection(system, monkeypatch, name, commands, wayland, expected):
+    if wayland:
+        monkeypatch.setenv('WAYLAND_DISPLAY', 'wayland-0')
+    system(name, commands)
+    backend = clipboard_backend()
+    assert (backend and backend[0]) == expected
+
+def test_backend_is_chosen_once(system, monkeypatch):
+    system('Darwin', ['pbcopy'])
+    assert clipboard_backend()[0] == 'pbcopy'
+    # Без сброса кэша смена системы не влияет на выбор
+    monkeypatch.setattr(clipboard.platform, 'system', lambda: 'Windows')
+    assert clipboard_backend()[0] == 'pbcopy'
+
+def test_command_gets_text_through_stdin(system, monkeypatch):
+    calls = []
+    monkeypatch.setattr(clipboard.subprocess, 'run', lambda command, **options: calls.append((command, options)))
+    system('Windows', ['clip'])
+    copy_to_clipboard('ключ')
+    [(command, options)] = calls
+    assert command == ['clip'] and options['input'].decode('utf-16') == 'ключ'
+
+def test_missing_backend_is_reported(system):
+    system('Linux')
+    with pytest.raises(Exception, match='pyperclip'):
+        copy_to_clipboard('x')
+
+@pytest.mark.parametrize('value, expected', [
+    (None, CLIPBOARD_MAX_MB),
+    ('', CLIPBOARD_MAX_MB),
+    ('  ', CLIPBOARD_MAX_MB),
+    ('2.5', 2.5),
+    (' 0 ', 0),
+    ('abc', CLIPBOARD_MAX_MB),
+    ('-1', CLIPBOARD_MAX_MB),
+    ('nan', CLIPBOARD_MAX_MB),
+    ('inf', float('inf')),
+])
+def test_clipboard_max_mb(monkeypatch, capsys, value, expected):
+    if value is None:
+        monkeypatch.delenv('EXCELTOJSON_CLIPBOARD_MAX_MB', raising=False)
+    else:
+        monkeypatch.setenv('EXCELTOJSON_CLIPBOARD_MAX_MB', value)
+    assert clipboard_max_mb() == expected
+    warned = 'Неверное значение' in capsys.readouterr().out
+    assert warned == (value in ('abc', '-1', 'nan'))
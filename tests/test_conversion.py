@@ -0,0 +1,145 @@
+"""Пакетная конвертация (convert_dataframe) против построчной (convert_value_by_type)"""
+import io
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ExcelToJson.conversion import TYPE_REGISTRY, convert_dataframe, convert_value_by_type
+from ExcelToJson.writer import write_json_pairs
+
+# Все зарегистрированные синонимы типов и значения столбца C, которых нет в реестре
+TYPE_NAMES = sorted(TYPE_REGISTRY) + [' JSON ', 'Число', 'неизвестный', '', None, np.nan]
+
+# Значения столбца B каждого типа данных (первое - строка заголовков того же типа)
+COLUMN_VALUES = {
+    'str': ['Значение', '42', '-7', '3.5', '1e20', '0.1', 'true', 'нет', 'ДА', '[1, "a"]',
+            '{"a": {"b": [1]}}', 'a, b; c', '2024-01-02', '2024-01-02T03:04:05', 'текст "в кавычках"',
+            ' ', '\t', '', None, 'NaN'],
+    'int': [0, 0, 1, -5, 2 ** 40, 10 ** 15, -(2 ** 53)],
+    'float': [0.0, 0.0, -0.0, 1.5, -2.25, 1e-5, 1e20, 123456789.125, 1e15, 0.1, np.nan],
+    'bool': [False, True, False],
+    'datetime': pd.Series([datetime(2000, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 2, 3, 4, 5), None],
+                         dtype='datetime64[ns]'),
+    'nan': [np.nan, np.nan, np.nan],
+    'mixed': ['Значение', 1, 'x', 2.5, True, None, datetime(2024, 1, 2), '', np.nan, '[1]'],
+}
+
+def convert_rows(df):
+    """Построчная конвертация: ключ, значение и тип каждой строки по отдельности"""
+    result = {}
+    keys, values = df[0].tolist(), df[1].tolist()
+    types = df[2].tolist() if df.shape[1] > 2 else [None] * len(df)
+    for key, value, data_type in list(zip(keys, values, types))[1:]:
+        if pd.isna(key):
+            continue
+        key = str(key).strip()
+        if key:
+            result[key] = convert_value_by_type(value, data_type)
+    return result
+
+def encode(result, backend):
+    output = io.StringIO()
+    write_json_pairs(output, result.items(), backend=backend)
+    return output.getvalue()
+
+def assert_same_json(df):
+    expected = convert_rows(df)
+    actual = convert_dataframe(df)
+    assert list(actual) == list(expected)
+    for backend in ('json', 'auto'):
+        assert encode(actual, backend) == encode(expected, backend)
+
+@pytest.mark.parametrize('dtype', sorted(COLUMN_VALUES))
+def test_every_type_name_matches_row_conversion(dtype):
+    values = pd.Series(COLUMN_VALUES[dtype])
+    # Каждое значение - с каждым типом; строки разных типов перемешаны
+    rows = [(position, name) for name in TYPE_NAMES for position in range(1, len(values))]
+    positions = [0] + [position for position, _ in rows]
+    df = pd.DataFrame({
+        0: ['Ключ'] + [f"k{n}" for n in range(len(rows))],
+        1: values.iloc[positions].reset_index(drop=True),
+        2: ['Тип'] + [name for _, name in rows],
+    })
+    assert df[1].dtype == values.dtype
+    assert_same_json(df)
+
+@pytest.mark.parametrize('name', sorted(TYPE_REGISTRY))
+def test_type_name_alone(name):
+    for values in COLUMN_VALUES.values():
+        values = pd.Series(values)
+        df = pd.DataFrame({0: ['Ключ'] + [f"k{n}" for n in range(1, len(values))],
+                           1: values, 2: [name] * len(values)})
+        assert_same_json(df)
+
+def test_empty_keys_and_values():
+    df = pd.DataFrame({
+        0: ['Ключ', None, '', '   ', np.nan, ' a ', 'b', 5, 5.0, 'c', 'd', 'b', '\n'],
+        1: ['Значение', 'x', 'x', 'x', 'x', '', None, 1, 2, np.nan, ' ', 'повтор', 'x'],
+        2: ['Тип', 'string', 'number', None, 'json', 'number', 'bool', 'int', 'float', 'list', 'string',
+            'string', 'string'],
+    })
+    assert_same_json(df)
+    assert convert_dataframe(df) == {'a': None, 'b': 'повтор', '5': 1, '5.0': 2.0, 'c': None, 'd': ' '}
+
+def test_without_type_column_and_rows():
+    assert_same_json(pd.DataFrame({0: ['Ключ', 'a', 'b'], 1: ['Значение', 1.5, None]}))
+    assert convert_dataframe(pd.DataFrame({0: ['Ключ'], 1: ['Значение'], 2: ['Тип']})) == {}
+    assert convert_dataframe(pd.DataFrame()) == {}
+
+# === НЕСКОЛЬКО СТОЛБЦОВ ЗНАЧЕНИЙ ===
+from ExcelToJson.convert import column_letter, convert_workbook_columns, parse_column, parse_column_map
+
+@pytest.mark.parametrize('column, position', [('A', 0), ('b', 1), (' Z ', 25), ('AA', 26), ('AZ', 51), ('BA', 52),
+                                              ('XFD', 16383), ('1', 0), ('3', 2), (28, 27)])
+def test_parse_column(column, position):
+    assert parse_column(column) == position
+    assert parse_column(column_letter(position)) == position
+
+@pytest.mark.parametrize('column', ['', '0', '-1', 'A1', 'Б', 'A-B', '1.5', 'ß', '١'])
+def test_parse_bad_column(column):
+    with pytest.raises(ValueError, match='Неверный столбец'):
+        parse_column(column)
+
+def test_parse_column_map():
+    assert parse_column_map(' dev = B , test=D,prod=aa') == {'dev': 1, 'test': 3, 'prod': 26}
+    for text, message in [('dev', 'имя=столбец'), ('=B', 'имя=столбец'), ('dev=B,dev=C', 'дважды'),
+                          ('dev=1B', 'Неверный столбец'), ('dev=B,', 'имя=столбец')]:
+        with pytest.raises(ValueError, match=message):
+            parse_column_map(text)
+
+openpyxl = pytest.importorskip('openpyxl')
+
+def save_columns_book(path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in [('Ключ', 'Тип', 'dev', 'test'), ('a', 'number', 1, 2), ('b', 'string', 'x', None),
+                (None, 'string', 'пропуск', 'пропуск')]:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+@pytest.mark.parametrize('reader', ['pandas', 'stream'])
+def test_columns_with_colliding_names(tmp_path, reader):
+    excel_path = save_columns_book(tmp_path / 'book.xlsx')
+    converted = convert_workbook_columns(excel_path, {'dev/x': 'C', 'dev_x': 'D', 'пусто': 'F'}, type_column='B',
+                                         reader=reader)
+    assert len(set(converted['save_paths'])) == 3
+    results = {}
+    for name, info in converted['columns'].items():
+        with open(info['save_path'], encoding='utf-8') as f:
+            results[name] = json.load(f)
+    assert results == {'dev/x': {'a': 1, 'b': 'x'}, 'dev_x': {'a': 2, 'b': None}, 'пусто': {'a': None, 'b': None}}
+
+@pytest.mark.parametrize('columns, key_column, type_column, message', [
+    ({'dev': 'A'}, 'A', 'B', 'dev \\(A\\) совпадает со столбцом ключей'),
+    ({'dev': 'C', 'test': 'B'}, 'A', 'B', 'test \\(B\\) совпадает со столбцом типов'),
+    ({'dev': 'C'}, 'B', 'B', 'ключей и столбец типов совпадают'),
+])
+def test_columns_overlapping_key_or_type(tmp_path, columns, key_column, type_column, message):
+    excel_path = save_columns_book(tmp_path / 'book.xlsx')
+    with pytest.raises(ValueError, match=message):
+        convert_workbook_columns(excel_path, columns, key_column=key_column, type_column=type_column)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['book.xlsx']
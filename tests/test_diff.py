@@ -0,0 +1,45 @@
+"""Инкрементальный режим: выбор предыдущего результата и патч к нему"""
+import json
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from ExcelToJson.convert import convert_excel_file, convert_workbook_sheets
+from ExcelToJson.diff import find_previous_output
+
+def save_book(folder):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in [('Ключ', 'Значение', 'Тип'), ('a', 1, 'number'), ('b', 'x', 'string')]:
+        sheet.append(row)
+    workbook.save(folder / 'book.xlsx')
+    return str(folder / 'book.xlsx')
+
+def convert(excel_path):
+    return convert_excel_file(excel_path, copy_result=False, use_cache=False, incremental=True)
+
+def test_patch_against_previous_sheet_output(tmp_path):
+    excel_path = save_book(tmp_path)
+    (tmp_path / 'book_2000.01.01_00-00.json').write_text(json.dumps({'a': 2, 'c': None}), encoding='utf-8')
+    converted = convert(excel_path)
+    assert converted['baseline'] == str(tmp_path / 'book_2000.01.01_00-00.json')
+    assert converted['changes'] == {'add': 1, 'replace': 1, 'remove': 1}
+
+def test_sheets_documents_are_not_baselines(tmp_path):
+    excel_path = save_book(tmp_path)
+    convert_workbook_sheets(excel_path, output='combined')
+    convert_workbook_sheets(excel_path, output='split')
+    assert find_previous_output(excel_path) is None
+
+def test_patch_against_output_of_json_objects(tmp_path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in [('Ключ', 'Значение', 'Тип'), ('a', '{"x": 1}', 'json'), ('b', '{"y": [2]}', 'json')]:
+        sheet.append(row)
+    excel_path = str(tmp_path / 'book.xlsx')
+    workbook.save(excel_path)
+    (tmp_path / 'book_2000.01.01_00-00.json').write_text(json.dumps({'a': {'x': 1}, 'b': {'y': [3]}}),
+                                                         encoding='utf-8')
+    converted = convert(excel_path)
+    assert converted['changes'] == {'add': 0, 'replace': 1, 'remove': 0}
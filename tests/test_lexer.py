@@ -0,0 +1,121 @@
+"""Построчный разбор JSON: восстановление после ошибок и инкрементальное обновление"""
+import json
+import random
+
+import pytest
+
+from ExcelToJson.lexer import INITIAL_STATE, IncrementalLexer, lex_line
+
+DOCUMENT = json.dumps({
+    'ключ': 'значение "в кавычках" \\ и слэш', 'число': -1.5e-3, 'флаги': [True, False, None],
+    'вложенный': {'список': [[1, 2], {'a': []}], 'пусто': {}}, 'последний': 0,
+}, ensure_ascii=False, indent=2)
+
+def make_getter(lines):
+    return lambda first, last: lines[first:last]
+
+def lex_document(lines):
+    lexer = IncrementalLexer(len(lines))
+    lexer.advance(make_getter(lines), len(lines))
+    assert lexer.complete
+    return lexer
+
+def messages(text):
+    _, errors, state, _ = lex_line(text, INITIAL_STATE)
+    return [message for _, _, message in errors], state
+
+def test_valid_document_has_no_errors():
+    lines = DOCUMENT.split('\n')
+    lexer = lex_document(lines)
+    assert lexer.document_errors(make_getter(lines)) == []
+    assert lexer.states[-1] == ('', 'end')
+    tokens, _ = lexer.line_tokens(1, lines[1])
+    assert [tag for tag, _, _ in tokens] == ['json_key', 'json_punct', 'json_string', 'json_punct']
+
+@pytest.mark.parametrize('text, expected', [
+    ('{"a": 1 "b": 2}', ["Пропущена ','"]),
+    ('[1, 2,]', ["Лишняя ',' перед ']'"]),
+    ('{"a": 1,}', ["Лишняя ',' перед '}'"]),
+    ('{"a" 1}', ["Пропущено ':'"]),
+    ('{"a": }', ["Нет значения перед '}'"]),
+    ('{"a": [1}', ["Не закрыта '[' перед '}'"]),
+    ('[1]]', ["Лишняя ']'"]),
+    ('[1,, 2]', ["Лишняя ','"]),
+    ('{a: 1}', ["Ожидался ключ в кавычках"]),
+    ('["a\\x", "\\u12"]', ["Неверная escape-последовательность"] * 2),
+    ('[01, 1., tru, NaN]', ["Неверное число 01", "Неверное число 1.", "Неизвестное слово tru"]),
+    ('[@]', ["Недопустимый символ '@'"]),
+    ('1 2', ["Лишние данные после JSON"]),
+])
+def test_errors_recover_to_end_of_document(text, expected):
+    # После каждой ошибки разбор продолжается, и документ считается законченным
+    assert messages(text) == (expected, ('', 'end'))
+
+def test_unclosed_string_stops_at_end_of_line():
+    found, (stack, _) = messages('["abc, 1]')
+    assert found == ["Строка не закрыта"] and stack == '['
+
+def test_unclosed_brackets_are_reported_where_they_open():
+    lines = ['{', '  "a": [', '    1,', '    {"b": [2]}', '  ],', '  "c": [{', '    "d": 1']
+    lexer = lex_document(lines)
+    assert lexer.document_errors(make_getter(lines)) == [
+        (0, 0, 1, "Не закрыта '{'"), (5, 7, 8, "Не закрыта '['"), (5, 8, 9, "Не закрыта '{'"),
+    ]
+
+def test_errors_are_limited_and_ordered():
+    lines = ['[1 2', '3 4', ']']
+    lexer = lex_document(lines)
+    assert [error[0] for error in lexer.document_errors(make_getter(lines))] == [0, 1, 1]
+    assert len(lexer.document_errors(make_getter(lines), limit=2)) == 2
+
+def assert_same_as_fresh(lexer, lines):
+    fresh = lex_document(lines)
+    assert lexer.complete
+    assert lexer.states == fresh.states
+    assert lexer.errors == fresh.errors
+    assert lexer.depths == fresh.depths
+
+# Вставки, которые меняют состояние следующих строк (кавычка, скобки) и не меняют его
+FRAGMENTS = ['"', '[', ']', '{', '}', ',', ':', '1', ' ', '"x": 2,', '"строка"', 'true']
+
+def random_edit(rng, lexer, lines):
+    """Заменяет строки случайной правкой и сообщает о ней разбору"""
+    line = rng.randrange(len(lines))
+    removed = rng.randint(0, min(2, len(lines) - line - 1))
+    old = '\n'.join(lines[line:line + removed + 1])
+    position = rng.randint(0, len(old))
+    if rng.random() < 0.3:
+        new = old[:position] + old[position + rng.randint(1, 5):]
+    else:
+        new = old[:position] + rng.choice(FRAGMENTS + ['\n']) + old[position:]
+    new_lines = new.split('\n')
+    lines[line:line + removed + 1] = new_lines
+    lexer.edit(line, removed, len(new_lines) - 1)
+    assert lexer.line_count == len(lines)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_edits_match_fresh_lex(seed):
+    rng = random.Random(seed)
+    lines = DOCUMENT.split('\n') * 3
+    lexer = lex_document(lines)
+    for _ in range(100):
+        # Несколько правок до разбора, как при быстром наборе
+        for _ in range(rng.randint(1, 3)):
+            random_edit(rng, lexer, lines)
+        if rng.random() < 0.5:
+            # Разбор по частям, как в фоне редактора: следующая правка может прийти раньше конца
+            lexer.advance(make_getter(lines), len(lines), max_lines=rng.randint(1, 20))
+        else:
+            lexer.advance(make_getter(lines), len(lines))
+            assert_same_as_fresh(lexer, lines)
+    lexer.advance(make_getter(lines), len(lines))
+    assert_same_as_fresh(lexer, lines)
+
+def test_edit_stops_at_convergence():
+    lines = DOCUMENT.split('\n') * 50
+    lexer = lex_document(lines)
+    lines[3] = lines[3].replace('-0.0015', '42')
+    lexer.edit(3, 0, 0)
+    # Состояние на конце строки не изменилось - разбирается только она
+    assert lexer.advance(make_getter(lines), len(lines)) == 1
+    assert_same_as_fresh(lexer, lines)
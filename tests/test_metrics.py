@@ -0,0 +1,17 @@
+"""Замеры этапов: пик памяти вложенных этапов"""
+import tracemalloc
+
+from ExcelToJson import metrics
+
+def test_nested_stage_keeps_outer_peak(monkeypatch):
+    records = []
+    monkeypatch.setattr(metrics, 'METRICS_HOOKS', [records.append])
+    monkeypatch.setattr(metrics, 'METRICS_MEMORY', True)
+    with metrics.measure_stage('outer'):
+        block = bytearray(20 * 1024 * 1024)
+        del block
+        with metrics.measure_stage('inner'):
+            pass
+    peaks = {record['stage']: record['peak_bytes'] for record in records}
+    assert peaks['outer'] >= 20 * 1024 * 1024 > peaks['inner']
+    assert not metrics.MEMORY_STAGES and not tracemalloc.is_tracing()
@@ -0,0 +1,212 @@
+"""Структурный индекс JSON: пути, позиции, поиск и обновление по правкам против полного построения"""
+import json
+import random
+import threading
+
+import pytest
+
+from ExcelToJson.outline import StructureIndex, build_structure_index, child_path, lines_edit
+from ExcelToJson.reformat import ReformatError
+from ExcelToJson.writer import ConversionCancelled
+
+def build(text, size=5):
+    return build_structure_index(text[start:start + size] for start in range(0, len(text), size))
+
+def locate(lines, needle, after=0):
+    """Позиция (строка с 1, столбец) первого вхождения needle начиная со строки after (с 0)"""
+    for number in range(after, len(lines)):
+        column = lines[number].find(needle)
+        if column >= 0:
+            return number + 1, column
+    raise AssertionError(needle)
+
+def outline(index, node=0, path=''):
+    """Все пути индекса с текущими позициями по порядку документа"""
+    result = {path: index.position(node)}
+    for key, child in index.items(node):
+        result.update(outline(index, child, child_path(path, key)))
+    return result
+
+DOCUMENT = {
+    'a': {'b': [10, {'c': 'x'}, []], 'пусто': {}},
+    'a.b': 'ключ с точкой', 'кавычки "и" [скобки]': 1,
+    'список': list(range(25)), 'z': None,
+}
+
+def test_paths_and_positions():
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=2)
+    lines = text.split('\n')
+    index = build(text)
+    assert index.position(index.find('')) == (1, 0)
+    assert index.position(index.find('a')) == locate(lines, '"a"')
+    node = index.find('a.b[1].c')
+    assert index.position(node) == locate(lines, '"c"')
+    # Элемент массива - начало значения
+    assert index.position(index.find('a.b[1]')) == locate(lines, '{', locate(lines, '"b"')[0])
+    assert index.position(index.find('["a.b"]')) == locate(lines, '"a.b"')
+    assert index.find('["кавычки \\"и\\" [скобки]"]') is not None
+    for missing in ('a.b[3]', 'a.c', 'z.y', 'список[25]', 'a[0]', '["нет"]'):
+        assert index.find(missing) is None
+    assert list(outline(index))[:8] == ['', 'a', 'a.b', 'a.b[0]', 'a.b[1]', 'a.b[1].c', 'a.b[2]', 'a.пусто']
+    assert '["кавычки \\"и\\" [скобки]"]' in outline(index)
+
+def test_key_with_dots_is_found_without_brackets():
+    index = build('{"раздел.ключ": 1, "раздел": {"другой": 2}}')
+    assert index.find('раздел.ключ') == 1
+    assert index.find('раздел.другой') is not None
+
+def test_duplicate_keys_point_to_first():
+    index = build('{"a": 1,\n "a": 2}')
+    assert index.position(index.find('a')) == (1, 1)
+    assert [key for key, _ in index.items(0)] == ['a', 'a']
+
+def test_search():
+    index = build(json.dumps(DOCUMENT, ensure_ascii=False))
+    # a.b - ключ верхнего уровня с точкой; потомки a в поиск по 'a' не входят
+    assert [path for path, _ in index.search('a')] == ['a', 'a.b']
+    # Ключ "a.b" и потомок b ключа a записываются одинаково, узлы у них разные
+    found = index.search('a.')
+    assert [path for path, _ in found] == ['a.b', 'a.b', 'a.пусто'] and found[0][1] != found[1][1]
+    assert [path for path, _ in index.search('список[1')] == ['список[1]'] + [f'список[{n}]' for n in range(10, 20)]
+    assert [path for path, _ in index.search('список[0')] == ['список[0]']
+    assert len(index.search('список', limit=3)) == 1
+    assert len(index.search('список[', limit=3)) == 3
+    assert index.search('нет') == []
+
+@pytest.mark.parametrize('text, line, message', [
+    ('{\n  "a": [1}\n', 2, "неожиданная '}'"),
+    ('{\n  "a": @\n}', 2, 'недопустимый символ'),
+    ('{\n  1: 2\n}', 2, 'ожидался ключ в кавычках'),
+    ('[1]\n2', 2, 'лишние данные после JSON'),
+    ('{\n  "a": [\n', 2, 'документ оборван'),
+    ('  ', 1, 'документ пуст'),
+])
+def test_build_errors(text, line, message):
+    with pytest.raises(ReformatError) as raised:
+        build(text, 1)
+    assert raised.value.line == line and message in str(raised.value)
+
+def test_build_cancel():
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(ConversionCancelled):
+        build_structure_index(['{}'], cancel)
+
+@pytest.mark.parametrize('old, new, expected', [
+    (['a', 'b', 'c'], ['a', 'b', 'c'], None),
+    (['a', 'b', 'c'], ['a', 'x', 'c'], (11, 0, 0)),
+    (['a', 'b', 'c'], ['a', 'b', 'n', 'c'], (11, 0, 1)),
+    (['a', 'b', 'c'], ['a', 'c'], (10, 1, 0)),
+    (['a'], ['x', 'a'], (10, 0, 1)),
+    ([], ['a'], ()),
+])
+def test_lines_edit(old, new, expected):
+    assert lines_edit(10, old, new) == expected
+
+def test_positions_follow_edits_before_update():
+    lines = json.dumps({f'k{n}': n for n in range(10)}, indent=2).split('\n')
+    index = build('\n'.join(lines))
+    # После k1 вставлены две строки
+    edited = lines[:3] + ['  "new": 0,', '  "new2": 0,'] + lines[3:]
+    index.edit(*lines_edit(0, lines, edited))
+    assert index.position(index.find('k0')) == (2, 2)
+    assert index.position(index.find('k5')) == (9, 2)
+    # Удалены k6 и k7: k8 поднимается, удаленные строки встают на место правки
+    lines, edited = edited, edited[:9] + edited[11:]
+    index.edit(*lines_edit(0, lines, edited))
+    assert index.position(index.find('k5')) == (9, 2)
+    assert index.position(index.find('k8')) == (10, 2)
+    assert index.position(index.find('k6'))[0] == 9
+
+def member_text(rng, name):
+    value = rng.choice([rng.randint(0, 99), [rng.randint(0, 9) for _ in range(rng.randint(0, 3))],
+                        {'x': rng.randint(0, 9), 'y': {'z': []}}, 'строка', None])
+    return json.dumps({name: value}, ensure_ascii=False, indent=2).split('\n')[1:-1]
+
+def random_change(rng, lines, names):
+    """Правка одного члена корня ниже первого: замена, вставка или удаление его строк"""
+    starts = [number for number, text in enumerate(lines) if text.startswith('  "')]
+    number = rng.randrange(1, len(starts))
+    start = starts[number]
+    end = starts[number + 1] if number + 1 < len(starts) else len(lines) - 1
+    action = rng.choice(['replace', 'insert', 'delete'] if len(starts) > 3 else ['replace', 'insert'])
+    comma = end < len(lines) - 1
+    if action == 'delete':
+        new = []
+        if not comma:
+            # Удален последний член: запятая предыдущего тоже уходит
+            start -= 1
+            new = [lines[start].rstrip(',')]
+    else:
+        name = f"новый {next(names)}"
+        new = member_text(rng, name)
+        new[-1] += ','
+        if action == 'replace':
+            if not comma:
+                new[-1] = new[-1][:-1]
+        else:
+            end = start
+    lines[start:end] = new
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('root', ['object', 'array'])
+def test_update_matches_fresh_build(seed, root):
+    rng = random.Random(seed)
+    names = iter(range(10 ** 6))
+    if root == 'object':
+        lines = ['{']
+        for n in range(40):
+            lines += member_text(rng, f"член {n}")
+            lines[-1] += ','
+        lines[-1] = lines[-1][:-1]
+        lines.append('}')
+    else:
+        lines = json.dumps([{'n': n, 'v': [n] * (n % 3)} for n in range(40)], indent=2).split('\n')
+    index = build('\n'.join(lines))
+    updated = 0
+    for _ in range(30):
+        # Несколько правок до проверки, как при наборе
+        for _ in range(rng.randint(1, 3)):
+            old = list(lines)
+            if root == 'object':
+                random_change(rng, lines, names)
+            else:
+                # В массив элемента добавляется число на отдельной строке
+                start = rng.randrange(10, len(lines) - 2)
+                lines[start:start + 1] = lines[start].replace('[', '[\n7,', 1).split('\n')
+            change = lines_edit(0, old, lines)
+            if change:
+                index.edit(*change)
+            elif change == ():
+                index.invalidate()
+        fresh = build('\n'.join(lines))
+        if index.update(lambda first, last: lines[first:last], len(lines)):
+            updated += 1
+        else:
+            index = build('\n'.join(lines))
+        assert outline(index) == outline(fresh)
+        assert [path for path, _ in index.search('', 1000)] == [path for path, _ in fresh.search('', 1000)]
+    assert updated > 20
+
+def test_update_refuses_what_it_cannot_splice():
+    # Член kN занимает строки 1 + 3N (ключ), 2 + 3N (значение), 3 + 3N (скобка)
+    source = json.dumps({f'k{n}': [n] for n in range(10)}, indent=2).split('\n')
+
+    def edited(line, text):
+        lines = list(source)
+        index = build('\n'.join(lines))
+        lines[line] = text
+        index.edit(line, 0, 0)
+        return index.update(lambda first, last: lines[first:last], len(lines))
+
+    assert edited(11, '    30')
+    # Ключ первого члена корня
+    assert not edited(1, '  "k00": [')
+    # Текст в месте правки - не JSON
+    assert not edited(11, '    @')
+    # Ключ, который уже есть в корне
+    assert not edited(10, '  "k0": [')
+
+    index = build('\n'.join(source))
+    index.invalidate()
+    assert not index.update(lambda first, last: source[first:last], len(source))
@@ -0,0 +1,37 @@
+"""Потоковое чтение (stream) против pd.read_excel (pandas) на одних и тех же книгах"""
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from ExcelToJson.readers import read_excel_result
+
+HEADER = ('Ключ', 'Значение', 'Тип')
+
+def save_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def assert_same_result(path):
+    assert read_excel_result(path, 'stream') == read_excel_result(path, 'pandas')
+
+@pytest.mark.parametrize('values', [
+    [True, 1, 0, False],
+    [1, True, False, 0],
+    [False, 0, 'x', 1, True],
+    [0, 'ложь', False, 1.0, True],
+])
+@pytest.mark.parametrize('name', ['string', 'number', 'bool', 'json', 'list'])
+def test_bool_and_number_in_text_column(tmp_path, values, name):
+    rows = [HEADER] + [(f"k{n}", value, name) for n, value in enumerate(values)]
+    assert_same_result(save_workbook(tmp_path / 'mix.xlsx', rows))
+
+def test_first_equal_value_wins_per_column(tmp_path):
+    rows = [HEADER, ('a', True, 'string'), ('b', 1, 'string'), ('c', 0, 'string'),
+            ('d', False, 'string'), (1, 'x', 'number'), (True, 'y', 'number')]
+    path = save_workbook(tmp_path / 'mix.xlsx', rows)
+    assert_same_result(path)
+    assert read_excel_result(path, 'stream') == {'a': 'True', 'b': 'True', 'c': '0', 'd': '0', '1': 'y'}
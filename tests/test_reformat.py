@@ -0,0 +1,106 @@
+"""Переформатирование JSON в редакторе против json.dumps: стили, сортировка, порции и ошибки"""
+import json
+import threading
+
+import pytest
+
+from ExcelToJson import reformat
+from ExcelToJson.reformat import ReformatError, decode_chunks, reformat_json
+from ExcelToJson.writer import ConversionCancelled
+
+DOCUMENT = {
+    'я': 1, 'b': [], 'a': {}, 'ключ "в кавычках"': 'значение \\ с\nпереносом \x01 😀',
+    'вложенный': {'z': [1, -2.5, 1e-05, 1e+300, True, False, None], 'a': {'y': {}, 'x': [[], [{}]]}},
+    'список': [{'b': 1, 'a': 2}, 'x', [3, {'d': [], 'c': 0}]], '': 'пустой ключ',
+}
+
+def split(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)] or ['']
+
+def run(text, size=7, **options):
+    out = []
+    written = reformat_json(split(text, size), out.append, **options)
+    result = ''.join(out)
+    assert written == len(result)
+    return result
+
+def dumps(value, style='pretty', **options):
+    if style == 'pretty':
+        return json.dumps(value, indent=2, **options)
+    return json.dumps(value, separators=(',', ':'), **options)
+
+SOURCES = {
+    'pretty': dumps(DOCUMENT, ensure_ascii=False),
+    'compact': dumps(DOCUMENT, 'compact'),
+    'spaced': json.dumps(DOCUMENT, indent='\t', separators=(' , ', ' : ')).replace('\n', '\r\n'),
+}
+
+@pytest.mark.parametrize('size', [1, 7, 100, 10 ** 6])
+@pytest.mark.parametrize('sort_keys', [False, True])
+@pytest.mark.parametrize('style', ['pretty', 'compact'])
+@pytest.mark.parametrize('source', sorted(SOURCES))
+def test_round_trip_matches_json_dumps(source, style, sort_keys, size):
+    text = SOURCES[source]
+    # Строки переносятся как есть: escape-последовательности исходника сохраняются
+    ensure_ascii = source != 'pretty'
+    expected = dumps(json.loads(text), style, sort_keys=sort_keys, ensure_ascii=ensure_ascii)
+    assert run(text, size, style=style, sort_keys=sort_keys) == expected
+
+@pytest.mark.parametrize('value', [[], {}, 0, -1.5e-7, 'строка', None, [[[]]], [{}, {'a': {}}]])
+def test_scalars_and_empty_containers(value):
+    text = json.dumps(value)
+    for sort_keys in (False, True):
+        assert run(text, style='pretty', sort_keys=sort_keys) == json.dumps(value, indent=2)
+        assert run(text, style='compact', sort_keys=sort_keys) == dumps(value, 'compact')
+
+def test_sorting_keeps_duplicate_keys_in_order(monkeypatch):
+    # Внешний объект уходит во временный файл; запись порциями
+    monkeypatch.setattr(reformat, 'REFORMAT_FLUSH_PIECES', 3)
+    text = '{"b": 1, "a": {"d": 2, "c": 3}, "b": 4, "a": 5}'
+    assert run(text, style='compact', sort_keys=True) == '{"a":{"c":3,"d":2},"a":5,"b":1,"b":4}'
+
+def test_large_sorted_object(monkeypatch):
+    monkeypatch.setattr(reformat, 'REFORMAT_FLUSH_PIECES', 5)
+    value = {f"ключ {n * 7919 % 1000}": {'n': n, 'список': list(range(n % 5))} for n in range(1000)}
+    text = json.dumps(value, ensure_ascii=False)
+    assert run(text, 4096, sort_keys=True) == json.dumps(value, ensure_ascii=False, indent=2, sort_keys=True)
+
+def test_decode_chunks_skips_bom_and_joins_split_characters():
+    data = '﻿{"ключ": "😀"}'.encode('utf-8')
+    chunks = list(decode_chunks(data[start:start + 1] for start in range(len(data))))
+    assert ''.join(chunks) == '{"ключ": "😀"}'
+    assert run(''.join(chunks), style='compact') == '{"ключ":"😀"}'
+
+@pytest.mark.parametrize('text, line, message', [
+    ('{\n  "a": 1,\n  "b": tru\n}', 3, 'неизвестное слово'),
+    ('[\n  1,\n  01\n]', 3, 'неверное число'),
+    ('[\n  "a\\x"\n]', 2, 'неверная строка'),
+    ('[\n  "a\n"]', 2, 'неверная строка'),
+    ('{\n  "a": 1\n  "b": 2\n}', 3, "пропущена ','"),
+    ('{\n  "a" 1\n}', 2, "пропущено ':'"),
+    ('{\n  "a": 1,\n}', 3, "нет значения перед '}'"),
+    ('[1,\n2]\n]', 3, "неожиданная ']'"),
+    ('[1,\n\n,2]', 3, "неожиданная ','"),
+    ('{\n  a: 1\n}', 2, 'ожидался ключ в кавычках'),
+    ('[1]\n\n2', 3, 'лишние данные после JSON'),
+    ('[@]', 1, "недопустимый символ '@'"),
+    ('[\n  1,\n  2\n', 4, 'документ оборван'),
+    ('\n\n', 3, 'документ пуст'),
+])
+@pytest.mark.parametrize('size', [1, 3, 10 ** 6])
+def test_errors_report_line_numbers(text, line, message, size):
+    with pytest.raises(ReformatError) as raised:
+        run(text, size)
+    assert raised.value.line == line
+    assert str(raised.value).startswith(f"Строка {line}: {message}")
+    # Как и json.loads, которым редактор проверяет текст
+    with pytest.raises(ValueError):
+        json.loads(text)
+
+def test_unknown_style_and_cancel():
+    with pytest.raises(ValueError, match='Неизвестный стиль'):
+        run('{}', style='wide')
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(ConversionCancelled):
+        run('{}', cancel=cancel)
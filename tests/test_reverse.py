@@ -0,0 +1,117 @@
+"""Обратная конвертация: JSON → xlsx → JSON возвращает исходный документ"""
+import io
+import os
+import re
+
+import pytest
+
+pytest.importorskip('openpyxl')
+
+from ExcelToJson.readers import read_excel_result
+from ExcelToJson.reverse import (build_excel_save_path, iter_json_pairs, json_to_excel_file,
+                                 run_json_to_excel, write_rows_openpyxl)
+from ExcelToJson.writer import write_json_pairs
+
+DOCUMENT = r'''{
+  "big_int": 12345678901234567890123,
+  "big_negative": -9007199254740993,
+  "exact_int": 9007199254740992,
+  "zero": 0,
+  "negative_zero": -0.0,
+  "float": 0.1,
+  "long_float": 3.141592653589793238462643383279,
+  "exponent": 1e300,
+  "nan_value": NaN,
+  "infinity": Infinity,
+  "minus_infinity": -Infinity,
+  "true": true,
+  "false": false,
+  "one": 1,
+  "null_value": null,
+  "na_text": "NA",
+  "null_text": "null",
+  "nan_text": "NaN",
+  "empty": "",
+  "space": " ",
+  "control": "a\u0001b\u001fc",
+  "newline": "строка\nвторая\tтаб",
+  "formula": "=SUM(A1:A2)",
+  "error_code": "#N/A",
+  "hash": "#REF!",
+  "number_text": "42",
+  "bool_text": "true",
+  "date_text": "2024-01-02",
+  "object": {"a": [1, 2.5, null, {"b": "NA"}], "c": {}},
+  "array": [[], [true, "=1"], -0.0, "x"],
+  "empty_object": {},
+  "empty_array": [],
+  "=key": "#",
+  "#key": "="
+}'''
+
+def encode(pairs):
+    output = io.StringIO()
+    write_json_pairs(output, pairs, backend='json')
+    return output.getvalue()
+
+def writers():
+    names = ['openpyxl']
+    try:
+        import xlsxwriter  # noqa: F401
+        names.append('xlsxwriter')
+    except ImportError:
+        pass
+    return names
+
+@pytest.mark.parametrize('writer', writers())
+@pytest.mark.parametrize('reader', ['pandas', 'stream'])
+def test_round_trip(tmp_path, writer, reader):
+    json_path = tmp_path / 'doc.json'
+    json_path.write_text(DOCUMENT, encoding='utf-8')
+    excel_path = str(tmp_path / 'doc.xlsx')
+    json_to_excel_file(str(json_path), excel_path, writer)
+
+    expected = list(iter_json_pairs(io.StringIO(DOCUMENT)))
+    result = read_excel_result(excel_path, reader)
+    assert list(result) == [key for key, _ in expected]
+    assert encode(result.items()) == encode(expected)
+
+@pytest.mark.filterwarnings('error::pytest.PytestUnraisableExceptionWarning')
+@pytest.mark.parametrize('key', ['NA', 'null', '', ' a', 'a\\u0001'])
+def test_key_lost_on_reading_is_rejected(tmp_path, key):
+    json_path = tmp_path / 'doc.json'
+    json_path.write_text('{"%s": 1}' % key, encoding='utf-8')
+    with pytest.raises(ValueError, match='нельзя записать в Excel'):
+        json_to_excel_file(str(json_path), str(tmp_path / 'doc.xlsx'), 'openpyxl')
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['doc.json']
+
+@pytest.mark.filterwarnings('error::pytest.PytestUnraisableExceptionWarning')
+def test_openpyxl_writer_closes_book_on_error(tmp_path):
+    def rows():
+        yield ['Ключ', 'Значение', 'Тип']
+        yield ['a', 1, 'number']
+        raise ValueError('обрыв')
+
+    path = tmp_path / 'doc.xlsx'
+    with pytest.raises(ValueError, match='обрыв'):
+        write_rows_openpyxl(str(path), rows())
+    assert not path.exists()
+
+def test_excel_name_keeps_source_date():
+    folder = os.path.join('data', 'out')
+    assert build_excel_save_path(os.path.join(folder, 'a_2026.10.18_10-55.json.gz')) == \
+        os.path.join(folder, 'a_2026.10.18_10-55.xlsx')
+    assert re.fullmatch(r'a_\d{4}\.\d{2}\.\d{2}_\d{2}-\d{2}\.xlsx',
+                        os.path.basename(build_excel_save_path('a.ndjson')))
+
+def test_outputs_of_one_run_are_not_overwritten(tmp_path):
+    paths = []
+    for name, text in [('a_2026.10.18_10-55.json', '{"k": 1}'), ('a_2026.10.18_10-56.json', '{"k": 2}'),
+                       ('a_2026.10.18_10-56.ndjson', '{"k": 3}\n')]:
+        (tmp_path / name).write_text(text, encoding='utf-8')
+        paths.append(str(tmp_path / name))
+    out = io.StringIO()
+    assert run_json_to_excel(paths, writer='openpyxl', out=out) == 1
+    assert 'уже записан' in out.getvalue()
+    for stamp, value in [('10-55', 1), ('10-56', 2)]:
+        assert read_excel_result(str(tmp_path / f'a_2026.10.18_{stamp}.xlsx'), 'stream') == {'k': value}
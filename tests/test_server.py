@@ -0,0 +1,121 @@
+"""Служба конвертации: ответы на запросы (пул процессов заменен пулом потоков)"""
+import asyncio
+import io
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from ExcelToJson.server import ConversionService, check_unix_socket_path
+
+def save_book(path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in [('Ключ', 'Значение', 'Тип'), ('a', 1, 'number'), ('b', 'x', 'string')]:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+def make_service(pool, **options):
+    settings = {'queue_size': 4, 'max_upload': 1024 * 1024, 'allow_paths': False, **options}
+    return ConversionService(pool, 1, settings['queue_size'], settings['max_upload'], settings['allow_paths'],
+                             io.StringIO(), {'use_cache': False, 'reader': 'stream'})
+
+def request(service, target, body=b'', headers=None, send_body=True):
+    """Отправляет один запрос службе и возвращает (статус, заголовки, тело)"""
+    headers = {'Content-Length': len(body), **(headers or {})}
+
+    async def exchange():
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            head = f"{target} HTTP/1.1\r\n" + ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+            writer.write(head.encode('utf-8') + b'\r\n' + (body if send_body else b''))
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    head, _, payload = asyncio.run(exchange()).partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    response_headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split(' ')[1]), response_headers, payload
+
+def error_of(payload):
+    return json.loads(payload.decode('utf-8'))['error']
+
+def test_upload_is_converted(pool, tmp_path):
+    with open(save_book(tmp_path / 'book.xlsx'), 'rb') as f:
+        body = f.read()
+    status, headers, payload = request(make_service(pool), 'POST /convert?name=book.xlsx&format=compact', body)
+    assert status == 200 and headers['X-Rows'] == '2'
+    assert payload.decode('utf-8') == '{"a":1,"b":"x"}'
+    assert 'X-Save-Path' not in headers
+
+def test_upload_limits(pool):
+    service = make_service(pool, max_upload=10)
+    status, _, payload = request(service, 'POST /convert?name=book.xlsx', b'x' * 100, send_body=False)
+    assert status == 413
+    status, _, _ = request(service, 'POST /convert?name=book.xlsx', headers={'Content-Length': 0})
+    assert status == 400
+    status, _, payload = request(service, 'POST /convert?name=notes.txt', b'x')
+    assert status == 400 and 'notes.txt' in error_of(payload)
+    assert service.active == 0
+
+def test_busy_service_answers_503(pool):
+    service = make_service(pool, queue_size=1)
+    service.active = 1
+    status, headers, payload = request(service, 'POST /convert?name=book.xlsx', b'x' * 100, send_body=False)
+    assert status == 503 and headers['Retry-After'] == '1'
+    service.active = 0
+    status, _, payload = request(service, 'GET /health')
+    assert status == 200 and json.loads(payload)['active'] == 0
+
+def test_paths_are_off_by_default(pool, tmp_path):
+    excel_path = save_book(tmp_path / 'book.xlsx')
+    status, _, payload = request(make_service(pool), f'POST /convert?path={excel_path}')
+    assert status == 403 and '--allow-paths' in error_of(payload)
+
+def test_bad_paths(pool, tmp_path):
+    service = make_service(pool, allow_paths=True)
+    (tmp_path / 'notes.txt').write_text('x', encoding='utf-8')
+    status, _, _ = request(service, f"POST /convert?path={tmp_path / 'missing.xlsx'}")
+    assert status == 404
+    status, _, payload = request(service, f"POST /convert?path={tmp_path / 'notes.txt'}")
+    assert status == 400 and 'notes.txt' in error_of(payload)
+    excel_path = save_book(tmp_path / 'book.xlsx')
+    status, headers, payload = request(service, f'POST /convert?path={excel_path}&reader=stream')
+    assert status == 200 and json.loads(payload) == {'a': 1, 'b': 'x'}
+    assert os.path.dirname(headers['X-Save-Path']) == str(tmp_path)
+
+def test_bad_requests(pool):
+    service = make_service(pool)
+    assert request(service, 'GET /convert')[0] == 405
+    assert request(service, 'GET /unknown')[0] == 404
+    assert request(service, 'POST /convert?name=book.xlsx&reader=нет', b'x')[0] == 400
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="нет Unix-сокетов")
+def test_unix_socket_path(tmp_path):
+    regular = tmp_path / 'regular'
+    regular.write_text('x', encoding='utf-8')
+    with pytest.raises(ValueError, match='не является сокетом'):
+        check_unix_socket_path(str(regular))
+    assert regular.exists()
+
+    stale = str(tmp_path / 'stale.sock')
+    server = socket.socket(socket.AF_UNIX)
+    server.bind(stale)
+    server.close()
+    check_unix_socket_path(stale)
+    assert not os.path.exists(stale)
+    check_unix_socket_path(stale)
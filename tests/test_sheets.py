@@ -0,0 +1,59 @@
+"""Конвертация нескольких листов книги за одно чтение"""
+import json
+import os
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from ExcelToJson.convert import build_json_save_paths, convert_workbook_sheets
+
+# Excel не разрешает "/" и ":" в имени листа - с "A_B" совпадают "A|B" и "A<B"
+SHEETS = {
+    'A|B': [('a', 1, 'number')],
+    'A_B': [('b', 'x', 'string')],
+    'A<B': [('c', 'true', 'bool')],
+    'Пусто': [],
+}
+
+def save_book(path, sheets):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in [('Ключ', 'Значение', 'Тип')] + rows:
+            sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def test_colliding_names_get_numbers():
+    paths = build_json_save_paths(os.path.join('out', 'book.xlsx'), ['A/B', 'A_B', 'a_b', 'A_B_2', 'C'])
+    names = {name: os.path.basename(path).rsplit('_', 2)[0] for name, path in paths.items()}
+    assert names == {'A/B': 'book_A_B', 'A_B': 'book_A_B_2', 'a_b': 'book_a_b_3', 'A_B_2': 'book_A_B_2_2',
+                     'C': 'book_C'}
+
+@pytest.mark.parametrize('reader', ['pandas', 'stream'])
+def test_split_writes_every_sheet(tmp_path, reader):
+    excel_path = save_book(tmp_path / 'book.xlsx', SHEETS)
+    converted = convert_workbook_sheets(excel_path, output='split', reader=reader)
+    assert len(set(converted['save_paths'])) == 4
+    assert converted['rows'] == 3
+    results = {name: read_json(info['save_path']) for name, info in converted['sheets'].items()}
+    assert results == {'A|B': {'a': 1}, 'A_B': {'b': 'x'}, 'A<B': {'c': True}, 'Пусто': {}}
+
+@pytest.mark.parametrize('reader', ['pandas', 'stream'])
+def test_combined_and_selected_sheets(tmp_path, reader):
+    excel_path = save_book(tmp_path / 'book.xlsx', {'Один': SHEETS['A|B'], 'Два': SHEETS['A_B']})
+    converted = convert_workbook_sheets(excel_path, sheets=['Два'], output='combined', reader=reader)
+    assert os.path.basename(converted['save_paths'][0]).startswith('book_sheets_')
+    assert read_json(converted['save_paths'][0]) == {'Два': {'b': 'x'}}
+
+def test_missing_sheet_is_reported_by_stream_reader(tmp_path):
+    excel_path = save_book(tmp_path / 'book.xlsx', {'Один': SHEETS['A|B']})
+    converted = convert_workbook_sheets(excel_path, sheets=['Один', 'Нет'], reader='stream')
+    assert converted['sheets']['Нет']['error'] and converted['sheets']['Нет']['save_path'] is None
+    assert read_json(converted['sheets']['Один']['save_path']) == {'a': 1}
@@ -0,0 +1,97 @@
+"""Наблюдение за папками: опрос папок и ожидание конца записи файла"""
+import glob
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from ExcelToJson.watch import PollingWatcher, make_watcher, watch_folders
+
+def save_book(path, value=1):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in [('Ключ', 'Значение', 'Тип'), ('a', value, 'number')]:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def test_polling_watcher_reports_changed_books(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    old = save_book(tmp_path / 'old.xlsx')
+    watcher = PollingWatcher([str(tmp_path)], recursive=True, interval=0)
+    assert watcher.poll(0) == []
+
+    new = save_book(tmp_path / 'sub' / 'new.xlsx')
+    (tmp_path / 'notes.txt').write_text('x', encoding='utf-8')
+    (tmp_path / '~$old.xlsx').write_bytes(b'x')
+    assert watcher.poll(0) == [new]
+    assert watcher.poll(0) == []
+
+    with open(old, 'ab') as f:
+        f.write(b'\0')
+    os.remove(new)
+    assert watcher.poll(0) == [old]
+
+def test_polling_watcher_without_recursion(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    watcher = make_watcher([str(tmp_path)], polling=True, interval=0)
+    assert isinstance(watcher, PollingWatcher)
+    save_book(tmp_path / 'sub' / 'new.xlsx')
+    top = save_book(tmp_path / 'top.xlsx')
+    assert watcher.poll(0) == [top]
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify есть только в Linux")
+def test_inotify_watcher_reports_written_book(tmp_path):
+    watcher = make_watcher([str(tmp_path)])
+    try:
+        path = save_book(tmp_path / 'new.xlsx')
+        deadline = time.monotonic() + 5
+        seen = set()
+        while path not in seen and time.monotonic() < deadline:
+            seen.update(watcher.poll(0.1))
+        assert path in seen
+    finally:
+        watcher.close()
+
+def test_book_is_converted_once_after_it_settles(tmp_path):
+    source = save_book(tmp_path / 'source.xlsx', 42)
+    folder = tmp_path / 'in'
+    folder.mkdir()
+    out = io.StringIO()
+    stop = threading.Event()
+    thread = threading.Thread(target=watch_folders, args=([str(folder)],),
+                              kwargs=dict(workers=1, settle=0.6, interval=0.05, polling=True, out=out,
+                                          stop=stop, use_cache=False, reader='stream'))
+    thread.start()
+    try:
+        deadline = time.monotonic() + 60
+        while 'Наблюдение за' not in out.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        # Книга копируется частями с паузами короче settle - обрывок не конвертируется
+        with open(source, 'rb') as f:
+            data = f.read()
+        target = folder / 'book.xlsx'
+        step = len(data) // 4 + 1
+        for start in range(0, len(data), step):
+            with open(target, 'ab') as f:
+                f.write(data[start:start + step])
+            time.sleep(0.2)
+
+        while not glob.glob(str(folder / 'book_*.json')) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.3)
+    finally:
+        stop.set()
+        thread.join(60)
+    log = out.getvalue()
+    assert log.count('✅') == 1 and '❌' not in log
+    [result] = glob.glob(str(folder / 'book_*.json'))
+    with open(result, encoding='utf-8') as f:
+        assert json.load(f) == {'a': 42}
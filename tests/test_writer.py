@@ -0,0 +1,120 @@
+"""Потоковая запись JSON против json.dumps: форматы, кодировщики, сжатие и повторные ключи"""
+import gzip
+import io
+import json
+import threading
+from decimal import Decimal
+
+import pytest
+
+from ExcelToJson.writer import WRITE_CHUNK_PAIRS, ConversionCancelled, write_json_file, write_json_pairs
+
+# Значения, которые orjson пишет так же, как json.dumps, и которые он пишет иначе
+VALUES = [
+    'текст', 'кавычки " и \\ слэш', 'управляющие \x01\n\t', '', '😀', 0, -7, 2 ** 53 + 1, 2 ** 64, -2 ** 63 - 1,
+    0.0, -0.0, 0.1, 1.5e-5, 1e15, 1e16, 1e300, -2.5e-10, float('nan'), float('inf'), float('-inf'),
+    True, False, None, [], {}, [1, 'a', None, [2.5, {'b': []}]], {'x': {'y': [1e20, 'z']}, '': 0},
+]
+
+def pairs_of(values, count=None):
+    values = values * ((count or len(values)) // len(values) + 1)
+    return [(f"key {n} \"ключ\"", value) for n, value in enumerate(values[:count or len(VALUES)])]
+
+def write(pairs, **options):
+    output = io.StringIO()
+    write_json_pairs(output, pairs, **options)
+    return output.getvalue()
+
+BACKENDS = ['json', 'auto']
+PAIR_SETS = {
+    'values': pairs_of(VALUES),
+    # Несколько порций orjson: безопасные и небезопасные вперемешку
+    'chunks': pairs_of(VALUES, WRITE_CHUNK_PAIRS * 3 + 7),
+    'safe_chunks': pairs_of(['a', 1, 0.5, True, None, [1]], WRITE_CHUNK_PAIRS * 2 + 1),
+    'empty': [],
+}
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('name', sorted(PAIR_SETS))
+def test_pretty_and_compact_match_json_dumps(backend, name):
+    pairs = PAIR_SETS[name]
+    assert write(pairs, backend=backend) == json.dumps(dict(pairs), ensure_ascii=False, indent=2)
+    assert write(pairs, backend=backend, chunk_chars=10) == json.dumps(dict(pairs), ensure_ascii=False, indent=2)
+    assert write(pairs, backend=backend, json_format='compact') == \
+        json.dumps(dict(pairs), ensure_ascii=False, separators=(',', ':'))
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_nested_level_matches_json_dumps(backend):
+    pairs = PAIR_SETS['chunks']
+    text = '{\n  "лист": ' + write(pairs, backend=backend, level=1) + '\n}'
+    assert text == json.dumps({'лист': dict(pairs)}, ensure_ascii=False, indent=2)
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_ndjson_lines_match_json_dumps(backend):
+    pairs = PAIR_SETS['values']
+    expected = ''.join(json.dumps({key: value}, ensure_ascii=False, separators=(',', ':')) + '\n'
+                       for key, value in pairs)
+    assert write(pairs, backend=backend, json_format='ndjson') == expected
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_decimal_and_lone_surrogate(backend):
+    pairs = [('d', Decimal('1.10')), ('s', 'a\ud800b'), ('n', [1, 'x\udfff'])]
+    expected = json.dumps({'d': 1.1, 's': 'a\ud800b', 'n': [1, 'x\udfff']}, ensure_ascii=False, indent=2)
+    assert write(pairs, backend=backend) == expected.replace('1.1,', '1.10,')
+    assert write(pairs[1:], backend=backend, json_format='ndjson') == '{"s":"a\ud800b"}\n{"n":[1,"x\udfff"]}\n'
+
+openpyxl = pytest.importorskip('openpyxl')
+
+def save_book(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in [('Ключ', 'Значение', 'Тип')] + rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+@pytest.mark.parametrize('json_format', ['pretty', 'compact', 'ndjson'])
+def test_gzip_round_trip(tmp_path, json_format):
+    excel_path = save_book(tmp_path / 'book.xlsx', [('a', 1, 'number'), ('b', 'x', 'string'),
+                                                     ('c', '[1, {"d": null}]', 'json')])
+    save_path = str(tmp_path / 'book.json.gz')
+    assert write_json_file(save_path, excel_path, 'stream', json_format=json_format, compression='gzip') == 3
+    with gzip.open(save_path, 'rt', encoding='utf-8') as f:
+        text = f.read()
+    expected = {'a': 1, 'b': 'x', 'c': [1, {'d': None}]}
+    if json_format == 'ndjson':
+        assert [json.loads(line) for line in text.splitlines()] == [{k: v} for k, v in expected.items()]
+    else:
+        assert text == write(list(expected.items()), json_format=json_format, backend='json')
+
+@pytest.mark.parametrize('reader', ['stream', 'pandas'])
+def test_duplicate_keys_match_dict(tmp_path, reader):
+    rows = [('a', 1, 'number'), ('b', 2, 'number'), ('a', 3, 'number'), ('c', 4, 'number')]
+    excel_path = save_book(tmp_path / 'book.xlsx', rows)
+    save_path = tmp_path / 'book.json'
+    assert write_json_file(str(save_path), excel_path, reader) == 3
+    expected = {}
+    for key, value, _ in rows:
+        expected[key] = value
+    assert save_path.read_text(encoding='utf-8') == json.dumps(expected, ensure_ascii=False, indent=2)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['book.json', 'book.xlsx']
+
+def test_cancel_while_reading(tmp_path):
+    excel_path = save_book(tmp_path / 'book.xlsx', [('a', 1, 'number')])
+    save_path = tmp_path / 'book.json'
+    cancel = threading.Event()
+    stages = []
+
+    def on_stage(text):
+        # Отмена нажата, пока pandas читает лист
+        stages.append(text)
+        cancel.set()
+
+    with pytest.raises(ConversionCancelled):
+        write_json_file(str(save_path), excel_path, 'pandas', cancel=cancel, on_stage=on_stage)
+    assert stages == ["Чтение файла..."]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['book.xlsx']
+
+    stages.clear()
+    assert write_json_file(str(save_path), excel_path, 'pandas', on_stage=stages.append) == 1
+    assert stages == ["Чтение файла...", "Конвертация и запись JSON..."]